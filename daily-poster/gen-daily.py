@@ -3,6 +3,14 @@
 
 读取 tev-dashboard 本地数据 → 替换 template.html → Playwright 截图 PNG
 
+用法:
+    python3 daily-poster/gen-daily.py                                  # 今天（current + AI 点评）
+    python3 daily-poster/gen-daily.py --as-of 2026-03-01               # 按当天的历史数据重建某一天
+    python3 daily-poster/gen-daily.py --range 2025-08-01 2026-07-31 [-j 8] [--pages 4]
+                                                                       # 回补一段日期（模板改版后重出存档）
+回补模式只用各指标 history 里截至当天的行（不看之后的数据），不生成 AI 点评、
+不动 comment.json / output.png；HTML 多进程渲染，截图批量走 lib.render 的页面池。
+
 数据源：
 - indicators/data/ahr999.json
 - indicators/data/mvrv.json
@@ -11,14 +19,29 @@
 - indicators/data/shared/fred-macro.json
 - data/governance.json
 """
+import argparse
 import asyncio
 import json
+import os
 import re
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone, timedelta
 from pathlib import Path
 
 SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR.parent / "scripts"))
+from lib.fred import FredIndex  # noqa: E402
+from lib.indicators import load_series  # noqa: E402
+from lib.ahr999 import current_block as ahr_current_block  # noqa: E402
+from lib.bmri import build_output as bmri_build_output  # noqa: E402
+from lib.render import render_many  # noqa: E402
+from lib.render import screenshot as render_screenshot  # noqa: E402
+from lib.timing import StageTimer  # noqa: E402
+from lib import llm_cache  # noqa: E402
+from lib.trend import monthly_lines, update_all as update_trend  # noqa: E402
+
 TEMPLATE = SCRIPT_DIR / "template.html"
 LOGO_PATH = SCRIPT_DIR / "logo-3d.jpg"
 TEV_DIR = Path.home() / ".openclaw" / "workspace-engineer" / "tev-dashboard"
@@ -28,6 +51,13 @@ OUTPUT_DIR.mkdir(exist_ok=True)
 
 # Previous cycle MVRV at same point post-halving (~23 months after May 2020 halving = March 2022)
 PREV_CYCLE_MVRV = 1.73
+BTC_SUPPLY = 19_800_000
+GOLD_MCAP = 17.1e12
+
+# Comment pipeline: bump a prompt version after editing its template so cached results are not reused
+LLM_MODEL = "glm-4.6"
+COMMENT_PROMPT_VERSION = 1
+CHECK_PROMPT_VERSION = 1
 
 TZ = timezone(timedelta(hours=8))
 WEEKDAYS_ZH = ["周一", "周二", "周三", "周四", "周五", "周六", "周日"]
@@ -44,24 +74,86 @@ def load_json(p):
         return None
 
 
-def collect_data():
-    """Collect all data needed for the poster."""
-    now = datetime.now(TZ)
+def load_sources():
+    """Load every input file once; --range workers reuse the same dict for all dates."""
+    fred = load_json(INDICATORS / "shared" / "fred-macro.json")
+    return {
+        "ahr999": load_json(INDICATORS / "ahr999.json"),
+        "mvrv": load_json(INDICATORS / "mvrv.json"),
+        "bmri": load_json(INDICATORS / "bmri.json"),
+        "btcd": load_json(INDICATORS / "btc-dominance.json"),
+        "fred": FredIndex(fred["series"]) if fred and "series" in fred else None,
+        "governance": load_json(TEV_DIR / "data" / "governance.json"),
+    }
+
+
+def mvrv_status(v):
+    """Same zones as mvrv/index.html."""
+    return "低估区" if v < 1.0 else ("合理区" if v <= 3.0 else "高估区")
+
+
+def btcd_zone(v):
+    """Same zones as scripts/sync-btcd.py."""
+    return "BALANCED" if 50 < v < 70 else ("HIGH" if v >= 70 else "LOW")
+
+
+def sources_as_of(src, day):
+    """Rebuild each file's `current` block from history rows on or before `day`."""
+    def upto(rows):
+        return [r for r in rows if r["date"] <= day]
+
+    out = dict(src)
+    if src.get("ahr999"):
+        hist = upto(src["ahr999"]["history"])
+        out["ahr999"] = {"current": ahr_current_block(hist), "history": hist} if hist else None
+    if src.get("mvrv"):
+        hist = [r for r in upto(src["mvrv"]["history"]) if r.get("mvrv") is not None]
+        out["mvrv"] = {"current": {"date": hist[-1]["date"], "value": hist[-1]["mvrv"],
+                                   "status": mvrv_status(hist[-1]["mvrv"])},
+                       "history": hist} if hist else None
+    if src.get("bmri"):
+        histories = {h: upto(src["bmri"][h]["history"]) for h in ("1m", "6m") if h in src["bmri"]}
+        out["bmri"] = bmri_build_output(histories, updated_at=day) if histories.get("1m") else None
+    if src.get("btcd"):
+        hist = upto(src["btcd"]["history"])
+        out["btcd"] = {"current": {"date": hist[-1]["date"], "value": hist[-1]["value"],
+                                   "zone": btcd_zone(hist[-1]["value"])},
+                       "history": hist} if hist else None
+    if src.get("governance"):
+        # Proposals open on that day (created/end are unix seconds)
+        ts = datetime.strptime(day, "%Y-%m-%d").replace(tzinfo=TZ).timestamp() + 86399
+        proposals = [dict(p, status="active") for p in src["governance"].get("proposals", [])
+                     if isinstance(p.get("created"), (int, float)) and isinstance(p.get("end"), (int, float))
+                     and p["created"] <= ts <= p["end"]]
+        out["governance"] = {**src["governance"], "proposals": proposals}
+    return out
+
+
+def collect_data(as_of=None, sources=None):
+    """Collect all data needed for the poster.
+
+    as_of: YYYY-MM-DD to rebuild the poster from history as it stood on that day
+    (default: today, using the `current` blocks).
+    """
+    sources = sources or load_sources()
+    if as_of:
+        now = datetime.strptime(as_of, "%Y-%m-%d").replace(tzinfo=TZ)
+        sources = sources_as_of(sources, as_of)
+    else:
+        now = datetime.now(TZ)
     data = {"date": now}
 
     # --- AHR999 ---
-    ahr = load_json(INDICATORS / "ahr999.json")
+    ahr = sources["ahr999"]
     if ahr:
         c = ahr["current"]
-        h = ahr.get("history", [])
-        # 7d price change
+        s = load_series(ahr.get("history", []), "close", "ahr999")
+        # 7d price change（按日期回看，缺天也不会错位）
         p_now = c["price"]
-        p_7d = h[-8]["close"] if len(h) > 7 else h[0]["close"]
-        price_chg_7d = (p_now - p_7d) / p_7d * 100
+        price_chg_7d = s["close"].change(7, date=c.get("date"), value=p_now)
         # 7d ahr change
         a_now = c["value"]
-        a_7d = h[-8]["ahr999"] if len(h) > 7 else h[0]["ahr999"]
-        ahr_chg_7d = (a_now - a_7d) / a_7d * 100
+        ahr_chg_7d = s["ahr999"].change(7, date=c.get("date"), value=a_now)
         # Price deviation from fitted (use 3D version if available)
         fitted_3d = c.get("fitted_price_v2", c["fitted_price"])
         deviation = (p_now - fitted_3d) / fitted_3d * 100
@@ -69,7 +161,7 @@ def collect_data():
         data["btc"] = {
             "price": p_now,
             "price_chg_7d": price_chg_7d,
-            "prices_7d": [x["close"] for x in h[-7:]],
+            "prices_7d": s["close"].recent(7),
         }
         data["ahr999"] = {
             "value": a_now,
@@ -83,26 +175,19 @@ def collect_data():
         }
 
     # --- MVRV ---
-    mvrv = load_json(INDICATORS / "mvrv.json")
+    mvrv = sources["mvrv"]
     if mvrv:
         c = mvrv["current"]
-        h = mvrv.get("history", [])
+        s = load_series(mvrv.get("history", []), "mvrv")["mvrv"]
         m_now = c["value"]
-        m_7d = h[-8]["mvrv"] if len(h) > 7 else h[0]["mvrv"]
-        mvrv_chg_7d = (m_now - m_7d) / m_7d * 100
-        # Historical percentile (rough: what % of history is below current)
-        all_vals = [x["mvrv"] for x in h]
-        percentile = sum(1 for v in all_vals if v < m_now) / len(all_vals) * 100 if all_vals else 50
+        mvrv_chg_7d = s.change(7, date=c.get("date"), value=m_now)
+        # Historical percentile (what % of history is below current)
+        percentile = s.percentile_rank(m_now)
         # Previous cycle same period MVRV
         # Current halving: April 2024. Previous: May 2020.
-        # Compute months since current halving, find same offset in prev cycle
-        halving_current = datetime(2024, 4, 20)
-        halving_prev = datetime(2020, 5, 11)
-        months_since = (now.year - halving_current.year) * 12 + (now.month - halving_current.month)
-        target_date = halving_prev + timedelta(days=months_since * 30.44)
-        target_str = target_date.strftime("%Y-%m")
-        prev_cycle_vals = [x["mvrv"] for x in h if x["date"].startswith(target_str)]
-        prev_cycle_mvrv = round(sum(prev_cycle_vals) / len(prev_cycle_vals), 2) if prev_cycle_vals else PREV_CYCLE_MVRV
+        # Months since current halving, mapped to the same offset in prev cycle (monthly mean)
+        target_str, prev_cycle_avg = s.cycle_aligned(now.strftime("%Y-%m-%d"), "2024-04-20", "2020-05-11")
+        prev_cycle_mvrv = round(prev_cycle_avg, 2) if prev_cycle_avg is not None else PREV_CYCLE_MVRV
 
         data["mvrv"] = {
             "value": m_now,
@@ -114,7 +199,7 @@ def collect_data():
         }
 
     # --- BMRI ---
-    bmri = load_json(INDICATORS / "bmri.json")
+    bmri = sources["bmri"]
     if bmri:
         c = bmri["1m"]["current"]
         data["bmri"] = {
@@ -126,18 +211,14 @@ def collect_data():
         }
 
     # --- FRED macro for BMRI sub-indicators ---
-    fred = load_json(INDICATORS / "shared" / "fred-macro.json")
-    if fred and "series" in fred:
-        s = fred["series"]
-        def last_val(key):
-            d = s.get(key)
-            if not d:
-                return None
-            if isinstance(d, str):
-                d = eval(d)
-            if isinstance(d, dict) and d:
-                return list(d.values())[-1]
-            return None
+    s = sources["fred"]
+    if s is not None:
+        if as_of:
+            # Latest observation on or before that day, however old
+            def last_val(name):
+                return s[name].value(as_of, max_staleness=float("inf")) if name in s else None
+        else:
+            last_val = s.last
         # WALCL is Fed balance sheet in millions; rough M2 proxy
         walcl = last_val("WALCL")
         data["fred"] = {
@@ -148,13 +229,12 @@ def collect_data():
         }
 
     # --- BTC.D ---
-    btcd = load_json(INDICATORS / "btc-dominance.json")
+    btcd = sources["btcd"]
     if btcd:
         c = btcd["current"]
-        h = btcd.get("history", [])
+        s = load_series(btcd.get("history", []), "value")["value"]
         d_now = c["value"]
-        d_7d = h[-8]["value"] if len(h) > 7 else h[0]["value"]
-        btcd_chg_7d = (d_now - d_7d) / d_7d * 100
+        btcd_chg_7d = s.change(7, date=c.get("date"), value=d_now)
         data["btcd"] = {
             "value": d_now,
             "zone": c["zone"],
@@ -162,7 +242,7 @@ def collect_data():
         }
 
     # --- Governance (active + TEV related) ---
-    gov = load_json(TEV_DIR / "data" / "governance.json")
+    gov = sources["governance"]
     if gov:
         active_tev = [p for p in gov.get("proposals", [])
                       if p.get("status") == "active" and p.get("tev_related")]
@@ -178,6 +258,14 @@ def collect_data():
                 "vote_pct": 0,  # We don't have vote data in current JSON
             }
 
+    # Latest indicator date, shown as "Updated ..." on the poster
+    data_dates = [(doc or {}).get("current", {}).get("date", "")
+                  for doc in (sources["ahr999"], sources["mvrv"])]
+    if sources["bmri"]:
+        data_dates.append((sources["bmri"]["1m"]["current"] or {}).get("date", ""))
+    data_dates = sorted(d for d in data_dates if d)
+    data["data_date"] = data_dates[-1] if data_dates else now.strftime("%Y-%m-%d")
+
     return data
 
 
@@ -229,311 +317,316 @@ def btc_sparkline_svg(prices):
       </svg>'''
 
 
+def change_text(v):
+    """7d change label and direction, e.g. ('+1.2% 7d', True)."""
+    return f"{'+' if v >= 0 else ''}{v:.1f}% 7d", v >= 0
+
+
+def mvrv_needle(v):
+    """MVRV needle position (%) on the 32/38/30 zone bar."""
+    if v <= 1:
+        pct = (v / 1) * 32
+    elif v <= 3:
+        pct = 32 + ((v - 1) / 2) * 38
+    else:
+        pct = 70 + ((v - 3) / 1) * 30
+    return max(2, min(98, pct))
+
+
+def gov_end_display(end):
+    if not end:
+        return "进行中"
+    try:
+        # governance.json stores unix seconds; older files used ISO strings
+        end_dt = (datetime.fromtimestamp(end, TZ) if isinstance(end, (int, float))
+                  else datetime.fromisoformat(end))
+        return f"截止 {end_dt.month}月{end_dt.day}日"
+    except Exception:
+        return "进行中"
+
+
+def poster_fields(data):
+    """Everything the poster shows, computed once; render_html() substitutes
+    these into template.html.
+
+    Text fields are final strings; *_pct fields are bar positions in percent.
+    None means the template's sample value stays.
+    """
+    now = data["date"]
+    f = {
+        # Latest date from indicator data files (see collect_data)
+        "updated": data.get("data_date") or now.strftime("%Y-%m-%d"),
+        "day_num": str(now.day),
+        "date_line": f"{MONTHS_EN[now.month]} {now.year} · {DAYS_EN[now.weekday()]}",
+    }
+
+    # --- BTC ---
+    btc = data.get("btc", {})
+    price = btc.get("price", 0)
+    prices_7d = btc.get("prices_7d", [])
+    # BTC MCap estimate (price × ~19.8M supply)
+    mcap = price * BTC_SUPPLY
+    # Total crypto market cap estimate (BTC MCap / BTC.D)
+    btcd_val = data.get("btcd", {}).get("value", 58)
+    total_mcap = mcap / (btcd_val / 100) if btcd_val > 0 else mcap * 1.7
+    f["btc_price"] = f"{price:,.0f}"
+    f["btc_change"], f["btc_up"] = change_text(btc.get("price_chg_7d", 0))
+    f["prices_7d"] = prices_7d
+    f["btc_mcap"] = fmt_mcap(mcap)
+    # vs Gold (BTC MCap / Gold MCap ~$17.1T)
+    f["gold_pct"] = mcap / GOLD_MCAP * 100
+    f["total_mcap"] = fmt_mcap(total_mcap)
+    # We don't have volume / intraday data: 7d low and 7d range instead
+    f["btc_low"] = f["range_lo"] = f["range_hi"] = f["range_pct"] = None
+    if prices_7d:
+        lo, hi = min(prices_7d), max(prices_7d)
+        f["btc_low"] = f["range_lo"] = f"${lo:,.0f}"
+        f["range_hi"] = f"${hi:,.0f}"
+        f["range_pct"] = ((price - lo) / (hi - lo) * 100) if hi > lo else 50
+
+    # --- AHR999 ---
+    ahr = data.get("ahr999", {})
+    ahr_val = ahr.get("value", 0)
+    deviation = ahr.get("deviation", 0)
+    f["ahr_value"] = f"{ahr_val:.2f}"
+    # Needle moves only inside the first (< 0.45) zone
+    f["ahr_needle_pct"] = ahr_val / 0.45 * 100 if ahr_val < 0.45 else None
+    f["ahr_cost"] = fmt_price(ahr.get("cost_200d", 0))
+    f["ahr_fitted"] = fmt_price(ahr.get("fitted_price_v2", ahr.get("fitted_price", 0)))
+    # 偏离度: ↓ 低估=绿=好事，↑ 高估=红
+    f["ahr_dev"] = f"{'↓' if deviation < 0 else '↑'}{abs(deviation):.1f}%"
+    f["ahr_dev_color"] = "#16a34a" if deviation < 0 else "#dc2626"
+    f["ahr_change"], f["ahr_up"] = change_text(ahr.get("chg_7d", 0))
+
+    # --- BMRI ---
+    bmri_val = data.get("bmri", {}).get("value", 50)
+    f["bmri_value"] = f"{bmri_val:.0f}"
+    # M2 from FRED WALCL; factors without data keep the template value
+    fred = data.get("fred", {})
+    dgs10, m2, vix, dxy = (fred.get(k) for k in ("dgs10", "m2", "vix", "dxy"))
+    f["bmri_factors"] = {
+        "10Y": f"{dgs10:.2f}%" if dgs10 is not None else None,
+        "M2": (f"{m2/1e12:.1f}T" if m2 > 1e6 else f"{m2:.1f}T") if m2 is not None else None,
+        "VIX": f"{vix:.1f}" if vix is not None else None,
+        "DXY": f"{dxy:.1f}" if dxy is not None else None,
+    }
+
+    # --- MVRV ---
+    mvrv = data.get("mvrv", {})
+    mvrv_val = mvrv.get("value", 1)
+    f["mvrv_value"] = f"{mvrv_val:.2f}"
+    f["mvrv_percentile"] = f"{mvrv.get('percentile', 50):.0f}%"
+    f["mvrv_prev"] = f"{mvrv.get('prev_cycle', PREV_CYCLE_MVRV):.2f}"
+    f["mvrv_needle_pct"] = mvrv_needle(mvrv_val)
+    f["mvrv_change"], f["mvrv_up"] = change_text(mvrv.get("chg_7d", 0))
+
+    # --- BTC.D ---
+    btcd = data.get("btcd", {})
+    btcd_v = btcd.get("value", 58)
+    eth_pct = max(1, min(30, 100 - btcd_v - 23))
+    alt_pct = max(1, 100 - btcd_v - eth_pct)
+    f["btcd_value"] = f"{btcd_v:.1f}"
+    # (label, bar width %, width as written, market cap)
+    f["btcd_bars"] = [
+        ("BTC", btcd_v, f"{btcd_v:.1f}", fmt_mcap(mcap)),
+        ("ETH", eth_pct, f"{eth_pct:.0f}", fmt_mcap(total_mcap * (eth_pct / 100))),
+        ("ALT", alt_pct, f"{alt_pct:.1f}", fmt_mcap(total_mcap * (alt_pct / 100))),
+    ]
+    f["btcd_change"], f["btcd_up"] = change_text(btcd.get("chg_7d", 0))
+
+    # --- Governance (None hides the card) ---
+    gov = data.get("governance")
+    f["gov"] = {
+        "title": gov["title"],
+        "desc": gov["summary_zh"],
+        "protocol": gov["protocol"],
+        "end": gov_end_display(gov.get("end", "")),
+        "vote_pct": gov.get("vote_pct", 0),
+    } if gov else None
+    return f
+
+
 def render_html(data):
     """Read template and replace all data placeholders."""
     html = TEMPLATE.read_text(encoding="utf-8")
-    now = data["date"]
+    f = poster_fields(data)
 
     # === Logo: relative path from output/ subdir to parent ===
     html = html.replace('src="logo-3d.jpg"', 'src="../logo-3d.jpg"')
 
     # === Update timestamp — show data update date, not current time ===
-    # Use the latest date from indicator data files
-    data_dates = []
-    for key in ["ahr999", "mvrv", "bmri", "btcd"]:
-        d = data.get(key, {})
-        # collect_data stores date in the parent data dict only
-    ahr_data = load_json(INDICATORS / "ahr999.json")
-    if ahr_data:
-        data_dates.append(ahr_data["current"].get("date", ""))
-    mvrv_data = load_json(INDICATORS / "mvrv.json")
-    if mvrv_data:
-        data_dates.append(mvrv_data["current"].get("date", ""))
-    bmri_data = load_json(INDICATORS / "bmri.json")
-    if bmri_data:
-        data_dates.append(bmri_data["1m"]["current"].get("date", ""))
-    # Latest data date
-    data_dates = [d for d in data_dates if d]
-    data_dates.sort()
-    ts_str = data_dates[-1] if data_dates else now.strftime("%Y-%m-%d")
     # Make title-section position:relative, add absolute-right timestamp
     html = html.replace(
         '<div class="title-section">',
         '<div class="title-section" style="position:relative;">'
     )
-    ts_span = f'<span style="position:absolute;right:0;bottom:0;font-family:JetBrains Mono,monospace;font-size:14px;font-weight:500;color:#c4c4cc;">Updated {ts_str}</span>'
+    ts_span = f'<span style="position:absolute;right:0;bottom:0;font-family:JetBrains Mono,monospace;font-size:14px;font-weight:500;color:#c4c4cc;">Updated {f["updated"]}</span>'
     html = html.replace('</div>\n  </div>\n\n  <!-- BTC',
                          f'{ts_span}</div>\n  </div>\n\n  <!-- BTC')
 
     # --- Date ---
-    day_num = str(now.day)
-    month_en = MONTHS_EN[now.month]
-    day_en = DAYS_EN[now.weekday()]
-    date_line = f"{month_en} {now.year} · {day_en}"
-
-    html = re.sub(r'(<span class="title-day">)\d+(<\/span>)', rf'\g<1>{day_num}\2', html)
+    html = re.sub(r'(<span class="title-day">)\d+(<\/span>)', rf'\g<1>{f["day_num"]}\2', html)
     html = re.sub(
         r'(MARCH|JANUARY|FEBRUARY|APRIL|MAY|JUNE|JULY|AUGUST|SEPTEMBER|OCTOBER|NOVEMBER|DECEMBER)\s+\d{4}\s*·\s*\w+DAY',
-        date_line, html
+        f["date_line"], html
     )
 
     # --- BTC ---
-    btc = data.get("btc", {})
-    price = btc.get("price", 0)
-    chg = btc.get("price_chg_7d", 0)
-    chg_cls = "up" if chg >= 0 else "down"
-    chg_sign = "+" if chg >= 0 else ""
-    prices_7d = btc.get("prices_7d", [])
-
     # BTC price
     html = re.sub(
         r'(<div class="btc-price"><span class="btc-dollar">\$</span>)[^<]+(</div>)',
-        rf'\g<1>{price:,.0f}\2', html
+        rf'\g<1>{f["btc_price"]}\2', html
     )
     # BTC change (7d)
     html = re.sub(
         r'<span class="btc-change\s+(up|down)">[^<]+</span>',
-        f'<span class="btc-change {chg_cls}">{chg_sign}{chg:.1f}% 7d</span>', html
+        f'<span class="btc-change {"up" if f["btc_up"] else "down"}">{f["btc_change"]}</span>', html
     )
 
     # BTC sparkline SVG
-    if prices_7d:
-        spark_svg = btc_sparkline_svg(prices_7d)
+    if f["prices_7d"]:
+        spark_svg = btc_sparkline_svg(f["prices_7d"])
         html = re.sub(
             r'(<div class="btc-spark-bg">)[\s\S]*?(</div>\s*<div style="position:relative;z-index:1;">)',
             rf'\1\n      {spark_svg}\n    \2', html
         )
 
-    # BTC MCap estimate (price × ~19.8M supply)
-    btc_supply = 19_800_000
-    mcap = price * btc_supply
-
     # === FIX #2: Vol — we don't have volume data, replace with 7d range ===
-    if prices_7d:
-        lo7, hi7 = min(prices_7d), max(prices_7d)
-        html = re.sub(r'Vol <b>[^<]+</b>', f'7d Low <b>${lo7:,.0f}</b>', html)
-    html = re.sub(r'MCap <b>[^<]+</b>', f'MCap <b>{fmt_mcap(mcap)}</b>', html)
+    if f["btc_low"]:
+        html = re.sub(r'Vol <b>[^<]+</b>', f'7d Low <b>{f["btc_low"]}</b>', html)
+    html = re.sub(r'MCap <b>[^<]+</b>', f'MCap <b>{f["btc_mcap"]}</b>', html)
 
     # 24H Range → 7d Range (we only have daily data)
-    if prices_7d:
-        lo, hi = min(prices_7d), max(prices_7d)
-        rng_pct = ((price - lo) / (hi - lo) * 100) if hi > lo else 50
+    if f["range_pct"] is not None:
         html = re.sub(
             r'(<div class="range-top">[\s\S]*?<span class="range-val">)\$[\d,]+(</span>[\s\S]*?)<span class="range-tag">24h Range</span>([\s\S]*?<span class="range-val">)\$[\d,]+(</span>)',
-            rf'\g<1>${lo:,.0f}\2<span class="range-tag">7D RANGE</span>\3${hi:,.0f}\4', html
+            rf'\g<1>{f["range_lo"]}\2<span class="range-tag">7D RANGE</span>\3{f["range_hi"]}\4', html
         )
-        html = re.sub(r'(<div class="range-dot" style="left:)[\d.]+(%)', rf'\g<1>{rng_pct:.1f}\2', html)
+        html = re.sub(r'(<div class="range-dot" style="left:)[\d.]+(%)', rf'\g<1>{f["range_pct"]:.1f}\2', html)
 
-    # vs Gold (BTC MCap / Gold MCap ~$17.1T)
-    gold_mcap = 17.1e12
-    gold_pct = mcap / gold_mcap * 100
-    html = re.sub(r'(<div class="gold-fill" style="width:)[\d.]+(%)', rf'\g<1>{gold_pct:.1f}\2', html)
-    html = re.sub(r'(<span class="gold-val">)[\d.]+(%)', rf'\g<1>{gold_pct:.1f}\2', html)
+    # vs Gold
+    html = re.sub(r'(<div class="gold-fill" style="width:)[\d.]+(%)', rf'\g<1>{f["gold_pct"]:.1f}\2', html)
+    html = re.sub(r'(<span class="gold-val">)[\d.]+(%)', rf'\g<1>{f["gold_pct"]:.1f}\2', html)
 
-    # Total crypto market cap estimate (BTC MCap / BTC.D)
-    btcd_val = data.get("btcd", {}).get("value", 58)
-    total_mcap = mcap / (btcd_val / 100) if btcd_val > 0 else mcap * 1.7
-    html = re.sub(r'(<div class="mcap-val">)\$[\d.]+T(</div>)', rf'\1{fmt_mcap(total_mcap)}\2', html)
+    # Total crypto market cap
+    html = re.sub(r'(<div class="mcap-val">)\$[\d.]+T(</div>)', rf'\1{f["total_mcap"]}\2', html)
 
     # --- AHR999 ---
-    ahr = data.get("ahr999", {})
-    ahr_val = ahr.get("value", 0)
-    ahr_chg = ahr.get("chg_7d", 0)
-    cost_200d = ahr.get("cost_200d", 0)
-    fitted = ahr.get("fitted_price_v2", ahr.get("fitted_price", 0))
-    deviation = ahr.get("deviation", 0)
-
     # AHR value
     html = re.sub(
         r'(<div class="ahr-value"[^>]*>)[\d.]+(<\/div>)',
-        rf'\g<1>{ahr_val:.2f}\2', html
+        rf'\g<1>{f["ahr_value"]}\2', html
     )
 
     # AHR gauge pointer position
-    if ahr_val < 0.45:
-        needle_in_seg = ahr_val / 0.45
+    if f["ahr_needle_pct"] is not None:
         html = re.sub(
             r'(<div class="zone-seg" style="width:36%;background:rgba\(34,197,94,0\.35\);position:relative;">[\s\S]*?left:)\d+(%)',
-            rf'\g<1>{needle_in_seg * 100:.0f}\2', html, count=1
+            rf'\g<1>{f["ahr_needle_pct"]:.0f}\2', html, count=1
         )
 
     # AHR extras
     html = re.sub(r'(200D 成本</span>\s*<span class="ahr-extra-val">)\$[\d,]+(</span>)',
-                   rf'\g<1>{fmt_price(cost_200d)}\2', html)
+                   rf'\g<1>{f["ahr_cost"]}\2', html)
     html = re.sub(r'(拟合价格</span>\s*<span class="ahr-extra-val">)\$[\d,]+(</span>)',
-                   rf'\g<1>{fmt_price(fitted)}\2', html)
+                   rf'\g<1>{f["ahr_fitted"]}\2', html)
 
-    # === FIX #1: 偏离度 — 加箭头让语义更清晰（↓ 低估=绿=好事，↑ 高估=红） ===
-    dev_arrow = "↓" if deviation < 0 else "↑"
-    dev_color = "#16a34a" if deviation < 0 else "#dc2626"
+    # === FIX #1: 偏离度 — 加箭头让语义更清晰 ===
     html = re.sub(
         r'(偏离度</span>\s*<span class="ahr-extra-val"[^>]*>)[^<]+(</span>)',
-        rf'\g<1>{dev_arrow}{abs(deviation):.1f}%\2', html
+        rf'\g<1>{f["ahr_dev"]}\2', html
     )
     html = re.sub(
         r'(偏离度</span>\s*<span class="ahr-extra-val" style="color:)[^"]+(")',
-        rf'\g<1>{dev_color}\2', html
+        rf'\g<1>{f["ahr_dev_color"]}\2', html
     )
 
     # AHR 7d change
-    ahr_chg_cls = "up" if ahr_chg >= 0 else "down"
-    ahr_chg_sign = "+" if ahr_chg >= 0 else ""
     html = re.sub(
         r'(card-ahr[\s\S]*?<span class="card-change )(up|down)(">)[^<]+(</span>)',
-        rf'\g<1>{ahr_chg_cls}\3{ahr_chg_sign}{ahr_chg:.1f}% 7d\4', html, count=1
+        rf'\g<1>{"up" if f["ahr_up"] else "down"}\3{f["ahr_change"]}\4', html, count=1
     )
 
     # --- BMRI ---
-    bmri = data.get("bmri", {})
-    bmri_val = bmri.get("value", 50)
-    fred = data.get("fred", {})
+    html = re.sub(r'(<div class="bmri-num"[^>]*>)\d+(<\/div>)', rf'\g<1>{f["bmri_value"]}\2', html)
+    html = re.sub(r'(<div class="bmri-gauge-needle" style="left:)\d+(%)', rf'\g<1>{f["bmri_value"]}\2', html)
 
-    html = re.sub(r'(<div class="bmri-num"[^>]*>)\d+(<\/div>)', rf'\g<1>{bmri_val:.0f}\2', html)
-    html = re.sub(r'(<div class="bmri-gauge-needle" style="left:)\d+(%)', rf'\g<1>{bmri_val:.0f}\2', html)
-
-    # === FIX #7: BMRI sub-factors — use real data, M2 from FRED WALCL ===
-    dgs10 = fred.get("dgs10")
-    vix = fred.get("vix")
-    dxy = fred.get("dxy")
-    m2 = fred.get("m2")
-
-    factor_replacements = []
-    if dgs10 is not None:
-        factor_replacements.append(("10Y", f"{dgs10:.2f}%"))
-    if m2 is not None:
-        factor_replacements.append(("M2", f"{m2/1e12:.1f}T" if m2 > 1e6 else f"{m2:.1f}T"))
-    if vix is not None:
-        factor_replacements.append(("VIX", f"{vix:.1f}"))
-    if dxy is not None:
-        factor_replacements.append(("DXY", f"{dxy:.1f}"))
-
-    for label, new_val in factor_replacements:
+    # === FIX #7: BMRI sub-factors — use real data ===
+    for label, new_val in f["bmri_factors"].items():
+        if new_val is None:
+            continue
         html = re.sub(
             rf'(<div class="bmri-fv">)[^<]+(</div>\s*<div class="bmri-fn">{label}</div>)',
             rf'\g<1>{new_val}\2', html
         )
 
     # --- MVRV ---
-    mvrv = data.get("mvrv", {})
-    mvrv_val = mvrv.get("value", 1)
-    mvrv_chg = mvrv.get("chg_7d", 0)
-    mvrv_pct = mvrv.get("percentile", 50)
-    mvrv_prev = mvrv.get("prev_cycle", PREV_CYCLE_MVRV)
-
-    html = re.sub(r'(<div class="mvrv-value">)[\d.]+(<\/div>)', rf'\g<1>{mvrv_val:.2f}\2', html)
+    html = re.sub(r'(<div class="mvrv-value">)[\d.]+(<\/div>)', rf'\g<1>{f["mvrv_value"]}\2', html)
 
     # MVRV percentile
     html = re.sub(
         r'(<div class="mvrv-chip-val">)\d+%(</div>\s*<div class="mvrv-chip-label">历史百分位)',
-        rf'\g<1>{mvrv_pct:.0f}%\2', html
+        rf'\g<1>{f["mvrv_percentile"]}\2', html
     )
 
     # === FIX #3: MVRV 上轮同期 — use real calculated value ===
     html = re.sub(
         r'(<div class="mvrv-chip-val">)[\d.]+(<\/div>\s*<div class="mvrv-chip-label">上轮同期)',
-        rf'\g<1>{mvrv_prev:.2f}\2', html
+        rf'\g<1>{f["mvrv_prev"]}\2', html
     )
 
-    # MVRV gauge pointer position
-    if mvrv_val <= 1:
-        mvrv_needle_pct = (mvrv_val / 1) * 32
-    elif mvrv_val <= 3:
-        mvrv_needle_pct = 32 + ((mvrv_val - 1) / 2) * 38
-    else:
-        mvrv_needle_pct = 70 + ((mvrv_val - 3) / 1) * 30
-    mvrv_needle_pct = max(2, min(98, mvrv_needle_pct))
-
     # Replace needle position: it's inside the first zone-seg as absolute positioned div
     # We need to set left instead of right for precise positioning
     html = re.sub(
         r'(card-mvrv[\s\S]*?<div class="zone-seg" style="width:32%;background:rgba\(34,197,94,0\.2\);position:relative;">[\s\S]*?style="position:absolute;)(right:\d+)(;top:-5px)',
-        rf'\g<1>left:{mvrv_needle_pct:.0f}%\3', html, count=1
+        rf'\g<1>left:{f["mvrv_needle_pct"]:.0f}%\3', html, count=1
     )
 
     # MVRV 7d change
-    mvrv_chg_cls = "up" if mvrv_chg >= 0 else "down"
-    mvrv_chg_sign = "+" if mvrv_chg >= 0 else ""
     html = re.sub(
         r'(card-mvrv[\s\S]*?<span class="card-change )(up|down)(">)[^<]+(</span>)',
-        rf'\g<1>{mvrv_chg_cls}\3{mvrv_chg_sign}{mvrv_chg:.1f}% 7d\4', html, count=1
+        rf'\g<1>{"up" if f["mvrv_up"] else "down"}\3{f["mvrv_change"]}\4', html, count=1
     )
 
     # --- BTC.D ---
-    btcd_data = data.get("btcd", {})
-    btcd_v = btcd_data.get("value", 58)
-    btcd_chg = btcd_data.get("chg_7d", 0)
-    eth_pct = max(1, min(30, 100 - btcd_v - 23))
-    alt_pct = max(1, 100 - btcd_v - eth_pct)
-
-    html = re.sub(r'(<span class="btcd-num">)[\d.]+(<\/span>)', rf'\g<1>{btcd_v:.1f}\2', html)
+    html = re.sub(r'(<span class="btcd-num">)[\d.]+(<\/span>)', rf'\g<1>{f["btcd_value"]}\2', html)
 
     # BTC.D bars + market caps
-    html = re.sub(
-        r'(BTC</span>[\s\S]*?<div class="btcd-bar-fill" style="width:)[\d.]+(%)',
-        rf'\g<1>{btcd_v:.1f}\2', html, count=1
-    )
-    html = re.sub(
-        r'(BTC</span>[\s\S]*?<span class="btcd-bar-val">)\$[\d.]+T(<\/span>)',
-        rf'\g<1>{fmt_mcap(mcap)}\2', html, count=1
-    )
-
-    eth_mcap = total_mcap * (eth_pct / 100)
-    html = re.sub(
-        r'(ETH</span>[\s\S]*?<div class="btcd-bar-fill" style="width:)[\d.]+(%)',
-        rf'\g<1>{eth_pct:.0f}\2', html, count=1
-    )
-    html = re.sub(
-        r'(ETH</span>[\s\S]*?<span class="btcd-bar-val">)\$[\d.]+T(<\/span>)',
-        rf'\g<1>{fmt_mcap(eth_mcap)}\2', html, count=1
-    )
-
-    alt_mcap = total_mcap * (alt_pct / 100)
-    html = re.sub(
-        r'(ALT</span>[\s\S]*?<div class="btcd-bar-fill" style="width:)[\d.]+(%)',
-        rf'\g<1>{alt_pct:.1f}\2', html, count=1
-    )
-    html = re.sub(
-        r'(ALT</span>[\s\S]*?<span class="btcd-bar-val">)\$[\d.]+T(<\/span>)',
-        rf'\g<1>{fmt_mcap(alt_mcap)}\2', html, count=1
-    )
+    for label, _, width, mcap_str in f["btcd_bars"]:
+        html = re.sub(
+            rf'({label}</span>[\s\S]*?<div class="btcd-bar-fill" style="width:)[\d.]+(%)',
+            rf'\g<1>{width}\2', html, count=1
+        )
+        html = re.sub(
+            rf'({label}</span>[\s\S]*?<span class="btcd-bar-val">)\$[\d.]+T(<\/span>)',
+            rf'\g<1>{mcap_str}\2', html, count=1
+        )
 
     # BTC.D 7d change
-    btcd_chg_cls = "up" if btcd_chg >= 0 else "down"
-    btcd_chg_sign = "+" if btcd_chg >= 0 else ""
     html = re.sub(
         r'(card-btcd[\s\S]*?<span class="card-change )(up|down)(">)[^<]+(</span>)',
-        rf'\g<1>{btcd_chg_cls}\3{btcd_chg_sign}{btcd_chg:.1f}% 7d\4', html, count=1
+        rf'\g<1>{"up" if f["btcd_up"] else "down"}\3{f["btcd_change"]}\4', html, count=1
     )
 
     # --- Governance ---
-    gov = data.get("governance")
+    gov = f["gov"]
     if gov:
         # === FIX #8: 治理投票进度 — 无数据时隐藏投票条，只显示状态 ===
         html = re.sub(r'(\[ARFC\] 激活 Aave Buyback 回购机制)', gov["title"], html)
         html = re.sub(
             r'(<div class="gov-desc">)[^<]+(</div>)',
-            rf'\g<1>{gov["summary_zh"]}\2', html
+            rf'\g<1>{gov["desc"]}\2', html
         )
         html = re.sub(
             r'(<span class="gov-protocol">)[^<]+(</span>)',
             rf'\g<1>{gov["protocol"]}\2', html
         )
-        end_str = gov.get("end", "")
-        if end_str:
-            try:
-                end_dt = datetime.fromisoformat(end_str)
-                end_display = f"截止 {end_dt.month}月{end_dt.day}日"
-            except Exception:
-                end_display = "进行中"
-        else:
-            end_display = "进行中"
         html = re.sub(
             r'(<span class="gov-detail">)[^<]+(</span>)',
-            rf'\g<1>{end_display}\2', html
+            rf'\g<1>{gov["end"]}\2', html
         )
         # Hide vote bar + label if no vote data (keep gov-status-row structure intact)
-        vote_pct = gov.get("vote_pct", 0)
-        if not vote_pct:
+        if not gov["vote_pct"]:
             html = re.sub(
                 r'<div class="gov-vote-inline">[\s\S]*?<div class="gov-vote-label">[^<]*</div>\s*</div>',
                 '', html, count=1
@@ -634,15 +727,14 @@ def render_html(data):
 
 
 async def screenshot(html_path, png_path):
-    """Take screenshot with Playwright."""
-    from playwright.async_api import async_playwright
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        page = await browser.new_page(viewport={"width": 1080, "height": 1920})
-        await page.goto(f"file://{html_path}")
-        await page.wait_for_timeout(2000)  # Wait for fonts to load
-        await page.screenshot(path=str(png_path), type="png")
-        await browser.close()
+    """Take screenshot via the shared render service (scripts/render-service.py).
+
+    Falls back to a one-shot browser when the service is not running; either way
+    readiness is fonts + images loaded, not a fixed sleep.
+    """
+    result = await render_screenshot(html_path, png_path, viewport={"width": 1080, "height": 1920}, fmt="png")
+    note = ", readiness timed out" if result.get("timeout") else ""
+    print(f"  ({result['via']}, {result['ms']}ms{note})")
 
 
 def load_env_key(key):
@@ -695,75 +787,30 @@ def save_to_archive(comment):
     COMMENTS_ARCHIVE.write_text(json.dumps(archive, ensure_ascii=False, indent=2))
 
 
-def build_trend_context():
-    """Build monthly trend (4 years) + weekly detail for all indicators.
-    Returns a string block to inject into the AI prompt."""
-    from collections import defaultdict
+TREND_SECTIONS = [("ahr999", "AHR999"), ("mvrv", "MVRV"), ("btc-dominance", "BTC.D"), ("bmri-6m", "BMRI")]
 
-    lines = []
 
-    # --- Helper: aggregate monthly from history ---
-    def monthly_agg(history, val_key, years=4):
-        cutoff = (datetime.now(TZ) - timedelta(days=years * 365)).strftime("%Y-%m")
-        months = defaultdict(list)
-        for h in history:
-            m = h["date"][:7]
-            if m >= cutoff:
-                v = h.get(val_key)
-                if v is not None:
-                    months[m].append(v)
-        result = []
-        for m in sorted(months):
-            vals = months[m]
-            result.append(f"{m}: avg={sum(vals)/len(vals):.2f}, min={min(vals):.2f}, max={max(vals):.2f}")
-        return result
-
-    def weekly_detail(history, val_key, n=7):
-        recent = history[-n:] if len(history) >= n else history
-        return [f"{h['date']}: {h.get(val_key, 'N/A')}" for h in recent]
+def build_trend_context():
+    """Build monthly trend (4 years) + weekly detail for all indicators.
+    Returns a string block to inject into the AI prompt.
 
-    # --- AHR999 ---
-    ahr = load_json(INDICATORS / "ahr999.json")
-    if ahr and ahr.get("history"):
-        h = ahr["history"]
-        lines.append("【AHR999 月度趋势（近4年）】")
-        lines.extend(monthly_agg(h, "ahr999"))
-        lines.append("【AHR999 近7天】")
-        lines.extend(weekly_detail(h, "ahr999"))
-        lines.append("")
+    Uses the monthly aggregates in indicators/data/trend-monthly.json. Every call
+    recomputes all months from the indicator files (tens of ms) and rewrites the file
+    only when it changed, so revised older rows and today's values both show up."""
+    trend, _ = update_trend(path=INDICATORS / "trend-monthly.json", data_dir=INDICATORS)
+    cutoff = (datetime.now(TZ) - timedelta(days=4 * 365)).strftime("%Y-%m")
 
-    # --- MVRV ---
-    mvrv = load_json(INDICATORS / "mvrv.json")
-    if mvrv and mvrv.get("history"):
-        h = mvrv["history"]
-        lines.append("【MVRV 月度趋势（近4年）】")
-        lines.extend(monthly_agg(h, "mvrv"))
-        lines.append("【MVRV 近7天】")
-        lines.extend(weekly_detail(h, "mvrv"))
-        lines.append("")
-
-    # --- BTC.D ---
-    btcd = load_json(INDICATORS / "btc-dominance.json")
-    if btcd and btcd.get("history"):
-        h = btcd["history"]
-        lines.append("【BTC.D 月度趋势（近4年）】")
-        lines.extend(monthly_agg(h, "value"))
-        lines.append("【BTC.D 近7天】")
-        lines.extend(weekly_detail(h, "value"))
+    lines = []
+    for name, label in TREND_SECTIONS:
+        entry = trend["datasets"].get(name)
+        if not entry or not entry["recent"]:
+            continue
+        lines.append(f"【{label} 月度趋势（近4年）】")
+        lines.extend(monthly_lines(entry, cutoff))
+        lines.append(f"【{label} 近7天】")
+        lines.extend(f"{day}: {'N/A' if v is None else v}" for day, v in entry["recent"])
         lines.append("")
 
-    # --- BMRI ---
-    bmri = load_json(INDICATORS / "bmri.json")
-    if bmri:
-        # BMRI uses nested structure: 6m.history
-        bh = bmri.get("6m", {}).get("history", [])
-        if bh:
-            lines.append("【BMRI 月度趋势（近4年）】")
-            lines.extend(monthly_agg(bh, "risk"))
-            lines.append("【BMRI 近7天】")
-            lines.extend(weekly_detail(bh, "risk"))
-            lines.append("")
-
     if not lines:
         return ""
     header = "\n\n历史趋势参考（请据此判断当前指标处于历史什么位置，避免把低位小幅反弹误判为上升趋势）：\n"
@@ -771,9 +818,17 @@ def build_trend_context():
 
 
 def self_check_comment(title, body, indicators_context, api_key):
-    """AI self-check: verify comment only uses provided data, no fabrication."""
+    """AI self-check: verify comment only uses provided data, no fabrication.
+
+    Verdicts are cached by (comment, data, model, prompt version); only real
+    model answers are stored, never the pass-on-error fallback."""
     import subprocess, tempfile
 
+    fp = llm_cache.fingerprint(title, body, indicators_context, model=LLM_MODEL, version=CHECK_PROMPT_VERSION)
+    cached = llm_cache.load("self-check", fp)
+    if cached is not None:
+        return {**cached, "cached": True}
+
     check_prompt = f"""你是一个严格的数据审核员。请检查以下 AI 生成的加密市场短评是否存在问题。
 
 【提供给 AI 的原始数据】
@@ -794,7 +849,7 @@ def self_check_comment(title, body, indicators_context, api_key):
 {{"pass": true}} 或 {{"pass": false, "reason": "具体问题描述"}}"""
 
     payload = json.dumps({
-        "model": "glm-4.6",
+        "model": LLM_MODEL,
         "messages": [{"role": "user", "content": check_prompt}],
         "temperature": 0.1,
         "max_tokens": 4000,
@@ -823,7 +878,7 @@ def self_check_comment(title, body, indicators_context, api_key):
             import re
             json_match = re.search(r'\{[^}]+\}', content)
             if json_match:
-                return json.loads(json_match.group())
+                return llm_cache.store("self-check", fp, json.loads(json_match.group()))
         return {"pass": True}  # If check fails, don't block
     except Exception as e:
         print(f"  [WARN] Self-check error: {e}")
@@ -840,7 +895,7 @@ def retry_comment_with_feedback(original_prompt, feedback, api_key):
 请严格修正以上问题，重新生成短评。记住：只能使用上面提供的数据，禁止编造任何未提供的数据。"""
 
     payload = json.dumps({
-        "model": "glm-4.6",
+        "model": LLM_MODEL,
         "messages": [{"role": "user", "content": retry_prompt}],
         "temperature": 0.7,
         "max_tokens": 16000,
@@ -873,10 +928,21 @@ def retry_comment_with_feedback(original_prompt, feedback, api_key):
         return None
 
 
+def comment_stages(timer, cache, fp):
+    """Stage latency block stored with the comment JSON."""
+    return {"cache": cache, "fingerprint": fp, "ms": timer.as_dict(), "total_ms": round(timer.total * 1000, 1)}
+
+
 def generate_comment(data):
-    """Generate AI daily comment using GLM-5."""
+    """Generate AI daily comment using GLM-5.
+
+    The finished comment is cached under a fingerprint of the full prompt (data
+    snapshot + trend/news/governance/history context), model and prompt version,
+    so re-runs on the same data skip every LLM call. Per-stage latency goes into
+    comment["stages"]."""
     import subprocess, tempfile
 
+    timer = StageTimer()
     api_key = load_env_key("ZHIPUAI_API_KEY")
     if not api_key:
         print("[WARN] No ZHIPUAI_API_KEY, skipping comment")
@@ -945,7 +1011,9 @@ def generate_comment(data):
             pass
 
     # Load historical comments for continuity
-    history = load_comment_history(3)
+    # Today's own earlier comment is not "history": keeps the prompt stable across re-runs
+    today = data["date"].strftime("%Y-%m-%d")
+    history = [h for h in load_comment_history(4) if h.get("date") != today][:3]
     history_context = ""
     used_angles = []
     if history:
@@ -956,7 +1024,8 @@ def generate_comment(data):
         history_context = "\n\n你最近几天写的短评（保持风格连贯，但【必须换全新视角】）：\n" + "\n\n".join(lines)
         history_context += f"\n\n⚠️ 以上短评已用过的角度，今天【绝对禁止】再用类似主题。必须选一个完全不同的切入点。"
 
-    trend_context = build_trend_context()
+    with timer.stage("trend"):
+        trend_context = build_trend_context()
 
     prompt = f"""{indicators}{trend_context}{gov_context}{news_context}{history_context}
 
@@ -1007,8 +1076,14 @@ E. 事件驱动（重大新闻、治理提案、监管动态）
 - 不要用 markdown 格式
 - 不要加任何网站链接"""
 
+    fp = llm_cache.fingerprint(prompt, model=LLM_MODEL, version=COMMENT_PROMPT_VERSION)
+    cached = llm_cache.load("comment", fp)
+    if cached is not None:
+        print(f"  ♻️ 输入未变，复用缓存的点评 ({fp})")
+        return {**cached, "date": today, "stages": comment_stages(timer, "hit", fp)}
+
     payload = json.dumps({
-        "model": "glm-4.6",
+        "model": LLM_MODEL,
         "messages": [{"role": "user", "content": prompt}],
         "temperature": 0.7,
         "max_tokens": 16000,
@@ -1022,13 +1097,14 @@ E. 事件驱动（重大新闻、治理提案、监管动态）
         tmp.write(payload)
         tmp.close()
         try:
-            result = subprocess.run([
-                'curl', '-s', '--proxy', 'http://127.0.0.1:7890', 'https://open.bigmodel.cn/api/coding/paas/v4/chat/completions',
-                '-H', f'Authorization: Bearer {api_key}',
-                '-H', 'Content-Type: application/json',
-                '-d', f'@{tmp.name}',
-                '--max-time', '120',
-            ], capture_output=True, text=True, timeout=150)
+            with timer.stage("generate"):
+                result = subprocess.run([
+                    'curl', '-s', '--proxy', 'http://127.0.0.1:7890', 'https://open.bigmodel.cn/api/coding/paas/v4/chat/completions',
+                    '-H', f'Authorization: Bearer {api_key}',
+                    '-H', 'Content-Type: application/json',
+                    '-d', f'@{tmp.name}',
+                    '--max-time', '120',
+                ], capture_output=True, text=True, timeout=150)
         finally:
             Path(tmp.name).unlink(missing_ok=True)
 
@@ -1043,19 +1119,20 @@ E. 事件驱动（重大新闻、治理提案、监管动态）
             print(f"[WARN] Empty content, finish_reason={resp.get('choices',[{}])[0].get('finish_reason','?')}")
             # Retry GLM-5.1 once more
             print(f"[INFO] Retrying GLM-5.1...")
-            import time; time.sleep(3)
+            time.sleep(3)
             try:
                 tmp_retry = tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False, encoding='utf-8')
                 tmp_retry.write(payload)
                 tmp_retry.close()
                 try:
-                    result2 = subprocess.run([
-                        'curl', '-s', '--proxy', 'http://127.0.0.1:7890', 'https://open.bigmodel.cn/api/coding/paas/v4/chat/completions',
-                        '-H', f'Authorization: Bearer {api_key}',
-                        '-H', 'Content-Type: application/json',
-                        '-d', f'@{tmp_retry.name}',
-                        '--max-time', '120',
-                    ], capture_output=True, text=True, timeout=150)
+                    with timer.stage("generate (empty retry)"):
+                        result2 = subprocess.run([
+                            'curl', '-s', '--proxy', 'http://127.0.0.1:7890', 'https://open.bigmodel.cn/api/coding/paas/v4/chat/completions',
+                            '-H', f'Authorization: Bearer {api_key}',
+                            '-H', 'Content-Type: application/json',
+                            '-d', f'@{tmp_retry.name}',
+                            '--max-time', '120',
+                        ], capture_output=True, text=True, timeout=150)
                 finally:
                     Path(tmp_retry.name).unlink(missing_ok=True)
                 if result2.returncode == 0:
@@ -1074,17 +1151,22 @@ E. 事件驱动（重大新闻、治理提案、监管动态）
 
         # === Self-check loop ===
         max_retries = 5
+        passed = False
         for attempt in range(max_retries):
-            check_result = self_check_comment(title, body, indicators, api_key)
+            with timer.stage(f"self_check #{attempt + 1}"):
+                check_result = self_check_comment(title, body, indicators, api_key)
             if check_result["pass"]:
-                print(f"  ✅ 自检通过 (第{attempt+1}轮)")
+                cached_note = "，缓存" if check_result.get("cached") else ""
+                print(f"  ✅ 自检通过 (第{attempt+1}轮{cached_note})")
+                passed = True
                 break
             else:
                 reason = check_result.get("reason", "未知原因")
                 print(f"  ❌ 自检未通过 (第{attempt+1}轮): {reason}")
                 if attempt < max_retries - 1:
                     print(f"  🔄 重新生成...")
-                    retry_content = retry_comment_with_feedback(prompt, reason, api_key)
+                    with timer.stage(f"retry #{attempt + 1}"):
+                        retry_content = retry_comment_with_feedback(prompt, reason, api_key)
                     if retry_content:
                         r_lines = retry_content.split("\n")
                         title = r_lines[0].strip()
@@ -1105,7 +1187,7 @@ E. 事件驱动（重大新闻、治理提案、监管动态）
                     except Exception as e:
                         print(f"  [WARN] TG 通知失败: {e}")
 
-        comment = {"title": title, "body": body, "date": data["date"].strftime("%Y-%m-%d")}
+        comment = {"title": title, "body": body, "date": today}
 
         # Generate English version
         print("  Generating English version...")
@@ -1119,7 +1201,7 @@ Chinese version:
 
 {body}"""
         en_payload = json.dumps({
-            "model": "glm-4.6",
+            "model": LLM_MODEL,
             "messages": [{"role": "user", "content": en_prompt}],
             "temperature": 0.3,
             "max_tokens": 8000,
@@ -1129,13 +1211,14 @@ Chinese version:
         tmp_en.write(en_payload)
         tmp_en.close()
         try:
-            result_en = subprocess.run([
-                'curl', '-s', '--proxy', 'http://127.0.0.1:7890', 'https://open.bigmodel.cn/api/coding/paas/v4/chat/completions',
-                '-H', f'Authorization: Bearer {api_key}',
-                '-H', 'Content-Type: application/json',
-                '-d', f'@{tmp_en.name}',
-                '--max-time', '120',
-            ], capture_output=True, text=True, timeout=70)
+            with timer.stage("translate"):
+                result_en = subprocess.run([
+                    'curl', '-s', '--proxy', 'http://127.0.0.1:7890', 'https://open.bigmodel.cn/api/coding/paas/v4/chat/completions',
+                    '-H', f'Authorization: Bearer {api_key}',
+                    '-H', 'Content-Type: application/json',
+                    '-d', f'@{tmp_en.name}',
+                    '--max-time', '120',
+                ], capture_output=True, text=True, timeout=70)
             if result_en.returncode == 0:
                 resp_en = json.loads(result_en.stdout)
                 en_content = (resp_en.get("choices", [{}])[0].get("message", {}).get("content") or "").strip()
@@ -1149,6 +1232,10 @@ Chinese version:
         finally:
             Path(tmp_en.name).unlink(missing_ok=True)
 
+        # Only a comment that passed the self-check and got its English version is worth replaying
+        if passed and "body_en" in comment:
+            llm_cache.store("comment", fp, {k: v for k, v in comment.items() if k != "date"})
+        comment["stages"] = comment_stages(timer, "miss", fp)
         return comment
 
     except Exception as e:
@@ -1156,7 +1243,88 @@ Chinese version:
         return None
 
 
-async def main():
+_WORKER_SOURCES = None
+
+
+def _init_worker(sources):
+    global _WORKER_SOURCES
+    _WORKER_SOURCES = sources
+
+
+def render_day(day):
+    """Backfill worker: rebuild one day's data and write its HTML → html path."""
+    html = render_html(collect_data(as_of=day, sources=_WORKER_SOURCES))
+    html_path = OUTPUT_DIR / f"{day}.html"
+    html_path.write_text(html, encoding="utf-8")
+    return str(html_path)
+
+
+def date_range(start, end):
+    d0 = datetime.strptime(start, "%Y-%m-%d")
+    d1 = datetime.strptime(end, "%Y-%m-%d")
+    return [(d0 + timedelta(days=i)).strftime("%Y-%m-%d") for i in range((d1 - d0).days + 1)]
+
+
+async def backfill(days, jobs=None, pages=4):
+    """Render archive posters for past dates: HTML in a process pool, screenshots batched."""
+    t0 = time.perf_counter()
+    sources = load_sources()
+    jobs = max(1, min(jobs or os.cpu_count() or 1, len(days)))
+    print(f"[1/2] Rendering HTML for {len(days)} day(s) ({days[0]} ~ {days[-1]}, {jobs} workers)...")
+    if jobs == 1:
+        _init_worker(sources)
+        html_paths = [render_day(d) for d in days]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(sources,)) as pool:
+            html_paths = list(pool.map(render_day, days, chunksize=max(1, len(days) // (jobs * 4))))
+    t1 = time.perf_counter()
+    print(f"  → {len(html_paths)} HTML ({t1 - t0:.1f}s)")
+
+    print(f"[2/2] Taking screenshots ({pages} pages)...")
+    done = [0]
+
+    def progress(i, result):
+        done[0] += 1
+        if not result.get("ok"):
+            print(f"  ✗ {days[i]}: {result.get('error')}")
+        elif done[0] % 25 == 0 or done[0] == len(days):
+            print(f"  {done[0]}/{len(days)}")
+
+    render_jobs = [{"html_path": p, "output": p[:-len(".html")] + ".png", "viewport": {"width": 1080, "height": 1920}}
+                   for p in html_paths]
+    results = await render_many(render_jobs, pages=pages, on_done=progress)
+    failed = [d for d, r in zip(days, results) if not r.get("ok")]
+    print(f"\nDone! {len(days) - len(failed)}/{len(days)} posters in {time.perf_counter() - t0:.1f}s "
+          f"(HTML {t1 - t0:.1f}s, screenshots {time.perf_counter() - t1:.1f}s)")
+    if failed:
+        print(f"Failed: {', '.join(failed)}")
+    return str(OUTPUT_DIR)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Crypto3D daily poster")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--as-of", metavar="DATE", help="rebuild one past day from history (YYYY-MM-DD)")
+    mode.add_argument("--range", nargs=2, metavar=("START", "END"), help="backfill every day in [START, END]")
+    parser.add_argument("-j", "--jobs", type=int, help="HTML worker processes (default: CPU count)")
+    parser.add_argument("--pages", type=int, default=4, help="browser pages for batched screenshots")
+    args = parser.parse_args(argv)
+    for day in ([args.as_of] if args.as_of else args.range or []):
+        try:
+            datetime.strptime(day, "%Y-%m-%d")
+        except ValueError:
+            parser.error(f"invalid date: {day}")
+    if args.range and args.range[0] > args.range[1]:
+        parser.error("--range START must not be after END")
+    return args
+
+
+async def main(args=None):
+    args = args or parse_args()
+    if args.as_of or args.range:
+        days = [args.as_of] if args.as_of else date_range(*args.range)
+        return await backfill(days, args.jobs, args.pages)
+
     print("[1/5] Collecting data...")
     data = collect_data()
 
@@ -1182,6 +1350,9 @@ async def main():
     if comment:
         print(f"  Title: {comment['title']}")
         print(f"  Body: {comment['body'][:80]}...")
+        stages = comment["stages"]
+        print(f"  Stages ({stages['cache']}): " + ", ".join(f"{k} {v:.0f}ms" for k, v in stages["ms"].items())
+              + f" | total {stages['total_ms']:.0f}ms")
     else:
         print("  Skipped")
 
@@ -1201,7 +1372,7 @@ async def main():
     if comment:
         comment_path.write_text(json.dumps(comment, ensure_ascii=False, indent=2))
         (SCRIPT_DIR / "comment.json").write_text(json.dumps(comment, ensure_ascii=False, indent=2))
-        save_to_archive(comment)
+        save_to_archive({k: v for k, v in comment.items() if k != "stages"})
         print(f"  → {comment_path}")
         print(f"  → archive ({len(load_comment_history(100))} total)")
 
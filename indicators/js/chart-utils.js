@@ -372,6 +372,30 @@ function toggleScaleMode(chart, isLogScale, labelElementId = 'scale-label', pric
   return newIsLog;
 }
 
+/**
+ * 重画图表后恢复用户切换过的系列显隐和坐标模式（渐进加载换成完整历史时用）
+ * @param {object} chart - lightweight-charts 实例
+ * @param {object} series - 系列对象映射
+ * @param {object} seriesVisible - 可见性状态映射
+ * @param {object} options - { zones: 关联区域（同 toggleSeriesVisibility）, isLogScale, priceScaleIds }
+ */
+function restoreChartState(chart, series, seriesVisible, { zones = null, isLogScale = true, priceScaleIds = ['right'] } = {}) {
+  Object.keys(series).forEach(name => {
+    if (!(name in seriesVisible) || !series[name]) return;
+    series[name].applyOptions({ visible: seriesVisible[name] });
+    if (zones && name in zones) {
+      Object.values(zones[name] || {}).forEach(zone => {
+        if (zone) zone.applyOptions({ visible: seriesVisible[name] });
+      });
+    }
+  });
+  if (!isLogScale) {
+    priceScaleIds.forEach(id => {
+      chart.priceScale(id).applyOptions({ mode: LightweightCharts.PriceScaleMode.Normal });
+    });
+  }
+}
+
 /**
  * 构建数据查找表
  * @param {Array} history - 历史数据数组
@@ -453,6 +477,195 @@ const LangUtils = {
   }
 };
 
+/**
+ * 列式 history（schema 2，见 scripts/lib/columnar.py）→ 行数组；行数组原样返回
+ * 第 i 行日期 = 上一行 + step，gaps 里显式给出例外行的日期；null 字段不输出
+ * @param {Array|object} history
+ * @returns {Array} [{ date, ...fields }]
+ */
+function decodeColumnar(history) {
+  if (Array.isArray(history) || !history || history.schema !== 2) return history;
+  const step = parseInt(history.step, 10) * 86400000;
+  const gaps = new Map(history.gaps || []);
+  const fields = Object.keys(history.columns);
+  const rows = [];
+  let t = Date.parse(history.start + 'T00:00:00Z');
+  for (let i = 0; i < history.length; i++) {
+    let date;
+    if (i > 0 && gaps.has(i)) {
+      date = gaps.get(i);
+      t = Date.parse(date + 'T00:00:00Z');
+    } else {
+      if (i > 0) t += step;
+      date = new Date(t).toISOString().slice(0, 10);
+    }
+    const row = { date };
+    for (const f of fields) {
+      const v = history.columns[f][i];
+      if (v !== null && v !== undefined) row[f] = v;
+    }
+    rows.push(row);
+  }
+  return rows;
+}
+
+/**
+ * 按 LOD 分层加载指标历史（manifest 见 scripts/lib/lod.py）
+ * overview = monthly 里早于 recent 的月聚合 + recent（最近 12 个月日度，从月初开始），首屏用；
+ * full = 原始文件，用户选 "All" 时再拉。manifest 不存在时退回原始文件。
+ * @param {string} name - 数据集名（ahr999 / mvrv / btc-dominance / bmri-6m ...）
+ * @param {string} tier - 'overview' | 'recent' | 'weekly' | 'monthly' | 'full'
+ * @param {string} base - indicators/data/ 的相对路径
+ * @returns {Promise<object>} { ...顶层字段, history }
+ */
+const _lodCache = {};
+async function loadLodHistory(name, tier = 'overview', base = '../indicators/data/') {
+  const getJson = async (url) => {
+    if (!_lodCache[url]) {
+      _lodCache[url] = fetch(url).then(res => {
+        if (!res.ok) throw new Error(`${url}: ${res.status}`);
+        return res.json();
+      });
+    }
+    return _lodCache[url];
+  };
+
+  let entry = null;
+  try {
+    entry = (await getJson(`${base}lod/manifest.json`)).datasets[name];
+  } catch (e) {
+    entry = null;
+  }
+  if (!entry) {
+    const fallback = name.startsWith('bmri-')
+      ? { source: 'bmri.json', path: [name.slice(5), 'history'] }
+      : { source: `${name}.json`, path: ['history'] };
+    entry = { ...fallback, tiers: {} };
+    tier = 'full';
+  }
+
+  const fileOf = (t) => {
+    const info = entry.tiers[t];
+    return info ? `${base}${info.file}?v=${info.sha256}` : `${base}${entry.source}`;
+  };
+
+  if (tier === 'full') {
+    let node = await getJson(fileOf('full'));
+    const meta = {};
+    for (const key of entry.path.slice(0, -1)) {
+      Object.assign(meta, node);
+      node = node[key];
+    }
+    const last = entry.path[entry.path.length - 1];
+    return last === undefined
+      ? { history: node }
+      : { ...meta, ...node, history: node[last] };
+  }
+  if (tier === 'overview') {
+    const [monthly, recent] = await Promise.all([getJson(fileOf('monthly')), getJson(fileOf('recent'))]);
+    // recent.from 是 recent 的起始月初（稀疏数据的第一行可能晚于它）
+    const dailyFrom = recent.from || (recent.history.length ? recent.history[0].date : undefined);
+    return {
+      ...recent,
+      tier: 'overview',
+      daily_from: dailyFrom,
+      history: [...monthly.history.filter(r => !dailyFrom || r.date < dailyFrom), ...recent.history],
+    };
+  }
+  return getJson(fileOf(tier));
+}
+
+/**
+ * 从年分片拼出完整历史（manifest 见 scripts/lib/yearshard.py）
+ * 历史年份的分片 URL 带内容哈希、可长缓存，日更只会让 manifest 和当年文件失效。
+ * manifest 不存在时退回原始文件。
+ * @param {string} name - 数据集名（ahr999 / mvrv / btc-dominance / bmri-1m / bmri-6m / marketcap）
+ * @param {string} base - indicators/data/ 的相对路径
+ * @returns {Promise<object>} 与原始文件同结构的 { ...顶层字段, history }
+ */
+async function loadShardedHistory(name, base = '../indicators/data/') {
+  let entry = null;
+  try {
+    const res = await fetch(`${base}shards/manifest.json`);
+    if (res.ok) entry = (await res.json()).datasets[name];
+  } catch (e) {
+    entry = null;
+  }
+  if (!entry) return loadLodHistory(name, 'full', base);
+
+  const getJson = async (info) => {
+    const res = await fetch(`${base}shards/${info.file}?v=${info.sha256}`);
+    if (!res.ok) throw new Error(`${info.file}: ${res.status}`);
+    return res.json();
+  };
+  const years = Object.keys(entry.years).sort();
+  const [current, ...past] = await Promise.all([
+    getJson(entry.current),
+    ...years.map(y => getJson(entry.years[y])),
+  ]);
+  const { name: _name, year: _year, history, ...meta } = current;
+  return { ...meta, history: past.flatMap(p => p.history).concat(history) };
+}
+
+/**
+ * lightweight-charts 的时间（'YYYY-MM-DD' / BusinessDay / UTC 秒）→ 'YYYY-MM-DD'
+ */
+function chartTimeToDate(time) {
+  if (typeof time === 'string') return time;
+  if (typeof time === 'number') return new Date(time * 1000).toISOString().slice(0, 10);
+  return `${time.year}-${String(time.month).padStart(2, '0')}-${String(time.day).padStart(2, '0')}`;
+}
+
+/**
+ * 渐进加载: 首屏只拉 LOD overview（更早的月聚合 + 最近 12 个月日度），默认显示日度区间；
+ * 用户把图表拖 / 缩放到日度区间之前，或调用返回的 showAll()（页面的 "All" 按钮），
+ * 才拉完整历史（年分片）并重画。没有 LOD manifest 时 overview 本身就是完整历史。
+ * @param {string[]} names - 数据集名（bmri 页一次要 bmri-1m / bmri-6m / marketcap）
+ * @param {function} render - (datasets: { name: data }, view) => chart（可以是 async）；view = { full, defaultFrom }，
+ *   页面据此更新数据、重画图表（重画前移除旧图表），并以 defaultFrom 作为默认可视起点
+ * @param {object} options - { base: indicators/data/ 的相对路径, optional: 加载失败时给 null 而不报错的数据集名 }
+ * @returns {Promise<object>} { showAll()：切到完整历史并显示全部区间,
+ *   attach(chart)：页面因其它原因重画图表（如切换版本）后重新挂上缩放监听 }
+ */
+async function loadProgressiveHistory(names, render, { base = '../indicators/data/', optional = [] } = {}) {
+  const byName = (list) => Object.fromEntries(names.map((n, i) => [n, list[i]]));
+  const loadAll = (load) => Promise.all(names.map(n => load(n).catch(err => {
+    if (optional.includes(n)) return null;
+    throw err;
+  })));
+  const overview = await loadAll(n => loadLodHistory(n, 'overview', base));
+  const loaded = overview.filter(Boolean);
+  const starts = loaded.map(d => d.daily_from).filter(Boolean).sort();
+  const dailyFrom = loaded.every(d => d.tier === 'overview') ? starts[starts.length - 1] : undefined;
+
+  let chart = await render(byName(overview), { full: !dailyFrom, defaultFrom: dailyFrom });
+  let pending = null;
+  const loadFull = (keepRange) => {
+    if (!pending) {
+      pending = loadAll(n => loadShardedHistory(n, base)).then(async full => {
+        const range = keepRange && chart ? chart.timeScale().getVisibleRange() : null;
+        chart = await render(byName(full), { full: true });
+        // render 里的 setDefaultRange 也是 100ms 后生效，这里排在它之后恢复用户当前的区间
+        if (range) setTimeout(() => chart.timeScale().setVisibleRange(range), 100);
+      });
+    }
+    return pending;
+  };
+
+  const attach = (c) => {
+    if (c) chart = c;
+    if (!dailyFrom || pending || !c) return;
+    c.timeScale().subscribeVisibleTimeRangeChange(range => {
+      if (range && chartTimeToDate(range.from) < dailyFrom) loadFull(true);
+    });
+  };
+  attach(chart);
+  return {
+    showAll: () => (dailyFrom ? loadFull(false) : Promise.resolve()),
+    attach,
+  };
+}
+
 // 导出 (兼容 ES modules、Node.js 和浏览器全局变量)
 if (typeof module !== 'undefined' && module.exports) {
   module.exports = {
@@ -468,8 +681,14 @@ if (typeof module !== 'undefined' && module.exports) {
     createThresholdLine,
     toggleSeriesVisibility,
     toggleScaleMode,
+    restoreChartState,
     buildHistoryLookup,
     deepMerge,
+    decodeColumnar,
+    loadLodHistory,
+    loadShardedHistory,
+    loadProgressiveHistory,
+    chartTimeToDate,
     LangUtils,
   };
 }
@@ -488,7 +707,13 @@ if (typeof window !== 'undefined') {
   window.createThresholdLine = createThresholdLine;
   window.toggleSeriesVisibility = toggleSeriesVisibility;
   window.toggleScaleMode = toggleScaleMode;
+  window.restoreChartState = restoreChartState;
   window.buildHistoryLookup = buildHistoryLookup;
   window.deepMerge = deepMerge;
+  window.decodeColumnar = decodeColumnar;
+  window.loadLodHistory = loadLodHistory;
+  window.loadShardedHistory = loadShardedHistory;
+  window.loadProgressiveHistory = loadProgressiveHistory;
+  window.chartTimeToDate = chartTimeToDate;
   window.LangUtils = LangUtils;
 }
@@ -48,7 +48,7 @@
   }).catch(function(){});
 
   // Load AHR999
-  fetch('./indicators/data/ahr999.json').then(function(r){return r.json()}).then(function(d){
+  fetch('./indicators/data/lod/ahr999/recent.json').then(function(r){return r.json()}).then(function(d){
     var cur=d.current||{};
     var hist=d.history||[];
     var val=cur.ahr999||hist[hist.length-1]?.ahr999;
@@ -82,7 +82,7 @@
   }).catch(function(){});
 
   // Load MVRV
-  fetch('./indicators/data/mvrv.json').then(function(r){return r.json()}).then(function(d){
+  fetch('./indicators/data/lod/mvrv/recent.json').then(function(r){return r.json()}).then(function(d){
     var cur=d.current||{};
     var hist=d.history||[];
     var val=cur.mvrv||hist[hist.length-1]?.mvrv;
@@ -107,7 +107,7 @@
   }).catch(function(){});
 
   // Load BTC.D
-  fetch('./indicators/data/btc-dominance.json').then(function(r){return r.json()}).then(function(d){
+  fetch('./indicators/data/lod/btc-dominance/recent.json').then(function(r){return r.json()}).then(function(d){
     var cur=d.current||{};
     var hist=d.history||[];
     var val=cur.dominance||cur.value||hist[hist.length-1]?.dominance||hist[hist.length-1]?.value;
@@ -13,7 +13,6 @@ Author: AI Assistant
 import asyncio
 import aiohttp
 import ssl
-import subprocess
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from typing import Dict, List, Optional, Tuple, Any
@@ -23,6 +22,7 @@ import hashlib
 
 from config_manager import get_config_manager
 from logger import get_logger
+from shared_http import HttpClient, get_client
 
 logger = get_logger("cross_exchange_arbitrage")
 
@@ -137,18 +137,12 @@ class PolymarketClient:
         if self.session:
             await self.session.close()
 
-    def _fetch_with_curl(self, url: str) -> Optional[str]:
-        """使用 curl 作为备用方案获取数据"""
+    def _fetch_fallback(self, url: str) -> Optional[str]:
+        """aiohttp 失败时用共享连接池客户端获取数据"""
         try:
-            result = subprocess.run(
-                ["curl", "-s", url],
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            return result.stdout if result.returncode == 0 else None
+            return get_client().get(url, timeout=30).text()
         except Exception as e:
-            logger.error(f"Curl fallback error: {e}")
+            logger.error(f"HTTP fallback error: {e}")
             return None
 
     async def get_markets(self, limit: int = 100, category: str = "") -> List[Dict]:
@@ -163,16 +157,16 @@ class PolymarketClient:
                 if resp.status == 200:
                     data = await resp.json()
         except Exception as e:
-            logger.warning(f"Aiohttp failed, trying curl: {e}")
+            logger.warning(f"Aiohttp failed, trying fallback client: {e}")
 
-        # 如果失败，使用 curl 备用
+        # 如果失败，使用共享客户端备用
         if data is None:
-            raw = self._fetch_with_curl(url)
+            raw = self._fetch_fallback(url)
             if raw:
                 try:
                     data = json.loads(raw)
                 except json.JSONDecodeError:
-                    logger.error("Curl response parse error")
+                    logger.error("Fallback response parse error")
                     return []
 
         if data is None:
@@ -248,6 +242,7 @@ class OpinionClient:
         self.api_host = api_host
         self.api_key = api_key
         self.session: Optional[aiohttp.ClientSession] = None
+        self._insecure_http = HttpClient(verify=False)
 
     async def __aenter__(self):
         # 创建 SSL 上下文
@@ -270,23 +265,15 @@ class OpinionClient:
     async def __aexit__(self, *args):
         if self.session:
             await self.session.close()
+        self._insecure_http.close()
 
-    def _fetch_with_curl(self, url: str) -> Optional[str]:
-        """使用 curl 作为备用方案获取数据"""
+    def _fetch_fallback(self, url: str) -> Optional[str]:
+        """aiohttp 失败时用共享连接池客户端获取数据（忽略 SSL 验证）"""
+        headers = {"apikey": self.api_key} if self.api_key else None
         try:
-            cmd = ["curl", "-s", "-k", url]  # -k 忽略 SSL 验证
-            if self.api_key:
-                cmd.extend(["-H", f"apikey: {self.api_key}"])
-
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
-            return result.stdout if result.returncode == 0 else None
+            return self._insecure_http.get(url, headers=headers, timeout=30).text()
         except Exception as e:
-            logger.error(f"Curl fallback error: {e}")
+            logger.error(f"HTTP fallback error: {e}")
             return None
 
     async def get_markets(self) -> List[Dict]:
@@ -307,14 +294,14 @@ class OpinionClient:
         except Exception as e:
             logger.warning(f"Opinion aiohttp failed: {e}")
 
-        # 如果失败，使用 curl 备用
+        # 如果失败，使用共享客户端备用
         if data is None:
-            raw = self._fetch_with_curl(url)
+            raw = self._fetch_fallback(url)
             if raw:
                 try:
                     data = json.loads(raw)
                 except json.JSONDecodeError:
-                    logger.warning("Opinion curl response parse error")
+                    logger.warning("Opinion fallback response parse error")
 
         # 如果仍然失败，返回模拟数据用于演示
         # 如果 API 不可用，使用模拟数据
@@ -3,13 +3,12 @@
 通知模块 - Telegram 告警
 """
 
-import subprocess
-import json
 from typing import Optional, List, Dict
 from datetime import datetime
 
 from config_manager import get_config_manager
 from logger import get_logger
+from shared_http import get_client
 
 logger = get_logger("notifier")
 
@@ -61,18 +60,9 @@ class TelegramNotifier:
         }
 
         try:
-            result = subprocess.run(
-                [
-                    "curl", "-s", "-X", "POST", url,
-                    "-H", "Content-Type: application/json",
-                    "-d", json.dumps(payload)
-                ],
-                capture_output=True,
-                text=True,
-                timeout=10
-            )
-
-            response = json.loads(result.stdout)
+            response = get_client().post(
+                url, json=payload, timeout=10, retries=1, raise_for_status=False
+            ).json()
 
             if response.get("ok"):
                 logger.info("Telegram 消息发送成功")
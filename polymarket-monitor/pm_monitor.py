@@ -7,7 +7,6 @@ P1: 高确定性分散 - >=98%确定性，分散投资
 P2: 尾盘狙击 - >=95%确定性，6小时内结束
 """
 
-import subprocess
 import json
 from datetime import datetime, timedelta, timezone
 from typing import List, Dict, Optional
@@ -18,6 +17,7 @@ from config_manager import get_config_manager
 from logger import setup_logger
 from notifier import TelegramNotifier
 from pm_strategy import StrategyEngine, StrategyConfig
+from shared_http import get_client
 
 logger = setup_logger("pm_monitor")
 
@@ -41,19 +41,7 @@ def fetch_markets(limit: int = 500) -> List[Dict]:
     url = f"https://gamma-api.polymarket.com/markets?limit={limit}&active=true&closed=false"
 
     try:
-        result = subprocess.run(
-            ["curl", "-s", url],
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-
-        if result.returncode != 0:
-            logger.error("Curl failed")
-            return []
-
-        data = json.loads(result.stdout)
-        return data
+        return get_client().get_json(url, timeout=30)
 
     except Exception as e:
         logger.error(f"Fetch error: {e}")
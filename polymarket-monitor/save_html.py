@@ -3,9 +3,14 @@
 保存并分析 Polymarket HTML
 """
 
+import os
 import subprocess
+import sys
 from datetime import datetime
 
+# 截图走 scripts/lib/render.py 的常驻服务（与 daily-poster 共用一个热浏览器）
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "scripts"))
+
 def save_html():
     """保存 HTML 到文件"""
     print("📡 正在获取并保存 Polymarket HTML...")
@@ -39,6 +44,24 @@ def save_html():
     return filename, filename_short
 
 
+def screenshot_html(filename):
+    """用 render service 给保存的 HTML 截一张图；服务没开就跳过"""
+    from lib.render import request, RenderError
+
+    png = os.path.splitext(filename)[0] + ".png"
+    try:
+        result = request({"html_path": os.path.abspath(filename), "output": os.path.abspath(png),
+                          "viewport": {"width": 1440, "height": 900}, "full_page": True})
+    except (OSError, RenderError) as e:
+        print(f"⚠️ render service 不可用，跳过截图: {e}")
+        return None
+    if not result.get("ok"):
+        print(f"⚠️ 截图失败: {result.get('error')}")
+        return None
+    print(f"✅ 截图已保存到: {png}（{result['ms']}ms）")
+    return png
+
+
 def main():
     print("""
     ╔═══════════════════════════════════════════════════════════╗
@@ -55,6 +78,8 @@ def main():
 
     # 保存 HTML
     full_file, short_file = save_html()
+    if "--screenshot" in sys.argv:
+        screenshot_html(full_file)
 
     print(f"\n📂 HTML 文件已保存！")
     print(f"   完整版: {full_file}")
@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+"""
+共享 HTTP 客户端入口 - 复用 scripts/lib/httpclient.py 的连接池客户端
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "scripts"))
+
+from lib.httpclient import AsyncHttpClient, HttpClient, HttpError, get_client
+
+__all__ = ["AsyncHttpClient", "HttpClient", "HttpError", "get_client"]
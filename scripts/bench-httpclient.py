@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+HTTP 客户端微基准: curl 子进程 vs lib.httpclient 连接池
+
+默认在本机起一个 keep-alive HTTP 服务（离线可跑，只测进程 fork/exec + 连接开销）；
+传 --url 则直接打真实接口（额外包含 TLS 握手差异）。
+
+用法: python3 scripts/bench-httpclient.py [-n 50] [--url https://api.llama.fi/tvl/aave]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from lib.httpclient import HttpClient
+
+PAYLOAD = json.dumps({"date": "2026-01-01", "value": 1.0, "pad": "x" * 2048}).encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(PAYLOAD)))
+        self.end_headers()
+        self.wfile.write(PAYLOAD)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}/bench"
+
+
+def curl_get(url):
+    result = subprocess.run(["curl", "-s", "--compressed", "--max-time", "30", url], capture_output=True)
+    if result.returncode != 0:
+        raise RuntimeError(f"curl exit {result.returncode}")
+    return result.stdout
+
+
+def measure(fn, url, n):
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn(url)
+        samples.append((time.perf_counter() - t0) * 1000)
+    return samples
+
+
+def summarize(name, samples):
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    total = sum(samples)
+    print(f"  {name:22s} total {total:8.1f}ms  median {statistics.median(samples):7.2f}ms  p95 {p95:7.2f}ms")
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description="curl 子进程 vs 连接池客户端")
+    parser.add_argument("-n", type=int, default=50, help="每种方式的请求次数")
+    parser.add_argument("--url", help="真实接口 URL（默认本机服务）")
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if not url:
+        server, url = start_local_server()
+
+    client = HttpClient(retries=0)
+    print(f"🏁 {args.n} 次顺序 GET → {url}")
+    curl_total = summarize("curl subprocess", measure(curl_get, url, args.n))
+    pool_total = summarize("HttpClient (pooled)", measure(lambda u: client.get(u).body, url, args.n))
+    print(f"  → 加速 {curl_total / pool_total:.1f}x")
+
+    client.close()
+    if server:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
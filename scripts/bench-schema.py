@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+指标文件 schema 1（行数组）vs schema 2（列式，lib.columnar）基准: 文件大小 / gzip 后大小 / json.load 耗时
+
+schema 2 另测一次 "load + 解码回行" 的耗时，即读端需要逐行访问时的总成本。
+v2/ 下没有对应文件时在内存里现编码。
+
+用法: python3 scripts/bench-schema.py [-n 20]
+"""
+
+import argparse
+import gzip
+import json
+import os
+import statistics
+import time
+
+from lib.columnar import decode_doc, encode_doc
+from lib.lod import DATA_DIR, DATASETS
+from lib.yearshard import SHARDED, V2_DIR, source_paths
+
+
+def timed(fn, n):
+    samples = []
+    for _ in range(n):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="schema 1 vs 2 基准")
+    parser.add_argument("-n", type=int, default=20, help="每项重复次数（取中位数）")
+    args = parser.parse_args()
+
+    print(f"{'文件':20s} {'v1':>9s} {'v2':>9s} {'v1.gz':>8s} {'v2.gz':>8s} {'load v1':>9s} {'load v2':>9s} {'+解码':>9s}")
+    totals = [0, 0, 0, 0]
+    for source in dict.fromkeys(DATASETS[n][0] for n in SHARDED):
+        path = os.path.join(DATA_DIR, source)
+        if not os.path.exists(path):
+            continue
+        with open(path, "rb") as f:
+            v1 = f.read()
+        v2_path = os.path.join(V2_DIR, source)
+        if os.path.exists(v2_path):
+            with open(v2_path, "rb") as f:
+                v2 = f.read()
+        else:
+            doc = encode_doc(json.loads(v1), source_paths(source))
+            v2 = json.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        paths = source_paths(source)
+        sizes = [len(v1), len(v2), len(gzip.compress(v1)), len(gzip.compress(v2))]
+        totals = [a + b for a, b in zip(totals, sizes)]
+        t1 = timed(lambda: json.loads(v1), args.n)
+        t2 = timed(lambda: json.loads(v2), args.n)
+        t2d = timed(lambda: decode_doc(json.loads(v2), paths), args.n)
+        kb = [f"{s / 1024:.0f}KB" for s in sizes]
+        print(f"{source:20s} {kb[0]:>9s} {kb[1]:>9s} {kb[2]:>8s} {kb[3]:>8s} {t1:>7.1f}ms {t2:>7.1f}ms {t2d:>7.1f}ms")
+    if totals[0]:
+        print(f"\n📊 合计 {totals[0] / 1024:.0f}KB → {totals[1] / 1024:.0f}KB ({totals[1] / totals[0]:.0%})，"
+              f"gzip {totals[2] / 1024:.0f}KB → {totals[3] / 1024:.0f}KB ({totals[3] / totals[2]:.0%})")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
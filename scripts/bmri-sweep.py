@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+bmri-sweep.py - BMRI 参数扫描 / 回测
+
+对 指标组合 × lookback × 桶权重 × 阈值 的网格逐一计算 BMRI，并与 BTC 远期收益对比:
+    ic_{h}d       BMRI 与 h 天远期收益的秩相关
+    spread_{h}d   RISK_ON 日均远期收益 − RISK_OFF 日均远期收益（排名依据，越大越好）
+    on_share / off_share  两种状态的天数占比
+
+各序列的滚动百分位（lib.bmri.percentile_panel）和远期收益只在主进程算一次，
+放进共享内存，进程池里的 worker 直接映射，不再逐个 pickle 大数组。
+指标在样本内、远期窗口互相重叠，只用于相对比较。
+
+用法:
+    python3 scripts/bmri-sweep.py                        # 默认网格
+    python3 scripts/bmri-sweep.py --grid grid.json       # 自定义网格（键同 DEFAULT_GRID，可只给一部分）
+    python3 scripts/bmri-sweep.py --horizon 180 --top 30 -j 8
+"""
+
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from lib.bmri import BUCKETS, HORIZONS, THRESHOLDS, percentile_panel
+from lib.fred import load_fred
+from lib.jsonio import read_json, write_json
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BTC_FILE = os.path.join(BASE_DIR, "indicators", "data", "shared", "btc-price.json")
+REPORT_FILE = os.path.join(BASE_DIR, ".cache", "bmri-sweep.json")
+MAX_PRICE_GAP = 3   # BTC 价格最多向前回溯 3 天
+
+BASE_SET = {b: {"indicators": cfg["indicators"], "invert": cfg["invert"]} for b, cfg in BUCKETS.items()}
+
+
+def _variant(**buckets):
+    out = json.loads(json.dumps(BASE_SET))
+    out.update(buckets)
+    return out
+
+
+DEFAULT_GRID = {
+    "indicator_sets": {
+        "base": BASE_SET,
+        "liq+rrp": _variant(liq={"indicators": ["WALCL", "DTWEXBGS", "RRPONTSYD"], "invert": [False, True, True]}),
+        "liq+rrp_raw": _variant(liq={"indicators": ["WALCL", "DTWEXBGS", "RRPONTSYD"], "invert": [False, True, False]}),
+        "rates_nominal": _variant(rates={"indicators": ["DGS10"], "invert": [True]}),
+        "risk_vix": _variant(risk={"indicators": ["VIXCLS"], "invert": [True]}),
+    },
+    "lookbacks": [126, 252, 504],
+    "weights": [
+        {b: cfg["weight"] for b, cfg in BUCKETS.items()},
+        {"rates": 1 / 3, "liq": 1 / 3, "risk": 1 / 3},
+        {"rates": 0.5, "liq": 0.25, "risk": 0.25},
+        {"rates": 0.25, "liq": 0.5, "risk": 0.25},
+        {"rates": 0.25, "liq": 0.25, "risk": 0.5},
+    ],
+    "thresholds": [[THRESHOLDS["on"], THRESHOLDS["off"]], [25, 75], [20, 80], [40, 60]],
+    "horizons": [30, 90, 180],
+}
+
+
+# ── 共享内存 ──
+
+def _share(arr):
+    shm = shared_memory.SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, dtype=arr.dtype, buffer=shm.buf)[...] = arr
+    return shm, (shm.name, arr.shape, arr.dtype.str)
+
+
+_SHARED = {}
+
+
+def _attach(specs):
+    """worker 初始化: 映射主进程的共享数组（只读）"""
+    for key, (name, shape, dtype) in specs.items():
+        shm = shared_memory.SharedMemory(name=name)
+        arr = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+        arr.flags.writeable = False
+        _SHARED[key] = (shm, arr)
+
+
+# ── 评估 ──
+
+def _rank(x):
+    r = np.empty(len(x))
+    r[np.argsort(x, kind="mergesort")] = np.arange(len(x))
+    return r
+
+
+def spearman(a, b):
+    if len(a) < 3:
+        return None
+    ra, rb = _rank(a), _rank(b)
+    ra -= ra.mean()
+    rb -= rb.mean()
+    denom = np.sqrt((ra * ra).sum() * (rb * rb).sum())
+    return float((ra * rb).sum() / denom) if denom else None
+
+
+def evaluate(task):
+    """task = (set_name, buckets, lookback_idx, lookback, weights, thresholds, horizons, min_share, series_index)"""
+    set_name, buckets, j, lookback, weights, thresholds, horizons, min_share, series_index = task
+    panel = _SHARED["panel"][1]
+    fwd = _SHARED["fwd"][1]
+
+    total = 0.0
+    ok = np.ones(panel.shape[2], dtype=bool)
+    wsum = sum(weights[b] for b in buckets)
+    for bucket, cfg in buckets.items():
+        acc = np.zeros(panel.shape[2])
+        count = np.zeros(panel.shape[2])
+        for name, invert in zip(cfg["indicators"], cfg["invert"]):
+            p = panel[series_index[name], j]
+            has = ~np.isnan(p)
+            acc = np.where(has, acc + (100 - p if invert else p), acc)
+            count += has
+        ok &= count > 0
+        with np.errstate(invalid="ignore", divide="ignore"):
+            total = total + acc / count * (weights[bucket] / wsum)
+
+    rows = []
+    for on, off in thresholds:
+        row = {"set": set_name, "lookback": lookback, "weights": {b: round(weights[b], 4) for b in buckets},
+               "thresholds": [on, off], "days": int(ok.sum())}
+        for h_idx, h in enumerate(horizons):
+            ret = fwd[h_idx]
+            mask = ok & ~np.isnan(ret)
+            bm, r = total[mask], ret[mask]
+            ic = spearman(bm, r)
+            on_m, off_m = bm < on, bm > off
+            on_share = float(on_m.mean()) if len(bm) else 0.0
+            off_share = float(off_m.mean()) if len(bm) else 0.0
+            spread = None
+            if on_share >= min_share and off_share >= min_share:
+                spread = float(r[on_m].mean() - r[off_m].mean())
+            row[f"ic_{h}d"] = round(ic, 4) if ic is not None else None
+            row[f"spread_{h}d"] = round(spread, 4) if spread is not None else None
+            row[f"on_share_{h}d"] = round(on_share, 3)
+            row[f"off_share_{h}d"] = round(off_share, 3)
+        rows.append(row)
+    return rows
+
+
+# ── 主流程 ──
+
+def forward_returns(grid, horizons):
+    """float64[len(horizons), len(grid)]: BTC 在 D → D+h 的收益，缺价为 NaN"""
+    hist = sorted((r["date"], r["price"]) for r in read_json(BTC_FILE)["history"] if r.get("price"))
+    days = np.array([d for d, _ in hist], dtype="datetime64[D]").astype(np.int64)
+    price = np.array([p for _, p in hist], dtype=float)
+    g = np.array(grid, dtype="datetime64[D]").astype(np.int64)
+
+    def at(target):
+        i = np.searchsorted(days, target, side="right") - 1
+        ok = (i >= 0) & (target <= days[-1])
+        ok[ok] = target[ok] - days[i[ok]] <= MAX_PRICE_GAP
+        out = np.full(len(target), np.nan)
+        out[ok] = price[i[ok]]
+        return out
+
+    p0 = at(g)
+    return np.stack([at(g + h) / p0 - 1 for h in horizons])
+
+
+def load_grid(path):
+    grid = dict(DEFAULT_GRID)
+    if path:
+        grid.update(read_json(path))
+    return grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description="BMRI 参数扫描 / 回测")
+    parser.add_argument("--grid", help="网格 JSON（覆盖 DEFAULT_GRID 的对应键）")
+    parser.add_argument("--horizon", type=int, default=90, help="排名用的远期天数（须在 horizons 里）")
+    parser.add_argument("--min-share", type=float, default=0.05, help="RISK_ON / RISK_OFF 最少天数占比")
+    parser.add_argument("--top", type=int, default=20)
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--out", default=REPORT_FILE)
+    args = parser.parse_args()
+
+    grid = load_grid(args.grid)
+    horizons = list(grid["horizons"])
+    if args.horizon not in horizons:
+        parser.error(f"--horizon {args.horizon} 不在 horizons {horizons} 里")
+
+    t0 = time.perf_counter()
+    fred = load_fred()
+    names = sorted({n for s in grid["indicator_sets"].values() for cfg in s.values() for n in cfg["indicators"]})
+    lookbacks = sorted(set(grid["lookbacks"]))
+    dates, panel = percentile_panel(fred, names, lookbacks)
+    fwd = forward_returns(dates, horizons)
+    series_index = {n: i for i, n in enumerate(names)}
+    print(f"📐 {len(names)} 个序列 × {len(lookbacks)} 个 lookback × {len(dates)} 天 "
+          f"({dates[0]} ~ {dates[-1]}, {time.perf_counter() - t0:.2f}s)")
+
+    tasks = [
+        (set_name, buckets, lookbacks.index(lb), lb, weights, grid["thresholds"], horizons, args.min_share,
+         series_index)
+        for (set_name, buckets), lb, weights in itertools.product(
+            grid["indicator_sets"].items(), grid["lookbacks"], grid["weights"])
+    ]
+
+    t1 = time.perf_counter()
+    shm_panel, panel_spec = _share(panel)
+    shm_fwd, fwd_spec = _share(fwd)
+    try:
+        specs = {"panel": panel_spec, "fwd": fwd_spec}
+        with ProcessPoolExecutor(max_workers=args.jobs, initializer=_attach, initargs=(specs,)) as pool:
+            results = [row for rows in pool.map(evaluate, tasks, chunksize=max(1, len(tasks) // (args.jobs * 4)))
+                       for row in rows]
+    finally:
+        for shm in (shm_panel, shm_fwd):
+            shm.close()
+            shm.unlink()
+    print(f"⚙️  {len(results)} 组配置, {args.jobs} 进程 ({time.perf_counter() - t1:.2f}s)")
+
+    key = f"spread_{args.horizon}d"
+    results.sort(key=lambda r: (r[key] is None, -(r[key] or 0), r[f"ic_{args.horizon}d"] or 0))
+    baseline = {"set": "base", "lookback": HORIZONS["1m"],
+                "weights": {b: round(cfg["weight"], 4) for b, cfg in BUCKETS.items()},
+                "thresholds": [THRESHOLDS["on"], THRESHOLDS["off"]]}
+    for rank, row in enumerate(results, 1):
+        row["rank"] = rank
+        row["baseline"] = all(row[k] == v for k, v in baseline.items())
+
+    print(f"\n🏆 按 {key} 排名（RISK_ON − RISK_OFF 远期收益）")
+    print(f"  {'#':>4}  {'set':14s} {'lb':>4}  {'weights r/l/k':15s} {'thr':7s} {key:>11s} "
+          f"{'ic_' + str(args.horizon) + 'd':>8s} {'on%':>5s} {'off%':>5s}")
+    shown = results[:args.top] + [r for r in results[args.top:] if r["baseline"]]
+    for row in shown:
+        w = "/".join(f"{row['weights'][b]:.2f}" for b in ("rates", "liq", "risk"))
+        spread = f"{row[key] * 100:+.1f}%" if row[key] is not None else "—"
+        ic = f"{row[f'ic_{args.horizon}d']:+.3f}" if row[f"ic_{args.horizon}d"] is not None else "—"
+        mark = " ← 当前" if row["baseline"] else ""
+        print(f"  {row['rank']:>4}  {row['set']:14s} {row['lookback']:>4}  {w:15s} "
+              f"{row['thresholds'][0]:>2}/{row['thresholds'][1]:<4} {spread:>11s} {ic:>8s} "
+              f"{row[f'on_share_{args.horizon}d'] * 100:>4.0f}% {row[f'off_share_{args.horizon}d'] * 100:>4.0f}%{mark}")
+
+    write_json(args.out, {"rank_by": key, "start": dates[0], "end": dates[-1], "horizons": horizons,
+                          "min_share": args.min_share, "results": results})
+    print(f"\n✅ 完整报告: {os.path.relpath(args.out)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+build-configs.py - 把 data/all-configs.json 里内嵌的时间序列拆到 data/market-history/ 分片
+
+- 索引里每个条目原样保留（标量字段、文案都不动），只把 market_data 里的时间序列
+  （tvl 数组）移到 data/market-history/{id}/{YYYY}.json，换成 market_history 链接
+- 历史只来自这些序列；config.json 里的标量（如 tvl + tvl_updated）不写进历史，
+  避免用非当天的快照覆盖真实的日度点
+- 索引重新生成（又内嵌了序列）后再跑一次即可；已拆过的索引再跑不会有变化
+
+用法: python3 scripts/build-configs.py [--dry-run]
+"""
+
+import os
+import sys
+
+from lib.configs import CONFIGS_FILE, HISTORY_DIR, history_link, load_configs, split_config, write_history
+from lib.jsonio import dump_json, read_json, write_json
+
+
+def main():
+    dry_run = "--dry-run" in sys.argv
+    index = []
+    for cfg in load_configs():
+        pid = cfg.get("id")
+        slim, series = split_config(cfg)
+        if series and not dry_run:
+            written = write_history(pid, series)
+            if written:
+                print(f"  📈 {pid}: 更新历史分片 {', '.join(written)}")
+        if series or os.path.exists(os.path.join(HISTORY_DIR, pid, "index.json")):
+            slim["market_history"] = history_link(pid)
+        index.append(slim)
+
+    size = len(dump_json(index).encode("utf-8"))
+    if dry_run:
+        print(f"[DRY RUN] all-configs.json: {len(index)} 个协议, {size / 1024:.0f} KB")
+        return
+    if read_json(CONFIGS_FILE) != index:
+        write_json(CONFIGS_FILE, index)
+    print(f"✅ all-configs.json: {len(index)} 个协议, {size / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,24 @@
+#!/usr/bin/env python3
+"""
+build-lod.py - 生成指标历史的 LOD 分层（lib.lod）: indicators/data/lod/{name}/{recent,weekly,monthly}.json + manifest.json
+
+用法: python3 scripts/build-lod.py
+"""
+
+import time
+
+from lib.lod import build_all
+
+
+def main():
+    t0 = time.perf_counter()
+    manifest, written = build_all()
+    for name, entry in manifest["datasets"].items():
+        tiers = entry["tiers"]
+        sizes = " / ".join(f"{tier} {tiers[tier]['bytes'] / 1024:.0f}KB" for tier in ("recent", "weekly", "monthly", "full"))
+        print(f"  📦 {name:14s} {sizes}")
+    print(f"✅ {len(manifest['datasets'])} 个数据集，重写 {len(written)} 个文件 ({time.perf_counter() - t0:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+build-shards.py - 从完整的指标文件重建年分片（lib.yearshard）: indicators/data/shards/
+
+产出脚本（recalc-ahr999 / recalc-bmri-fast / sync-btcd / fetch_marketcap）写文件时会自动同步分片；
+这里用于首次迁移，以及 mvrv.json 这类由外部更新的文件。
+
+用法: python3 scripts/build-shards.py [名称 ...]      # 默认全部: ahr999 mvrv btc-dominance bmri-1m bmri-6m marketcap
+"""
+
+import os
+import sys
+import time
+
+from lib.jsonio import read_json
+from lib.lod import DATA_DIR, DATASETS
+from lib.yearshard import MANIFEST_FILE, SHARDED, shard_source
+
+
+def main():
+    names = sys.argv[1:] or SHARDED
+    unknown = [n for n in names if n not in SHARDED]
+    if unknown:
+        print(f"✗ 未知数据集: {', '.join(unknown)}（可选: {' '.join(SHARDED)}）")
+        return 1
+
+    t0 = time.perf_counter()
+    written = []
+    for source in dict.fromkeys(DATASETS[n][0] for n in names):
+        doc = read_json(os.path.join(DATA_DIR, source))
+        if doc is None:
+            print(f"⚠️ {source} 不存在，跳过")
+            continue
+        written += shard_source(source, doc)
+
+    manifest = read_json(MANIFEST_FILE) or {"datasets": {}}
+    for name in names:
+        entry = manifest["datasets"].get(name)
+        if not entry:
+            continue
+        years = entry["years"]
+        past = sum(e["bytes"] for e in years.values())
+        span = f"{min(years)}~{max(years)}" if years else "-"
+        print(f"  🗂️ {name:14s} 历史 {len(years)} 年 ({span}) {past / 1024:.0f}KB / "
+              f"当年 {entry['current']['rows']} 行 {entry['current']['bytes'] / 1024:.0f}KB")
+    print(f"✅ 重写 {len(written)} 个文件 ({time.perf_counter() - t0:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+build-trend.py - 更新指标月度聚合（lib.trend）: indicators/data/trend-monthly.json
+
+每次重算全部月份（旧行被修订也能同步），内容没变不重写文件。
+
+用法:
+    python3 scripts/build-trend.py              # 全部数据集
+    python3 scripts/build-trend.py ahr999 mvrv  # 只更新指定数据集
+"""
+
+import argparse
+import time
+
+from lib.trend import TREND_FIELDS, update_all
+
+
+def main():
+    parser = argparse.ArgumentParser(description="update indicators/data/trend-monthly.json")
+    parser.add_argument("names", nargs="*", help=f"datasets: {', '.join(TREND_FIELDS)} (default: all)")
+    args = parser.parse_args()
+    unknown = [n for n in args.names if n not in TREND_FIELDS]
+    if unknown:
+        parser.error(f"unknown dataset: {', '.join(unknown)}")
+
+    t0 = time.perf_counter()
+    doc, written = update_all(args.names or None)
+    for name in args.names or TREND_FIELDS:
+        entry = doc["datasets"].get(name)
+        if entry:
+            print(f"  📈 {name:14s} {len(entry['months'])} 个月，截至 {entry['through']}")
+    state = "已更新" if written else "无变化"
+    print(f"✅ trend-monthly.json {state} ({time.perf_counter() - t0:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+convert-schema.py - 指标文件在 schema 1（行数组）和 schema 2（列式，lib.columnar）之间转换
+
+    --to 2   indicators/data/{source} → indicators/data/v2/{source}（迁移，以及 mvrv.json 这类外部更新的文件）
+    --to 1   indicators/data/v2/{source} → indicators/data/{source}（兼容导出: v2 是唯一来源时给旧读端）
+
+产出脚本走 lib.yearshard.write_indicator 时两份会一起写，平时不需要手动跑。
+
+用法: python3 scripts/convert-schema.py --to 2|1 [名称 ...]   # 名称同 lib.yearshard.SHARDED，默认全部
+"""
+
+import argparse
+import json
+import os
+
+from lib.columnar import decode_doc
+from lib.jsonio import read_json
+from lib.lod import DATA_DIR, DATASETS, write_if_changed
+from lib.yearshard import SHARDED, V2_DIR, source_paths, write_v2
+
+
+def main():
+    parser = argparse.ArgumentParser(description="schema 1 ↔ 2 转换")
+    parser.add_argument("--to", type=int, choices=(1, 2), required=True)
+    parser.add_argument("names", nargs="*", default=list(SHARDED))
+    args = parser.parse_args()
+
+    unknown = [n for n in args.names if n not in SHARDED]
+    if unknown:
+        parser.error(f"未知数据集: {', '.join(unknown)}")
+
+    for source in dict.fromkeys(DATASETS[n][0] for n in args.names):
+        src = os.path.join(DATA_DIR if args.to == 2 else V2_DIR, source)
+        doc = read_json(src)
+        if doc is None:
+            print(f"⚠️ {os.path.relpath(src, DATA_DIR)} 不存在，跳过")
+            continue
+        if args.to == 2:
+            changed = write_v2(source, doc)
+            out = os.path.join(V2_DIR, source)
+        else:
+            out = os.path.join(DATA_DIR, source)
+            data = json.dumps(decode_doc(doc, source_paths(source)), ensure_ascii=False).encode("utf-8")
+            changed = write_if_changed(out, data)
+        size = os.path.getsize(out) / 1024
+        print(f"  {'✏️' if changed else '·'} {os.path.relpath(out, DATA_DIR)} ({size:.0f}KB)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+daily-store.py - 日度 TEV 列式存储（lib.dailystore）命令行
+
+用法:
+    python3 scripts/daily-store.py build                         # 从 data/daily 月度 JSON 重建
+    python3 scripts/daily-store.py rank [--days 30]              # 各协议近 N 天 TEV 排名
+    python3 scripts/daily-store.py export aave [--start 2025-01-01] [--end 2025-03-31]
+"""
+
+import argparse
+import sys
+import time
+from datetime import timedelta
+
+import numpy as np
+
+from lib.dailystore import build_store, open_store
+
+
+def cmd_build(args):
+    t0 = time.perf_counter()
+    store = build_store()
+    print(f"✅ {len(store.protocols)} 个协议 × {store.days} 天 → {store.root} ({time.perf_counter() - t0:.2f}s)")
+
+
+def cmd_rank(args):
+    store = open_store()
+    t0 = time.perf_counter()
+    end = store.origin + timedelta(days=store.days - 1)
+    start = end - timedelta(days=args.days - 1)
+    _, protocols, tev = store.panel("daily_tev_usd", start.isoformat(), end.isoformat())
+    totals = np.nansum(tev, axis=1)
+    elapsed = (time.perf_counter() - t0) * 1000
+    print(f"📊 近 {args.days} 天 TEV ({start} → {end}, {elapsed:.1f}ms)")
+    for rank, i in enumerate(np.argsort(-totals), 1):
+        if totals[i] > 0:
+            print(f"  {rank:2d}. {protocols[i]:14s} ${totals[i] / 1e6:10.2f}M")
+
+
+def cmd_export(args):
+    store = open_store()
+    written = store.export_months(args.protocol, args.start, args.end)
+    print(f"✅ {args.protocol}: 重写 {len(written)} 个月度分片 {', '.join(written)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="日度 TEV 列式存储")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("build")
+    rank = sub.add_parser("rank")
+    rank.add_argument("--days", type=int, default=30)
+    export = sub.add_parser("export")
+    export.add_argument("protocol")
+    export.add_argument("--start")
+    export.add_argument("--end")
+    args = parser.parse_args()
+    {"build": cmd_build, "rank": cmd_rank, "export": cmd_export}[args.cmd](args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
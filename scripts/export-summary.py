@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+export-summary.py - 生成 data/protocols-summary.csv（每协议一行）+ data/tvl-history/{id}.csv
+
+- summary 的 tvl 列是最新 TVL: 有历史序列时取最后一个点，没有才用配置里的标量；
+  完整序列写到 tvl-history/{id}.csv（date,tvl_usd）
+- 输入来自 lib.configs: 精简配置索引 + market-history 分片
+- 每行按输入指纹（配置 + 历史索引的 sha256）缓存在 .cache/summary-state.json，
+  指纹没变的行直接复用、对应的 tvl-history 文件不重写
+
+用法: python3 scripts/export-summary.py [--force]
+"""
+
+import csv
+import hashlib
+import io
+import json
+import os
+import sys
+from datetime import datetime, timezone
+
+from lib.configs import DATA_DIR, load_configs, load_history_index, load_market_history
+from lib.jsonio import atomic_write_bytes, read_json, write_json
+
+BASE_DIR = os.path.dirname(DATA_DIR)
+SUMMARY_FILE = os.path.join(DATA_DIR, "protocols-summary.csv")
+TVL_DIR = os.path.join(DATA_DIR, "tvl-history")
+STATE_FILE = os.path.join(BASE_DIR, ".cache", "summary-state.json")
+
+COLUMNS = ["id", "name", "category", "price_usd", "market_cap", "fees_30d", "revenue_30d",
+           "tvl", "tev_ratio", "confidence", "updated"]
+# build_row 口径变了就加一，缓存的旧行全部重算
+ROW_VERSION = 2
+
+
+def first(*values):
+    for v in values:
+        if v is not None and v != "":
+            return v
+    return ""
+
+
+def fingerprint(cfg):
+    payload = json.dumps([cfg, load_history_index(cfg["id"])], sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def tvl_series(protocol_id):
+    """[(YYYY-MM-DD, value)]，同一天多个点取最后一个"""
+    by_day = {}
+    for ts, value in load_market_history(protocol_id, "tvl"):
+        by_day[datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")] = value
+    return sorted(by_day.items())
+
+
+def write_tvl_history(protocol_id, series):
+    path = os.path.join(TVL_DIR, f"{protocol_id}.csv")
+    if not series:
+        if os.path.exists(path):
+            os.unlink(path)
+        return
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(["date", "tvl_usd"])
+    writer.writerows(series)
+    atomic_write_bytes(path, buf.getvalue().encode("utf-8"))
+
+
+def build_row(cfg, series):
+    md = cfg.get("market_data") or {}
+    metrics = cfg.get("metrics") or {}
+    scalar = md.get("tvl") if isinstance(md.get("tvl"), (int, float)) else None
+    tvl = series[-1][1] if series else first(scalar, md.get("tvl_usd"))
+    return [
+        cfg["id"],
+        cfg.get("name", ""),
+        cfg.get("category", ""),
+        first(md.get("price_usd")),
+        first(md.get("market_cap"), md.get("market_cap_usd"), cfg.get("market_cap_usd")),
+        first(md.get("fees_30d"), metrics.get("trailing_30d_fees_usd")),
+        first(md.get("revenue_30d"), metrics.get("trailing_30d_revenue_usd")),
+        tvl,
+        first(cfg.get("tevRatio")),
+        cfg.get("confidence", ""),
+        first(md.get("snapshot_date"), cfg.get("last_updated")),
+    ]
+
+
+def main():
+    force = "--force" in sys.argv
+    state = {} if force else read_json(STATE_FILE, default={}) or {}
+    rows, fresh, changed = [], {}, []
+    for cfg in sorted(load_configs(), key=lambda c: c["id"]):
+        pid, fp = cfg["id"], fingerprint(cfg)
+        cached = state.get(pid)
+        if cached and cached["fp"] == fp and cached["columns"] == COLUMNS and cached.get("version") == ROW_VERSION:
+            row = cached["row"]
+        else:
+            series = tvl_series(pid)
+            write_tvl_history(pid, series)
+            row = build_row(cfg, series)
+            changed.append(pid)
+        fresh[pid] = {"fp": fp, "columns": COLUMNS, "version": ROW_VERSION, "row": row}
+        rows.append(row)
+
+    buf = io.StringIO()
+    writer = csv.writer(buf, lineterminator="\n")
+    writer.writerow(COLUMNS)
+    writer.writerows(rows)
+    data = buf.getvalue().encode("utf-8")
+    old = open(SUMMARY_FILE, "rb").read() if os.path.exists(SUMMARY_FILE) else None
+    if data != old:
+        atomic_write_bytes(SUMMARY_FILE, data)
+    write_json(STATE_FILE, fresh)
+
+    print(f"✅ protocols-summary.csv: {len(rows)} 行, {len(data) / 1024:.1f} KB"
+          f"（重算 {len(changed)} 行{': ' + ', '.join(changed) if changed else ''}）")
+
+
+if __name__ == "__main__":
+    main()
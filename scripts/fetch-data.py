@@ -3,17 +3,24 @@
 DeFi TEV Dashboard — 批量数据拉取脚本
 从 DefiLlama + CoinGecko API 获取 16 个协议的真实数据
 
-用法: python3 scripts/fetch-data.py [--dry-run] [--protocol compound]
+用法: python3 scripts/fetch-data.py [--dry-run] [--replay] [--protocol compound]
+  --replay  只读本地 HTTP 缓存 (.cache/http)，不访问网络
 """
 
 import json
+import glob
 import os
 import sys
-import time
-import urllib.request
-import urllib.error
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
 
+from lib.httpcache import cached_client
+from lib.httpclient import HttpError
+from lib.jsonio import write_json
+from lib.ratelimit import API_RATE_LIMITS, HostRateLimiter
+from lib.timing import StageTimer
+
 # ── 配置 ──────────────────────────────────────────────
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -99,6 +106,19 @@ PROTOCOLS = {
     },
 }
 
+RATE_LIMITER = HostRateLimiter(API_RATE_LIMITS)
+MAX_WORKERS = 8
+HTTP = cached_client(
+    replay="--replay" in sys.argv,
+    rate_limiter=RATE_LIMITER,
+    backoff=2,
+    max_per_host=MAX_WORKERS,
+    headers={"Accept": "application/json"},
+)
+
+# /coins/markets 单次最多 250 个 id；取 100 保持 URL 长度可控
+CG_MARKETS_BATCH = 100
+
 # TEV 比例 (从 config.json 读取或使用默认值)
 TEV_RATIOS = {
     "compound": 0,       # Fee Switch OFF
@@ -121,54 +141,40 @@ TEV_RATIOS = {
 
 # ── HTTP 工具 ──────────────────────────────────────────
 
-def fetch_json(url, retries=3, delay=2):
-    """HTTP GET → JSON，带重试"""
-    headers = {
-        "User-Agent": "TEV-Dashboard/1.0",
-        "Accept": "application/json",
-    }
-    for attempt in range(retries):
-        try:
-            req = urllib.request.Request(url, headers=headers)
-            with urllib.request.urlopen(req, timeout=30) as resp:
-                return json.loads(resp.read().decode("utf-8"))
-        except urllib.error.HTTPError as e:
-            if e.code == 429:
-                wait = delay * (2 ** attempt)
-                print(f"  ⏳ Rate limited, waiting {wait}s...")
-                time.sleep(wait)
-                continue
-            elif e.code == 404:
-                print(f"  ⚠️ 404 Not Found: {url}")
-                return None
-            else:
-                print(f"  ❌ HTTP {e.code}: {url}")
-                if attempt < retries - 1:
-                    time.sleep(delay)
-                    continue
-                return None
-        except Exception as e:
-            print(f"  ❌ Error: {e}")
-            if attempt < retries - 1:
-                time.sleep(delay)
-                continue
-            return None
+def fetch_json(url, retries=3):
+    """HTTP GET → JSON，带重试 / 限速 / 磁盘缓存，失败返回 None"""
+    try:
+        return HTTP.get_json(url, retries=retries - 1)
+    except HttpError as e:
+        if e.status == 404:
+            print(f"  ⚠️ 404 Not Found: {url}")
+        else:
+            print(f"  ❌ {e}")
+    except ValueError as e:
+        print(f"  ❌ JSON 解析失败: {url}: {e}")
     return None
 
 
 # ── DefiLlama API ─────────────────────────────────────
 
-def fetch_defillama_tvl(tvl_slugs):
-    """获取协议 TVL (合并多个版本)"""
-    total_tvl = 0
-    for slug in tvl_slugs:
-        url = f"https://api.llama.fi/tvl/{slug}"
-        data = fetch_json(url)
-        if data is not None and isinstance(data, (int, float)):
-            total_tvl += data
-            print(f"    TVL [{slug}]: ${data:,.0f}")
-        time.sleep(0.3)
-    return total_tvl
+def fetch_tvl_slug(slug):
+    """获取单个 DefiLlama slug 的 TVL，失败返回 None"""
+    data = fetch_json(f"https://api.llama.fi/tvl/{slug}")
+    if data is not None and isinstance(data, (int, float)):
+        print(f"    TVL [{slug}]: ${data:,.0f}")
+        return data
+    return None
+
+
+def fetch_all_tvl(protocols, pool):
+    """并发获取所有协议的 TVL → {protocol_id: total_tvl}"""
+    print(f"\n📈 正在并发获取 TVL...")
+    slugs = sorted({slug for cfg in protocols.values() for slug in cfg["tvl_slugs"]})
+    slug_tvl = dict(zip(slugs, pool.map(fetch_tvl_slug, slugs)))
+    return {
+        pid: sum(slug_tvl.get(slug) or 0 for slug in cfg["tvl_slugs"])
+        for pid, cfg in protocols.items()
+    }
 
 
 def fetch_defillama_fees_bulk():
@@ -234,15 +240,75 @@ def fetch_coingecko(coingecko_id):
     }
 
 
+def _market_row_to_cg(row):
+    """/coins/markets 行 → 与 fetch_coingecko 相同的字段结构"""
+    return {
+        "price_usd": row.get("current_price"),
+        "market_cap_usd": row.get("market_cap"),
+        "circulating_supply": row.get("circulating_supply"),
+        "total_supply": row.get("total_supply"),
+        "fdv_usd": row.get("fully_diluted_valuation"),
+        "price_change_24h_pct": row.get("price_change_percentage_24h"),
+        "ath_usd": row.get("ath"),
+    }
+
+
+def fetch_coingecko_markets(coingecko_ids):
+    """批量获取市场数据: 每 CG_MARKETS_BATCH 个 id 一次 /coins/markets → {coingecko_id: cg_data}"""
+    ids = sorted(set(coingecko_ids))
+    result = {}
+    for i in range(0, len(ids), CG_MARKETS_BATCH):
+        chunk = ids[i:i + CG_MARKETS_BATCH]
+        query = urllib.parse.urlencode({
+            "vs_currency": "usd",
+            "ids": ",".join(chunk),
+            "per_page": len(chunk),
+            "page": 1,
+        })
+        rows = fetch_json(f"https://api.coingecko.com/api/v3/coins/markets?{query}")
+        if not isinstance(rows, list):
+            print(f"  ⚠️ /coins/markets 批量请求失败 ({len(chunk)} 个 id)")
+            continue
+        for row in rows:
+            if row.get("id"):
+                result[row["id"]] = _market_row_to_cg(row)
+    print(f"  ✅ CoinGecko 批量获取 {len(result)}/{len(ids)} 个代币")
+    return result
+
+
+def config_coingecko_ids():
+    """data/protocols/*/config.json 中的 token.coingecko_id → {protocol_id: coingecko_id}"""
+    ids = {}
+    for path in sorted(glob.glob(os.path.join(DATA_DIR, "protocols", "*", "config.json"))):
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                cg_id = json.load(f).get("token", {}).get("coingecko_id")
+        except (OSError, ValueError):
+            continue
+        if cg_id:
+            ids[os.path.basename(os.path.dirname(path))] = cg_id
+    return ids
+
+
+def fetch_all_coingecko(id_map):
+    """{protocol_id: coingecko_id} → {protocol_id: cg_data | None}
+
+    先走批量 /coins/markets，批量结果里缺失的 id 再逐个回退到 /coins/{id}。
+    """
+    print(f"\n🪙 正在批量获取代币数据...")
+    by_id = fetch_coingecko_markets(id_map.values())
+    for cg_id in sorted(set(id_map.values()) - set(by_id)):
+        print(f"  ↪️ 批量结果缺失 {cg_id}，回退单币接口")
+        by_id[cg_id] = fetch_coingecko(cg_id)
+    return {pid: by_id.get(cg_id) for pid, cg_id in id_map.items()}
+
+
 # ── 数据写入 ──────────────────────────────────────────
 
 def write_latest_json(protocol_id, data):
     """写入 data/daily/{protocol}/latest.json"""
-    dir_path = os.path.join(DATA_DIR, "daily", protocol_id)
-    os.makedirs(dir_path, exist_ok=True)
-    file_path = os.path.join(dir_path, "latest.json")
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+    file_path = os.path.join(DATA_DIR, "daily", protocol_id, "latest.json")
+    write_json(file_path, data)
     print(f"  💾 写入 {file_path}")
 
 
@@ -270,15 +336,14 @@ def update_config_json(protocol_id, cg_data):
     if updated:
         config["token"] = token
         config["last_updated"] = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-        with open(config_path, "w", encoding="utf-8") as f:
-            json.dump(config, f, indent=2, ensure_ascii=False)
+        write_json(config_path, config)
         print(f"  📝 更新 config.json (supply 数据)")
 
 
 # ── 主逻辑 ────────────────────────────────────────────
 
-def process_protocol(protocol_id, cfg, fee_map, dry_run=False):
-    """处理单个协议"""
+def process_protocol(protocol_id, cfg, fee_map, tvl, cg, dry_run=False):
+    """处理单个协议（TVL / 代币数据已由并发阶段预取）"""
     print(f"\n{'='*60}")
     print(f"🔄 处理: {protocol_id}")
     print(f"{'='*60}")
@@ -287,8 +352,6 @@ def process_protocol(protocol_id, cfg, fee_map, dry_run=False):
     tev_ratio = TEV_RATIOS.get(protocol_id, 0)
 
     # 1. DefiLlama TVL
-    print("  📈 获取 TVL...")
-    tvl = fetch_defillama_tvl(cfg["tvl_slugs"])
     print(f"  → 总 TVL: ${tvl:,.0f}")
 
     # 2. DefiLlama Fees (从预加载的数据中提取)
@@ -297,9 +360,6 @@ def process_protocol(protocol_id, cfg, fee_map, dry_run=False):
     print(f"  → 30d 费用: ${fees['total30d']:,.0f}")
 
     # 3. CoinGecko (价格/市值/供应量)
-    print("  🪙 获取代币数据...")
-    time.sleep(6)  # CoinGecko free tier: 10-30 req/min, 保守等待
-    cg = fetch_coingecko(cfg["coingecko_id"])
     if cg:
         print(f"  → 价格: ${cg['price_usd']}")
         print(f"  → 市值: ${cg['market_cap_usd']:,.0f}" if cg['market_cap_usd'] else "  → 市值: N/A")
@@ -377,26 +437,45 @@ def main():
     if dry_run:
         print("🏃 DRY RUN 模式 — 不写入文件")
 
-    # 预加载 DefiLlama 费用数据
-    fee_map = fetch_defillama_fees_bulk()
-    if not fee_map:
-        print("❌ 无法获取费用数据，退出")
-        sys.exit(1)
-
     protocols_to_process = {target: PROTOCOLS[target]} if target and target in PROTOCOLS else PROTOCOLS
     results = {}
     total = len(protocols_to_process)
+    timer = StageTimer()
+
+    # CoinGecko id: PROTOCOLS + 其余 config.json 里登记的代币（只补 supply 字段）
+    cg_ids = {pid: cfg["coingecko_id"] for pid, cfg in protocols_to_process.items()}
+    if not target:
+        for pid, cg_id in config_coingecko_ids().items():
+            cg_ids.setdefault(pid, cg_id)
+
+    # 并发预取: 费用全量 / TVL / CoinGecko 同时进行，各主机由令牌桶限速
+    with timer.stage("fetch (fees + TVL + CoinGecko)"):
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as pool:
+            fee_future = pool.submit(fetch_defillama_fees_bulk)
+            cg_future = pool.submit(fetch_all_coingecko, cg_ids)
+            tvl_map = fetch_all_tvl(protocols_to_process, pool)
+            cg_map = cg_future.result()
+            fee_map = fee_future.result()
+
+    if not fee_map:
+        print("❌ 无法获取费用数据，退出")
+        sys.exit(1)
 
     print(f"\n🚀 开始处理 {total} 个协议...")
 
-    for i, (pid, cfg) in enumerate(protocols_to_process.items(), 1):
-        print(f"\n[{i}/{total}]", end="")
-        try:
-            result = process_protocol(pid, cfg, fee_map, dry_run)
-            results[pid] = "✅"
-        except Exception as e:
-            print(f"  ❌ 失败: {e}")
-            results[pid] = f"❌ {e}"
+    with timer.stage("process + write"):
+        for i, (pid, cfg) in enumerate(protocols_to_process.items(), 1):
+            print(f"\n[{i}/{total}]", end="")
+            try:
+                process_protocol(pid, cfg, fee_map, tvl_map.get(pid, 0), cg_map.get(pid), dry_run)
+                results[pid] = "✅"
+            except Exception as e:
+                print(f"  ❌ 失败: {e}")
+                results[pid] = f"❌ {e}"
+
+        if not dry_run:
+            for pid in sorted(set(cg_ids) - set(protocols_to_process)):
+                update_config_json(pid, cg_map.get(pid))
 
     # 汇总
     print(f"\n\n{'='*60}")
@@ -405,6 +484,7 @@ def main():
     for pid, status in results.items():
         print(f"  {pid:20s} {status}")
 
+    timer.report()
     print(f"\n⏰ 完成时间: {datetime.now(timezone.utc).isoformat()}")
 
 
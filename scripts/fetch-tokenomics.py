@@ -22,20 +22,31 @@ Strategy:
 Usage:
   python3 scripts/fetch-tokenomics.py           # fetch all protocols
   python3 scripts/fetch-tokenomics.py aave       # fetch single protocol
+  python3 scripts/fetch-tokenomics.py --replay   # serve CMC responses from the local HTTP cache only
 """
 
 import json
 import os
 import sys
-import time
-import urllib.request
-import urllib.error
 from datetime import date
 
+from lib.httpcache import cached_client
+from lib.ratelimit import HostRateLimiter
+
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.dirname(SCRIPT_DIR)
 DATA_DIR = os.path.join(PROJECT_ROOT, "data", "tokenomics")
 
+# Be polite to CMC: at most 2 requests/second (cache hits are not throttled)
+HTTP = cached_client(
+    replay="--replay" in sys.argv,
+    rate_limiter=HostRateLimiter({"api.coinmarketcap.com": (2, 1)}),
+    headers={
+        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)",
+        "Accept": "application/json",
+    },
+)
+
 # Protocol definitions: id -> { cmcSlug, token, known allocation data }
 # Allocation data sourced from project documentation, whitepapers, and public disclosures.
 PROTOCOLS = {
@@ -161,13 +172,8 @@ ALL_PROTOCOL_IDS = [
 def fetch_cmc_supply(slug):
     """Fetch total_supply and circulating_supply from CMC detail endpoint."""
     url = f"https://api.coinmarketcap.com/data-api/v3/cryptocurrency/detail?slug={slug}"
-    req = urllib.request.Request(url, headers={
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)",
-        "Accept": "application/json",
-    })
     try:
-        with urllib.request.urlopen(req, timeout=10) as resp:
-            data = json.loads(resp.read().decode())
+        data = HTTP.get_json(url, timeout=10, retries=0)
         sd = data.get("data", {}).get("supplyDetails", {})
         return {
             "total_supply": sd.get("totalSupply", {}).get("value"),
@@ -229,10 +235,11 @@ def main():
     os.makedirs(DATA_DIR, exist_ok=True)
 
     # Determine which protocols to process
-    if len(sys.argv) > 1:
-        targets = [a for a in sys.argv[1:] if a in ALL_PROTOCOL_IDS]
+    args = [a for a in sys.argv[1:] if a != "--replay"]
+    if args:
+        targets = [a for a in args if a in ALL_PROTOCOL_IDS]
         if not targets:
-            print(f"Unknown protocol(s): {sys.argv[1:]}. Available: {ALL_PROTOCOL_IDS}")
+            print(f"Unknown protocol(s): {args}. Available: {ALL_PROTOCOL_IDS}")
             sys.exit(1)
     else:
         targets = ALL_PROTOCOL_IDS
@@ -254,9 +261,6 @@ def main():
         data = build_protocol_data(pid, cmc_supply)
         save_json(pid, data)
 
-        # Rate limit: be polite to CMC
-        time.sleep(0.5)
-
     print(f"\nDone. Files saved to {DATA_DIR}/")
 
 
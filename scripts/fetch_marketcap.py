@@ -1,10 +1,11 @@
 #!/usr/bin/env python3
 """Fetch BTC and Total crypto market cap from CoinCap API (free, no key needed)"""
-import json
 import requests
 from datetime import datetime
 import time
 
+from lib.yearshard import write_indicator
+
 def fetch_coincap_btc():
     """Fetch BTC market cap history from CoinCap"""
     print("Fetching BTC market cap from CoinCap...")
@@ -63,8 +64,7 @@ def main():
     
     if data:
         output_path = "indicators/data/marketcap.json"
-        with open(output_path, "w") as f:
-            json.dump(data, f)
+        write_indicator("marketcap.json", data, indent=None)
         print(f"Saved {len(data)} records to {output_path}")
     else:
         print("No data fetched")
@@ -0,0 +1,5 @@
+"""
+scripts/lib — 数据脚本共享工具
+
+用法: 从 scripts/ 下运行的脚本直接 `from lib.ratelimit import HostRateLimiter`
+"""
@@ -0,0 +1,195 @@
+"""
+AHR999 计算引擎 — indicators/data/ahr999.json
+
+    cost_200d        最近 200 个收盘价的几何平均（对数累加和差分，一次算完整段历史）
+    fitted_price     幂律拟合价 10^(a·log10(币龄天数) + b)，九神参数
+    fitted_price_v2  同上，全量数据重拟合参数
+    ahr999           (close / cost_200d) × (close / fitted_price)
+    ahr999_3d        (close / cost_200d) × (close / fitted_price_v2)
+
+派生列集中在 COLUMNS 里；新增变体只需在 FITS / COLUMNS 加一个公式，
+全量重建（rebuild）和单日追加（append_day）都会自动带上。
+
+有 indicators/data/shared/ahr999-fit.json（refit-powerlaw.py 生成的自助法重采样）时，
+再加 fitted_p5 / fitted_p50 / fitted_p95 三列拟合价置信带。
+"""
+
+import math
+import os
+from datetime import date as _date
+from datetime import datetime
+
+import numpy as np
+
+from lib import powerlaw
+from lib.jsonio import read_json, write_json
+from lib.yearshard import write_indicator
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+AHR_FILE = os.path.join(BASE_DIR, "indicators", "data", "ahr999.json")
+BTC_PRICE_FILE = os.path.join(BASE_DIR, "indicators", "data", "shared", "btc-price.json")
+FIT_FILE = os.path.join(BASE_DIR, "indicators", "data", "shared", "ahr999-fit.json")
+
+GENESIS = _date(2009, 1, 3)
+COST_WINDOW = 200       # 前 200 个收盘价只做成本窗口预热，不出历史行
+
+# 幂律参数 (a, b)
+FITS = {
+    "fitted_price": (5.84, -17.01),            # 九神原版
+    "fitted_price_v2": (5.5189, -15.8993),     # 全量数据重拟合
+}
+
+# 列名 → (公式, 小数位)；公式参数 c: {"close", "cost_200d", 各拟合价} 的 float64 数组
+COLUMNS = {
+    "ahr999": (lambda c: (c["close"] / c["cost_200d"]) * (c["close"] / c["fitted_price"]), 4),
+    "cost_200d": (lambda c: c["cost_200d"], 2),
+    "fitted_price": (lambda c: c["fitted_price"], 2),
+    "fitted_price_v2": (lambda c: c["fitted_price_v2"], 2),
+    "ahr999_3d": (lambda c: (c["close"] / c["cost_200d"]) * (c["close"] / c["fitted_price_v2"]), 4),
+}
+
+# 拟合价置信带: 列名 → 百分位（保留 2 位小数）
+BAND_COLUMNS = {"fitted_p5": 5, "fitted_p50": 50, "fitted_p95": 95}
+
+# 与页面 getZoneInfo 一致
+ZONES = [(0.45, "抄底区"), (1.2, "定投区")]
+
+
+def status(value):
+    if value < ZONES[0][0]:
+        return ZONES[0][1]
+    if value <= ZONES[1][0]:
+        return ZONES[1][1]
+    return "观望区"
+
+
+def coin_days(dates):
+    """YYYY-MM-DD 数组 → 距创世区块的天数"""
+    return np.asarray(dates, dtype="datetime64[D]").astype(np.int64) - np.datetime64(GENESIS, "D").astype(np.int64)
+
+
+def fitted(dates, a, b):
+    days = coin_days(dates).astype(float)
+    with np.errstate(divide="ignore"):
+        out = 10 ** (a * np.log10(days) + b)
+    return np.where(days > 0, out, 0.0)
+
+
+def rolling_geomean(closes, window=COST_WINDOW):
+    """以每个点结尾的 window 个值的几何平均；不足 window 个时用已有的"""
+    csum = np.concatenate([[0.0], np.cumsum(np.log(closes))])
+    idx = np.arange(1, len(closes) + 1)
+    lo = np.maximum(idx - window, 0)
+    return np.exp((csum[idx] - csum[lo]) / (idx - lo))
+
+
+def load_prices(path=BTC_PRICE_FILE):
+    """btc-price.json → {date: close}"""
+    return {r["date"]: r["price"] for r in (read_json(path) or {}).get("history", []) if r.get("price")}
+
+
+def load_band(path=FIT_FILE):
+    """自助法 (a, b) 重采样 float64[n, 2]；没有拟合文件返回 None"""
+    fit = read_json(path)
+    return np.array(fit["samples"], dtype=float) if fit and fit.get("samples") else None
+
+
+def column_names(band=None):
+    return list(COLUMNS) + (list(BAND_COLUMNS) if band is not None else [])
+
+
+def derive(dates, closes, cost=None, band=None):
+    """所有派生列 → {列名: float64 数组}"""
+    ctx = {"close": closes, "cost_200d": rolling_geomean(closes) if cost is None else cost}
+    for name, (a, b) in FITS.items():
+        ctx[name] = fitted(dates, a, b)
+    cols = {name: formula(ctx) for name, (formula, _) in COLUMNS.items()}
+    if band is not None:
+        qs = powerlaw.band(coin_days(dates), band, list(BAND_COLUMNS.values()))
+        cols.update((name, qs[q]) for name, q in BAND_COLUMNS.items())
+    return cols
+
+
+def _rows(dates, closes, cols):
+    lists = {name: arr.tolist() for name, arr in cols.items()}
+    digits = {name: d for name, (_, d) in COLUMNS.items()}
+    rows = []
+    for i, d in enumerate(dates):
+        row = {"date": d, "close": closes[i]}
+        for name, values in lists.items():
+            row[name] = round(values[i], digits.get(name, 2))
+        rows.append(row)
+    return rows
+
+
+def rebuild(prices, history=(), band=None):
+    """全量重算 → 新 history
+
+    价格源覆盖的日期从收盘价重算全部列（前 COST_WINDOW 个只做预热）；价格源之外的现有行
+    （其他更新器写入、拿不到完整成本窗口）保留 close / cost_200d，其余列按公式重算。
+    """
+    dates = sorted(prices)
+    closes = [prices[d] for d in dates]
+    cols = derive(dates, np.asarray(closes, dtype=float), band=band)
+    rows = {r["date"]: r for r in _rows(dates[COST_WINDOW:], closes[COST_WINDOW:],
+                                        {k: v[COST_WINDOW:] for k, v in cols.items()})}
+
+    extra = [r for r in history if r["date"] not in prices]
+    if extra:
+        closes = [r["close"] for r in extra]
+        cost = np.array([r["cost_200d"] for r in extra], dtype=float)
+        cols = derive([r["date"] for r in extra], np.asarray(closes, dtype=float), cost, band)
+        rows.update((row["date"], row) for row in _rows([r["date"] for r in extra], closes, cols))
+    return [rows[d] for d in sorted(rows)]
+
+
+def append_day(history, day, close, band=None):
+    """单日: 用最近 199 行的 close + 当天收盘算出新行，追加（同日则覆盖）；返回新行"""
+    if history and history[-1]["date"] == day:
+        history.pop()
+    elif history and history[-1]["date"] > day:
+        raise ValueError(f"{day} 早于最后一行 {history[-1]['date']}")
+    window = [r["close"] for r in history[-(COST_WINDOW - 1):]] + [close]
+    closes = np.array(window, dtype=float)
+    cost = np.array([math.exp(np.log(closes).sum() / len(closes))])
+    cols = derive([day], closes[-1:], cost, band)
+    row = _rows([day], [close], cols)[0]
+    history.append(row)
+    return row
+
+
+def current_block(history, price=None, band=None):
+    """current: 默认取最后一行；给了实时价则用它替换当天收盘重算
+
+    成本窗口里只换当天这一项: cost_200d × (price / close)^(1/200)。不从历史 close 重推窗口，
+    外部更新器写的行（cost_200d 不由本仓库的 close 算出）也和该行自身保持一致。"""
+    last = history[-1]
+    if price is None:
+        row = last
+    else:
+        cost = np.array([last["cost_200d"] * (price / last["close"]) ** (1 / COST_WINDOW)])
+        cols = derive([last["date"]], np.array([price], dtype=float), cost, band)
+        row = _rows([last["date"]], [price], cols)[0]
+    out = {"date": row["date"], "value": row["ahr999"], "price": row["close"]}
+    for name in column_names(band):
+        if name != "ahr999" and name in row:
+            out[name] = row[name]
+    out["status"] = status(row["ahr999"])
+    return out
+
+
+def live_price(doc, history):
+    """doc["current"] 里当天的实时价（外部更新脚本写入）；current 不是最后一行那天 → None，用收盘"""
+    current = doc.get("current") or {}
+    if history and current.get("date") == history[-1]["date"]:
+        return current.get("price")
+    return None
+
+
+def save(history, current, path=AHR_FILE):
+    """写 ahr999.json（默认路径时同步年分片）"""
+    doc = {"updated_at": datetime.now().strftime("%Y-%m-%d"), "current": current, "history": history}
+    if path == AHR_FILE:
+        write_indicator("ahr999.json", doc)
+    else:
+        write_json(path, doc)
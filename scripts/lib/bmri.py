@@ -0,0 +1,188 @@
+"""
+BMRI 计算引擎 — 六个 FRED 序列对齐到同一日期网格，一次遍历算出 1m / 6m 两条历史
+
+- 当前值: D 当天或向前最多 7 天内最近的观测（lib.fred 的自然日前向填充索引）
+- 滚动百分位: 窗口 [D - lookback, D] 维护为有序列表，日期前进时 insort / remove，
+  rank 用 bisect_right，不再对每个日期重新排序窗口
+- 浮点运算顺序与 recalc-bmri-fast.py 原实现一致，输出逐值相同
+- 增量: 按月指纹找出 FRED 新增 / 修订的最早月份，只重算该月首日之后的尾部，
+  之前的历史原样保留（窗口从尾部起点重新排序即可，无需持久化）
+"""
+
+import bisect
+import hashlib
+import json
+from datetime import datetime
+
+import numpy as np
+
+from lib.fred import FredIndex, to_day
+
+# 桶配置
+BUCKETS = {
+    "rates": {"weight": 0.35, "indicators": ["DGS10", "DFII10"], "invert": [True, True]},
+    "liq": {"weight": 0.35, "indicators": ["WALCL", "DTWEXBGS"], "invert": [False, True]},
+    "risk": {"weight": 0.30, "indicators": ["VIXCLS", "BAMLH0A0HYM2"], "invert": [True, True]},
+}
+HORIZONS = {"1m": 252, "6m": 504}   # lookback 天数
+THRESHOLDS = {"on": 30, "off": 70}
+START_DATE = "2014-01-01"            # 需要一年以上 lookback
+MIN_POINTS = 20                      # 窗口至少 20 个点
+MAX_STALENESS = 7                    # 当前值最多向前回溯 7 天
+
+
+def as_index(fred):
+    """原始 series 字典或 FredIndex → FredIndex"""
+    return fred if isinstance(fred, FredIndex) else FredIndex(fred, MAX_STALENESS)
+
+
+def date_grid(fred, start=START_DATE):
+    """所有序列日期的并集（>= start，升序）"""
+    return as_index(fred).dates(start)
+
+
+def rolling_percentiles(series, grid, lookbacks):
+    """单个 FredSeries 在网格上的滚动百分位 → {lookback: float64 数组，缺值为 NaN}"""
+    out = {lb: np.full(len(grid), np.nan) for lb in lookbacks}
+    if not len(series) or not grid:
+        return out
+    values = series.obs_values.tolist()
+    days = to_day(grid)
+
+    cur = series.index_at(days)
+    valid = cur >= 0
+    valid[valid] = days[valid] - series.obs_days[cur[valid]] <= MAX_STALENESS
+    hi = cur + 1
+    for lb in lookbacks:
+        # 窗口起点: D - lb 之前最近观测的下一个
+        lo = series.index_at(days - lb - 1) + 1
+        res = out[lb]
+        window, w_lo, w_hi = [], int(lo[0]), int(lo[0])
+        for g in np.flatnonzero(valid).tolist():
+            a, b = int(lo[g]), int(hi[g])
+            if a >= w_hi:
+                window, w_lo, w_hi = sorted(values[a:b]), a, b
+            else:
+                for k in range(w_lo, a):
+                    del window[bisect.bisect_left(window, values[k])]
+                for k in range(w_hi, b):
+                    bisect.insort(window, values[k])
+                w_lo, w_hi = a, b
+            n = len(window)
+            if n < MIN_POINTS:
+                continue
+            res[g] = (bisect.bisect_right(window, values[cur[g]]) / n) * 100
+    return out
+
+
+def percentile_panel(fred, names, lookbacks, start=START_DATE):
+    """→ (grid, float64[len(names), len(lookbacks), len(grid)])，参数扫描共享的对齐数组"""
+    index = as_index(fred)
+    grid = index.dates(start)
+    panel = np.full((len(names), len(lookbacks), len(grid)), np.nan)
+    for i, name in enumerate(names):
+        pct = rolling_percentiles(index[name], grid, lookbacks)
+        for j, lb in enumerate(lookbacks):
+            panel[i, j] = pct[lb]
+    return grid, panel
+
+
+def compute(fred, start=START_DATE, horizons=HORIZONS, buckets=BUCKETS):
+    """→ {horizon: [{date, bmri, rates, liq, risk}, ...]}，只包含三个桶都有值的日期"""
+    index = as_index(fred)
+    grid = index.dates(start)
+    lookbacks = sorted(set(horizons.values()))
+    pct = {name: rolling_percentiles(index[name], grid, lookbacks)
+           for cfg in buckets.values() for name in cfg["indicators"]}
+
+    result = {}
+    for horizon, lb in horizons.items():
+        total = np.zeros(len(grid))
+        ok = np.ones(len(grid), dtype=bool)
+        scores = {}
+        for bucket, cfg in buckets.items():
+            acc = np.zeros(len(grid))
+            count = np.zeros(len(grid))
+            for name, invert in zip(cfg["indicators"], cfg["invert"]):
+                p = pct[name][lb]
+                has = ~np.isnan(p)
+                p = 100 - p if invert else p
+                acc = np.where(has, acc + p, acc)
+                count += has
+            ok &= count > 0
+            with np.errstate(invalid="ignore", divide="ignore"):
+                scores[bucket] = acc / count
+            total = total + scores[bucket] * cfg["weight"]
+        idx = np.flatnonzero(ok).tolist()
+        cols = {b: scores[b][idx].tolist() for b in buckets}
+        bmri = total[idx].tolist()
+        result[horizon] = [
+            {"date": grid[g], "bmri": round(bmri[i], 2),
+             **{b: round(cols[b][i], 1) for b in buckets}}
+            for i, g in enumerate(idx)
+        ]
+    return result
+
+
+def config_fingerprint(horizons=HORIZONS, buckets=BUCKETS):
+    payload = [horizons, buckets, THRESHOLDS, START_DATE, MIN_POINTS, MAX_STALENESS]
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()[:16]
+
+
+def month_fingerprints(fred):
+    """{series: {YYYY-MM: sha256 前 16 位}}，用于检测新增和修订"""
+    out = {}
+    for name, data in fred.items():
+        months = {}
+        for d, v in sorted(data.items()):
+            months.setdefault(d[:7], []).append([d, v])
+        out[name] = {m: hashlib.sha256(json.dumps(rows).encode()).hexdigest()[:16]
+                     for m, rows in months.items()}
+    return out
+
+
+def first_changed(old, new):
+    """两份月指纹中最早不同月份的首日（YYYY-MM-01）；完全相同返回 None"""
+    changed = []
+    for name in set(old) | set(new):
+        a, b = old.get(name, {}), new.get(name, {})
+        changed.extend(m for m in set(a) | set(b) if a.get(m) != b.get(m))
+    return f"{min(changed)}-01" if changed else None
+
+
+def update_tail(fred, histories, since):
+    """保留 date < since 的历史，重算 since 之后的尾部 → (histories, 重算条数)"""
+    tail = compute(fred, start=max(since, START_DATE))
+    merged = {}
+    for horizon, rows in tail.items():
+        kept = [r for r in histories.get(horizon, []) if r["date"] < since]
+        merged[horizon] = kept + rows
+    return merged, sum(len(rows) for rows in tail.values())
+
+
+def regime(value, thresholds=THRESHOLDS):
+    if value < thresholds["on"]:
+        return "RISK_ON"
+    elif value > thresholds["off"]:
+        return "RISK_OFF"
+    return "NEUTRAL"
+
+
+def build_output(histories, updated_at=None):
+    """bmri.json 结构: {updated_at, 1m: {current, thresholds, history}, 6m: {...}}"""
+    output = {"updated_at": updated_at or datetime.now().strftime("%Y-%m-%d")}
+    for horizon, history in histories.items():
+        latest = history[-1] if history else None
+        output[horizon] = {
+            "current": {
+                "value": latest["bmri"],
+                "date": latest["date"],
+                "rates": latest["rates"],
+                "liq": latest["liq"],
+                "risk": latest["risk"],
+                "regime": regime(latest["bmri"]),
+            } if latest else None,
+            "thresholds": dict(THRESHOLDS),
+            "history": history,
+        }
+    return output
@@ -0,0 +1,115 @@
+"""
+指标历史的列式编码（schema 2）
+
+schema 1（现有格式）是行数组，每行重复全部键:
+    [{"date": "2011-02-03", "close": 0.69, "ahr999": 5.1841, ...}, ...]
+
+schema 2 把日期轴和各列拆开:
+    {"schema": 2, "start": "2011-02-03", "end": "2026-08-05", "step": "1d", "length": 5631,
+     "gaps": [[i, "YYYY-MM-DD"], ...],
+     "columns": {"close": [...], "ahr999": [...], ...}}
+
+- 第 i 行的日期 = 上一行日期 + step；不满足的行（缺天、周末、重复日期）在 gaps 里显式给出日期
+- step 取相邻日期差的众数（日度 1d，周度 7d），gap 数量最少
+- 各列与行对齐，某行缺该字段记 null；解码时不输出 null 字段（schema 1 里本来就没有这个键）
+"""
+
+from collections import Counter
+from datetime import date
+
+import numpy as np
+
+from lib.fred import to_day
+
+SCHEMA = 2
+
+
+def _ordinal(day):
+    return date.fromisoformat(day[:10]).toordinal()
+
+
+def encode(rows, step=None):
+    """schema 1 行数组 → schema 2 对象"""
+    rows = sorted((r for r in rows if r.get("date")), key=lambda r: r["date"])
+    days = [_ordinal(r["date"]) for r in rows]
+    if step is None:
+        diffs = Counter(b - a for a, b in zip(days, days[1:]) if b > a)
+        step = diffs.most_common(1)[0][0] if diffs else 1
+    fields = []
+    for row in rows:
+        fields += [k for k in row if k != "date" and k not in fields]
+    return {
+        "schema": SCHEMA,
+        "start": rows[0]["date"] if rows else None,
+        "end": rows[-1]["date"] if rows else None,
+        "step": f"{step}d",
+        "length": len(rows),
+        "gaps": [[i, rows[i]["date"]] for i in range(1, len(rows)) if days[i] != days[i - 1] + step],
+        "columns": {f: [r.get(f) for r in rows] for f in fields},
+    }
+
+
+def dates(doc):
+    """schema 2 对象 → 日期列表"""
+    n = doc["length"]
+    if not n:
+        return []
+    gaps = doc.get("gaps", ())
+    step = int(doc["step"].rstrip("d"))
+    # 每行从最近的锚点（首行或 gap 行）按 step 推算
+    anchors = np.array([0] + [i for i, _ in gaps], dtype=np.int64)
+    anchor_days = to_day([doc["start"]] + [day for _, day in gaps])
+    rows = np.arange(n)
+    k = np.searchsorted(anchors, rows, side="right") - 1
+    days = anchor_days[k] + (rows - anchors[k]) * step
+    out = days.astype("datetime64[D]").astype(str).tolist()
+    # gaps 里的原始字符串原样保留
+    for i, day in gaps:
+        out[i] = day
+    return out
+
+
+def decode(doc):
+    """schema 2 对象 → schema 1 行数组"""
+    fields = list(doc["columns"])
+    rows = []
+    for day, values in zip(dates(doc), zip(*doc["columns"].values())):
+        row = {"date": day}
+        row.update((f, v) for f, v in zip(fields, values) if v is not None)
+        rows.append(row)
+    return rows
+
+
+def is_columnar(history):
+    return isinstance(history, dict) and history.get("schema") == SCHEMA
+
+
+def history_rows(history):
+    """读端统一入口: schema 1 原样返回，schema 2 解码成行"""
+    if isinstance(history, list):
+        return history
+    if is_columnar(history):
+        return decode(history)
+    raise ValueError(f"未知的 history 格式: {type(history).__name__}")
+
+
+def _convert(doc, path, fn):
+    if not path:
+        return fn(doc)
+    out = dict(doc)
+    out[path[0]] = _convert(doc[path[0]], path[1:], fn)
+    return out
+
+
+def encode_doc(doc, paths):
+    """把文档里 paths 指向的各个 history 换成 schema 2（其余字段不动）"""
+    for path in paths:
+        doc = _convert(doc, path, lambda h: h if is_columnar(h) else encode(h))
+    return doc
+
+
+def decode_doc(doc, paths):
+    """encode_doc 的逆操作，导出 schema 1 兼容文件用"""
+    for path in paths:
+        doc = _convert(doc, path, history_rows)
+    return doc
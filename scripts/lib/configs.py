@@ -0,0 +1,142 @@
+"""
+协议配置索引 + 按年分片的 market_data 历史
+
+    data/all-configs.json                   精简索引: 每个协议的配置，market_data 只留标量，
+                                            时间序列换成 market_history 链接
+    data/market-history/{id}/index.json     {id, series: {tvl: {fields}}, shards: [{file, start, end, points}]}
+    data/market-history/{id}/{YYYY}.json    {id, year, series: {tvl: [[unix_ts, value], ...]}}
+
+只要协议列表 / tev_mechanisms 的脚本读 load_configs() 即可，不再解析几 MB 的历史；
+历史由 load_market_history() 按日期区间懒加载，只打开涉及的年份分片。
+"""
+
+import os
+from datetime import datetime, timezone
+
+from lib.jsonio import read_json, write_json
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DATA_DIR = os.path.join(BASE_DIR, "data")
+CONFIGS_FILE = os.path.join(DATA_DIR, "all-configs.json")
+HISTORY_DIR = os.path.join(DATA_DIR, "market-history")
+
+# market_data 里这些序列的点格式（DefiLlama /protocol 的 tvl 数组）
+SERIES_FIELDS = {"tvl": ["date", "totalLiquidityUSD"]}
+
+
+def _year(ts):
+    return datetime.fromtimestamp(ts, tz=timezone.utc).year
+
+
+def to_ts(value):
+    """序列点的时间: unix 秒，或 YYYY-MM-DD 字符串"""
+    if isinstance(value, str):
+        return int(datetime.strptime(value[:10], "%Y-%m-%d").replace(tzinfo=timezone.utc).timestamp())
+    return int(value)
+
+
+# ── 拆分 ──
+
+def split_config(cfg):
+    """→ (精简配置, {序列名: [[ts, value], ...]})；不修改入参"""
+    slim = dict(cfg)
+    market = dict(cfg.get("market_data") or {})
+    series = {}
+    for name, value in list(market.items()):
+        if isinstance(value, list):
+            ts_key, val_key = SERIES_FIELDS.get(name, ["date", "value"])
+            series[name] = [[to_ts(p[ts_key]), p[val_key]] for p in value if isinstance(p, dict)]
+            del market[name]
+    if "market_data" in cfg:
+        slim["market_data"] = market
+    return slim, series
+
+
+def merge_points(old, new):
+    """按时间戳合并两组点，新值覆盖旧值，结果升序"""
+    merged = {ts: v for ts, v in old}
+    merged.update((ts, v) for ts, v in new)
+    return [[ts, merged[ts]] for ts in sorted(merged)]
+
+
+# ── 历史分片 ──
+
+def history_index_path(protocol_id, root=HISTORY_DIR):
+    return os.path.join(root, protocol_id, "index.json")
+
+
+def load_history_index(protocol_id, root=HISTORY_DIR):
+    return read_json(history_index_path(protocol_id, root))
+
+
+def _read_shard(protocol_id, file, root):
+    return read_json(os.path.join(root, protocol_id, file)) or {"series": {}}
+
+
+def write_history(protocol_id, series, root=HISTORY_DIR):
+    """把 series 合并进按年分片；只重写点有变化的年份，返回重写的文件名"""
+    index = load_history_index(protocol_id, root) or {"id": protocol_id, "series": {}, "shards": []}
+    by_year = {}
+    for name, points in series.items():
+        index["series"].setdefault(name, {"fields": SERIES_FIELDS.get(name, ["date", "value"])})
+        for ts, v in points:
+            by_year.setdefault(_year(ts), {}).setdefault(name, []).append([ts, v])
+
+    shards = {s["file"]: s for s in index["shards"]}
+    written = []
+    for year, new in sorted(by_year.items()):
+        file = f"{year}.json"
+        doc = _read_shard(protocol_id, file, root) if file in shards else {"series": {}}
+        changed = False
+        for name, points in new.items():
+            merged = merge_points(doc["series"].get(name, []), points)
+            if merged != doc["series"].get(name):
+                doc["series"][name] = merged
+                changed = True
+        if not changed:
+            continue
+        out = {"id": protocol_id, "year": year, "series": dict(sorted(doc["series"].items()))}
+        write_json(os.path.join(root, protocol_id, file), out, indent=None)
+        all_ts = [ts for pts in out["series"].values() for ts, _ in pts]
+        shards[file] = {"file": file, "start": min(all_ts), "end": max(all_ts), "points": len(all_ts)}
+        written.append(file)
+
+    if written:
+        index["shards"] = [shards[f] for f in sorted(shards)]
+        write_json(history_index_path(protocol_id, root), index)
+    return written
+
+
+def load_market_history(protocol_id, series="tvl", start=None, end=None, root=HISTORY_DIR):
+    """[[ts, value], ...]；start / end 为 unix 秒或 YYYY-MM-DD，只读取区间覆盖的年份分片"""
+    index = load_history_index(protocol_id, root)
+    if not index:
+        return []
+    lo = to_ts(start) if start is not None else None
+    hi = to_ts(end) if end is not None else None
+    points = []
+    for shard in index["shards"]:
+        if (lo is not None and shard["end"] < lo) or (hi is not None and shard["start"] > hi):
+            continue
+        for ts, v in _read_shard(protocol_id, shard["file"], root)["series"].get(series, []):
+            if (lo is None or ts >= lo) and (hi is None or ts <= hi):
+                points.append([ts, v])
+    return points
+
+
+# ── 配置索引 ──
+
+def load_configs(path=CONFIGS_FILE):
+    """精简配置列表（不含历史序列）"""
+    return read_json(path, default=[])
+
+
+def load_config(protocol_id, path=CONFIGS_FILE):
+    for cfg in load_configs(path):
+        if cfg.get("id") == protocol_id:
+            return cfg
+    return None
+
+
+def history_link(protocol_id):
+    return f"data/market-history/{protocol_id}/index.json"
@@ -0,0 +1,151 @@
+"""
+按月分片的日度历史 — data/daily/{protocol}/YYYY-MM.json
+
+    {"protocol", "period", "source", "fetched_at", "record_count", "records": [{date, ...}]}
+
+- upsert_days: 追加 / 覆盖若干天的记录，只改这些天所在的月份分片
+- rebuild_range: 回补时只重写 [start, end] 覆盖的月份，区间外的记录原样保留
+- 内容没变的分片不落盘，老分片保持字节不变（git / CDN diff 最小）
+- 写入走临时文件 + rename，崩溃不会留下半截分片
+- 不混写口径: 分片的 source（生产者）不同，或新记录带来分片里没有的 tev_source，
+  抛 ShardMismatch，不落盘
+"""
+
+import bisect
+import os
+from datetime import datetime, timezone
+
+from lib.jsonio import read_json, write_json
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DAILY_DIR = os.path.join(BASE_DIR, "data", "daily")
+
+
+class ShardMismatch(ValueError):
+    """新记录与分片已有记录的生产者 / TEV 口径不一致"""
+
+
+def _now_iso():
+    # 与 JS new Date().toISOString() 一致: 毫秒 + Z
+    return datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+
+def shard_path(protocol, month, root=DAILY_DIR):
+    return os.path.join(root, protocol, f"{month}.json")
+
+
+def list_months(protocol, root=DAILY_DIR):
+    """已有分片的月份（升序）"""
+    dir_path = os.path.join(root, protocol)
+    if not os.path.isdir(dir_path):
+        return []
+    return sorted(name[:-5] for name in os.listdir(dir_path)
+                  if len(name) == 12 and name.endswith(".json") and name[4] == "-")
+
+
+def load_shard(protocol, month, root=DAILY_DIR):
+    return read_json(shard_path(protocol, month, root))
+
+
+def shard_source(protocol, root=DAILY_DIR):
+    """最新一个分片的 source（生产者）；没有分片 → None"""
+    months = list_months(protocol, root)
+    return (load_shard(protocol, months[-1], root) or {}).get("source") if months else None
+
+
+def _check_compatible(protocol, month, shard, records, source):
+    if not shard or not shard.get("records"):
+        return
+    if shard.get("source") != source:
+        raise ShardMismatch(f"{protocol}/{month}: 分片 source={shard.get('source')}，拒绝写入 source={source}")
+    known = {r.get("tev_source") for r in shard["records"]}
+    extra = {r.get("tev_source") for r in records} - known
+    if extra:
+        raise ShardMismatch(f"{protocol}/{month}: 分片 tev_source={sorted(map(str, known))}，"
+                            f"拒绝混入 {sorted(map(str, extra))}")
+
+
+def _group_by_month(records):
+    months = {}
+    for rec in records:
+        months.setdefault(rec["date"][:7], []).append(rec)
+    return months
+
+
+def _write_shard(protocol, month, shard, records, source, fetched_at, root, name=None):
+    """records 已排序；与原分片相同时不写，返回是否写入"""
+    if shard is not None and shard.get("records") == records:
+        return False
+    if shard is None:
+        shard = {"protocol": name or protocol, "period": month, "source": source}
+    shard["fetched_at"] = fetched_at or _now_iso()
+    shard["record_count"] = len(records)
+    # records 放最后，保持与现有分片相同的键顺序
+    shard.pop("records", None)
+    shard["records"] = records
+    write_json(shard_path(protocol, month, root), shard)
+    return True
+
+
+def upsert_days(protocol, records, source="auto", fetched_at=None, root=DAILY_DIR):
+    """按 date 追加或覆盖记录；返回实际重写的月份列表（口径不一致抛 ShardMismatch）"""
+    written = []
+    for month, recs in sorted(_group_by_month(records).items()):
+        shard = load_shard(protocol, month, root)
+        _check_compatible(protocol, month, shard, recs, source)
+        rows = list(shard["records"]) if shard else []
+        dates = [r["date"] for r in rows]
+        for rec in recs:
+            i = bisect.bisect_left(dates, rec["date"])
+            if i < len(dates) and dates[i] == rec["date"]:
+                rows[i] = rec
+            else:
+                dates.insert(i, rec["date"])
+                rows.insert(i, rec)
+        if _write_shard(protocol, month, shard, rows, source, fetched_at, root):
+            written.append(month)
+    return written
+
+
+def upsert_day(protocol, record, source="auto", fetched_at=None, root=DAILY_DIR):
+    """单日版本: 只动 record["date"] 所在月份；返回是否写入"""
+    return bool(upsert_days(protocol, [record], source, fetched_at, root))
+
+
+def rebuild_range(protocol, records, start, end, source="auto", fetched_at=None, root=DAILY_DIR, name=None):
+    """用 records 替换 [start, end]（含两端，YYYY-MM-DD）内的全部日度记录
+
+    区间内但 records 里没有的日期会被删除；区间外的记录和月份不受影响。
+    name: 新建分片里的 "protocol" 字段（目录名与协议名不同时，如 hype/ 下的 hyperliquid）
+    返回实际重写的月份列表。
+    """
+    fresh = _group_by_month(r for r in records if start <= r["date"] <= end)
+    months = []
+    month = start[:7]
+    while month <= end[:7]:
+        months.append(month)
+        y, m = int(month[:4]), int(month[5:7])
+        month = f"{y + m // 12}-{m % 12 + 1:02d}"
+
+    written = []
+    for month in months:
+        shard = load_shard(protocol, month, root)
+        _check_compatible(protocol, month, shard, fresh.get(month, []), source)
+        kept = [r for r in (shard["records"] if shard else []) if not start <= r["date"] <= end]
+        rows = sorted(kept + fresh.get(month, []), key=lambda r: r["date"])
+        if not rows and shard is None:
+            continue
+        if _write_shard(protocol, month, shard, rows, source, fetched_at, root, name):
+            written.append(month)
+    return written
+
+
+def iter_records(protocol, start=None, end=None, root=DAILY_DIR):
+    """按日期顺序读出区间内的记录，只打开涉及的分片"""
+    for month in list_months(protocol, root):
+        if (start and month < start[:7]) or (end and month > end[:7]):
+            continue
+        for rec in (load_shard(protocol, month, root) or {}).get("records", []):
+            if (start and rec["date"] < start) or (end and rec["date"] > end):
+                continue
+            yield rec
@@ -0,0 +1,239 @@
+"""
+日度 TEV 列式存储 — data/daily/*/YYYY-MM.json 的 NumPy memmap 副本
+
+布局 (默认 <repo>/.cache/daily-store，可用 TEV_DAILY_STORE 覆盖):
+    meta.json        日期轴起点 / 天数、协议顺序、各协议的键顺序表和月度分片头
+    {field}.f8       float64 [协议, 天]，缺失 / null 为 NaN
+    layout.u1        uint8 [协议, 天]，0 = 当天无记录，k = meta.layouts[k-1] 的键顺序
+    tev_source.u1    uint8 [协议, 天]，meta.tev_sources 的下标 + 1
+
+月度 JSON 仍是前端读取的真源；存储由 build_store() 从 JSON 全量构建（~1s），
+任何分片比 meta.json 新时 open_store() 自动重建。export_months() 反向导出同格式的月度 JSON。
+
+用法:
+    from lib.dailystore import load, panel
+    aave = load("aave", "2025-01-01", "2025-12-31")     # {"date": datetime64[D], "daily_tev_usd": ...}
+    dates, protocols, tev = panel("daily_tev_usd", "2026-01-01")
+"""
+
+import glob
+import os
+from datetime import date, timedelta
+
+import numpy as np
+
+from lib.dailyshard import DAILY_DIR, rebuild_range
+from lib.jsonio import read_json, write_json
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_STORE_DIR = os.environ.get("TEV_DAILY_STORE", os.path.join(BASE_DIR, ".cache", "daily-store"))
+STORE_VERSION = 1
+
+FIELDS = (
+    "price_usd",
+    "market_cap_usd",
+    "daily_fees_usd",
+    "daily_tev_usd",
+    "tev_ratio_used",
+    "daily_revenue_usd",
+    "daily_holders_revenue_usd",
+)
+
+
+def _day_index(day, origin):
+    return (date.fromisoformat(day) - origin).days
+
+
+def _shard_files(daily_dir):
+    return glob.glob(os.path.join(daily_dir, "*", "[0-9][0-9][0-9][0-9]-[0-9][0-9].json"))
+
+
+def _json_number(x):
+    """与 JS JSON.stringify 一致: 整数值不带小数点"""
+    if np.isnan(x):
+        return None
+    x = float(x)
+    return int(x) if x.is_integer() and abs(x) < 2 ** 53 else x
+
+
+def build_store(daily_dir=DAILY_DIR, root=DEFAULT_STORE_DIR):
+    """解析全部月度分片，写出列式存储；返回 DailyStore"""
+    shards = {}
+    for path in _shard_files(daily_dir):
+        protocol = os.path.basename(os.path.dirname(path))
+        shards.setdefault(protocol, []).append(read_json(path))
+    protocols = sorted(shards)
+    all_dates = [r["date"] for docs in shards.values() for d in docs for r in d["records"]]
+    if not all_dates:
+        raise ValueError(f"{daily_dir} 下没有月度分片")
+    origin = date.fromisoformat(min(all_dates))
+    days = _day_index(max(all_dates), origin) + 1
+
+    os.makedirs(root, exist_ok=True)
+    shape = (len(protocols), days)
+    columns = {f: np.full(shape, np.nan) for f in FIELDS}
+    layout = np.zeros(shape, dtype=np.uint8)
+    source = np.zeros(shape, dtype=np.uint8)
+    layouts, tev_sources, months = [], [], {}
+
+    for p, protocol in enumerate(protocols):
+        months[protocol] = {}
+        for doc in shards[protocol]:
+            months[protocol][doc["period"]] = {k: v for k, v in doc.items() if k != "records"}
+            for rec in doc["records"]:
+                i = _day_index(rec["date"], origin)
+                keys = list(rec)
+                if keys not in layouts:
+                    layouts.append(keys)
+                layout[p, i] = layouts.index(keys) + 1
+                for f in FIELDS:
+                    v = rec.get(f)
+                    if v is not None:
+                        columns[f][p, i] = v
+                if rec.get("tev_source") is not None:
+                    if rec["tev_source"] not in tev_sources:
+                        tev_sources.append(rec["tev_source"])
+                    source[p, i] = tev_sources.index(rec["tev_source"]) + 1
+
+    for f, arr in columns.items():
+        arr.tofile(os.path.join(root, f"{f}.f8"))
+    layout.tofile(os.path.join(root, "layout.u1"))
+    source.tofile(os.path.join(root, "tev_source.u1"))
+    write_json(os.path.join(root, "meta.json"), {
+        "version": STORE_VERSION,
+        "origin": origin.isoformat(),
+        "days": days,
+        "protocols": protocols,
+        "fields": list(FIELDS),
+        "layouts": layouts,
+        "tev_sources": tev_sources,
+        "months": months,
+    })
+    return DailyStore(root)
+
+
+def is_stale(daily_dir=DAILY_DIR, root=DEFAULT_STORE_DIR):
+    meta_path = os.path.join(root, "meta.json")
+    if not os.path.exists(meta_path):
+        return True
+    built = os.path.getmtime(meta_path)
+    return any(os.path.getmtime(p) > built for p in _shard_files(daily_dir))
+
+
+def open_store(root=DEFAULT_STORE_DIR, daily_dir=DAILY_DIR, rebuild_if_stale=True):
+    if rebuild_if_stale and is_stale(daily_dir, root):
+        return build_store(daily_dir, root)
+    return DailyStore(root)
+
+
+class DailyStore:
+    """只读视图；列数据是 np.memmap，按需分页读入"""
+
+    def __init__(self, root=DEFAULT_STORE_DIR):
+        self.root = root
+        self.meta = read_json(os.path.join(root, "meta.json"))
+        if not self.meta or self.meta.get("version") != STORE_VERSION:
+            raise ValueError(f"列式存储不存在或版本不符: {root}（先运行 build_store）")
+        self.origin = date.fromisoformat(self.meta["origin"])
+        self.days = self.meta["days"]
+        self.protocols = self.meta["protocols"]
+        self._row = {p: i for i, p in enumerate(self.protocols)}
+        shape = (len(self.protocols), self.days)
+        self.columns = {
+            f: np.memmap(os.path.join(root, f"{f}.f8"), dtype=np.float64, mode="r", shape=shape)
+            for f in self.meta["fields"]
+        }
+        self.layout = np.memmap(os.path.join(root, "layout.u1"), dtype=np.uint8, mode="r", shape=shape)
+        self.tev_source = np.memmap(os.path.join(root, "tev_source.u1"), dtype=np.uint8, mode="r", shape=shape)
+
+    # ── 日期轴 ──
+
+    def _slice(self, start=None, end=None):
+        lo = 0 if start is None else max(0, _day_index(start, self.origin))
+        hi = self.days if end is None else min(self.days, _day_index(end, self.origin) + 1)
+        return slice(lo, max(lo, hi))
+
+    def dates(self, start=None, end=None):
+        s = self._slice(start, end)
+        return np.datetime64(self.origin.isoformat(), "D") + np.arange(s.start, s.stop)
+
+    def _protocol_row(self, protocol):
+        if protocol not in self._row:
+            raise KeyError(f"未知协议: {protocol}")
+        return self._row[protocol]
+
+    # ── 查询 ──
+
+    def load(self, protocol, start=None, end=None, fields=None):
+        """单协议: {"date": datetime64[D], field: float64 数组}，只含有记录的日期"""
+        p, s = self._protocol_row(protocol), self._slice(start, end)
+        present = self.layout[p, s] > 0
+        out = {"date": self.dates(start, end)[present]}
+        for f in fields or self.meta["fields"]:
+            out[f] = np.asarray(self.columns[f][p, s])[present]
+        return out
+
+    def panel(self, field, start=None, end=None, protocols=None):
+        """跨协议: (dates, protocols, 二维数组 [协议, 天])，无记录为 NaN"""
+        s = self._slice(start, end)
+        names = list(protocols) if protocols else self.protocols
+        rows = [self._protocol_row(p) for p in names]
+        data = np.asarray(self.columns[field][rows, s]) if protocols else np.asarray(self.columns[field][:, s])
+        return self.dates(start, end), names, data
+
+    # ── 导出 ──
+
+    def records(self, protocol, start=None, end=None):
+        """还原成月度 JSON 里的记录（键顺序 / null / 整数格式与原文件一致）"""
+        p, s = self._protocol_row(protocol), self._slice(start, end)
+        layouts, sources = self.meta["layouts"], self.meta["tev_sources"]
+        idx = np.nonzero(self.layout[p, s])[0] + s.start
+        out = []
+        for i in idx:
+            day = (self.origin + timedelta(days=int(i))).isoformat()
+            rec = {}
+            for key in layouts[self.layout[p, i] - 1]:
+                if key == "date":
+                    rec[key] = day
+                elif key == "tev_source":
+                    code = self.tev_source[p, i]
+                    rec[key] = sources[code - 1] if code else None
+                else:
+                    rec[key] = _json_number(self.columns[key][p, i])
+            out.append(rec)
+        return out
+
+    def export_months(self, protocol, start=None, end=None, daily_dir=DAILY_DIR):
+        """把 [start, end] 内的记录写回 data/daily/{protocol}/YYYY-MM.json；返回重写的月份"""
+        start = start or self.origin.isoformat()
+        end = end or (self.origin + timedelta(days=self.days - 1)).isoformat()
+        records = self.records(protocol, start, end)
+        headers = self.meta["months"].get(protocol, {})
+        written = []
+        for month in sorted({r["date"][:7] for r in records} | set(headers)):
+            if not start[:7] <= month <= end[:7]:
+                continue
+            head = headers.get(month, {})
+            lo, hi = max(start, f"{month}-01"), min(end, f"{month}-31")
+            written += rebuild_range(protocol, [r for r in records if r["date"][:7] == month], lo, hi,
+                                     source=head.get("source", "auto"), fetched_at=head.get("fetched_at"),
+                                     root=daily_dir, name=head.get("protocol"))
+        return written
+
+
+_default = None
+
+
+def _store():
+    global _default
+    if _default is None:
+        _default = open_store()
+    return _default
+
+
+def load(protocol, start=None, end=None, fields=None):
+    return _store().load(protocol, start, end, fields)
+
+
+def panel(field, start=None, end=None, protocols=None):
+    return _store().panel(field, start, end, protocols)
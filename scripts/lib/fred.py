@@ -0,0 +1,133 @@
+"""
+FRED 宏观序列访问层 — indicators/data/shared/fred-macro.json
+
+每个序列按自然日展开成稠密数组（首个观测日 → 最后观测日），前向填充:
+    index_at(day)   该日或之前最近一次观测的下标（O(1) 整数索引）
+    value(date)     前向填充值；距最近观测超过 max_staleness 天返回 None
+WALCL 这类周度序列和工作日序列用同一套接口，不再逐日拼 strftime 字符串去查字典。
+
+    fred = load_fred()
+    fred["DGS10"].value("2026-02-08")       # 周末 → 取周五的值
+    fred["WALCL"].last()                    # ("2026-02-04", 6.6e6)
+"""
+
+import ast
+import json
+import os
+
+import numpy as np
+
+from lib.jsonio import read_json
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+FRED_FILE = os.path.join(BASE_DIR, "indicators", "data", "shared", "fred-macro.json")
+MAX_STALENESS = 7   # 默认最多沿用 7 天前的观测
+
+
+def to_day(date):
+    """YYYY-MM-DD（或其数组）→ 自 1970-01-01 起的天数"""
+    if isinstance(date, str):
+        return int(np.datetime64(date[:10], "D").astype(np.int64))
+    return np.asarray(date, dtype="datetime64[D]").astype(np.int64)
+
+
+def from_day(day):
+    return str(np.datetime64(int(day), "D"))
+
+
+def _parse(data):
+    # 旧版文件里有的序列被存成了字典的字符串形式
+    if isinstance(data, str):
+        try:
+            data = json.loads(data)
+        except ValueError:
+            data = ast.literal_eval(data)
+    return {d: float(v) for d, v in (data or {}).items() if v is not None}
+
+
+class FredSeries:
+    """单个序列: 观测点 + 自然日稠密索引"""
+
+    def __init__(self, name, data, max_staleness=MAX_STALENESS):
+        items = sorted(_parse(data).items())
+        self.name = name
+        self.max_staleness = max_staleness
+        self.dates = [d for d, _ in items]
+        self.obs_days = to_day(self.dates) if items else np.zeros(0, dtype=np.int64)
+        self.obs_values = np.array([v for _, v in items], dtype=float)
+        self.origin = int(self.obs_days[0]) if items else 0
+        # 自然日 → 最近观测下标
+        span = int(self.obs_days[-1]) - self.origin + 1 if items else 0
+        self._last_idx = np.searchsorted(self.obs_days, np.arange(self.origin, self.origin + span), side="right") - 1
+
+    def __len__(self):
+        return len(self.dates)
+
+    def index_at(self, days):
+        """days（天数，标量或数组）当天或之前最近观测的下标；早于首个观测为 -1"""
+        offset = np.asarray(days, dtype=np.int64) - self.origin
+        if not len(self._last_idx):
+            return np.full(offset.shape, -1) if offset.ndim else -1
+        idx = self._last_idx[np.clip(offset, 0, len(self._last_idx) - 1)]
+        return np.where(offset < 0, -1, idx) if offset.ndim else (int(idx) if offset >= 0 else -1)
+
+    def values_at(self, days, max_staleness=None):
+        """向量版 value: float64 数组，缺值 / 过期为 NaN"""
+        limit = self.max_staleness if max_staleness is None else max_staleness
+        days = np.asarray(days, dtype=np.int64)
+        idx = self.index_at(days)
+        out = np.full(days.shape, np.nan)
+        ok = idx >= 0
+        ok[ok] = days[ok] - self.obs_days[idx[ok]] <= limit
+        out[ok] = self.obs_values[idx[ok]]
+        return out
+
+    def value(self, date, max_staleness=None):
+        limit = self.max_staleness if max_staleness is None else max_staleness
+        day = to_day(date)
+        i = self.index_at(day)
+        if i < 0 or day - int(self.obs_days[i]) > limit:
+            return None
+        return float(self.obs_values[i])
+
+    def last(self):
+        """最后一次观测 (date, value)；空序列返回 (None, None)"""
+        if not self.dates:
+            return None, None
+        return self.dates[-1], float(self.obs_values[-1])
+
+
+class FredIndex:
+    """{序列名: FredSeries}，按需构建"""
+
+    def __init__(self, series, max_staleness=MAX_STALENESS):
+        self._raw = series or {}
+        self.max_staleness = max_staleness
+        self._cache = {}
+
+    def __contains__(self, name):
+        return name in self._raw
+
+    def __getitem__(self, name):
+        if name not in self._cache:
+            self._cache[name] = FredSeries(name, self._raw.get(name), self.max_staleness)
+        return self._cache[name]
+
+    def names(self):
+        return list(self._raw)
+
+    def dates(self, start=None):
+        """所有序列观测日的并集（升序）"""
+        out = set()
+        for name in self._raw:
+            out.update(self[name].dates)
+        return sorted(d for d in out if start is None or d >= start)
+
+    def last(self, name):
+        """最新值；没有该序列返回 None"""
+        return self[name].last()[1] if name in self else None
+
+
+def load_fred(path=FRED_FILE, max_staleness=MAX_STALENESS):
+    doc = read_json(path) or {}
+    return FredIndex(doc.get("series"), max_staleness)
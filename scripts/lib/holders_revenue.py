@@ -0,0 +1,242 @@
+"""
+DefiLlama holders-revenue 增量同步引擎
+
+把 dailyHoldersRevenue 日线合并进 data/protocols/{id}/tev-records.json 的月度聚合
+（格式与 scripts/fetch-tev-history.js 生成的一致）。
+
+增量规则:
+- tev-records.json 顶层 last_synced_date 记录上次同步到的日期；
+  旧文件没有该字段时，从最后一条月度记录的月初开始
+- 只重算包含新日期的月份（回看 REVISION_DAYS 天，吸收 DefiLlama 对近几天的修订），
+  其余月份记录原样保留
+- 每条月度记录在 source.amount_raw 里保留未取整的月额；summary 的总额 / 季度每次都由
+  全部记录的未取整月额重新求和、只取整一次，与全量重算一致，不会随多次运行漂移
+- 没有 amount_raw 的旧记录（JS 生成）在下一次同步时整体重算一遍补上
+- 没有新数据时不写文件
+
+所有协议在线程池里并发同步，共享一个带令牌桶限速 + 磁盘缓存的 HTTP 客户端。
+"""
+
+import bisect
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+
+from lib.httpcache import cached_client
+from lib.jsonio import read_json, write_json
+from lib.ratelimit import API_RATE_LIMITS, HostRateLimiter
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+PROTOCOLS_DIR = os.path.join(BASE_DIR, "data", "protocols")
+REVISION_DAYS = 3
+
+# 与 scripts/fetch-tev-history.js 的 PROTOCOLS 保持一致
+PROTOCOLS = [
+    {"id": "aave", "slug": "aave", "mechanism": "buyback_burn", "name": "AAVE Buyback"},
+    {"id": "sky", "slug": "sky", "mechanism": "buyback_burn", "name": "Smart Burn Engine"},
+    {"id": "pendle", "slug": "pendle", "mechanism": "ve_reward", "name": "vePENDLE Revenue Share"},
+    {"id": "curve", "slug": "curve-finance", "mechanism": "ve_reward", "name": "veCRV Fee Distribution"},
+    {"id": "gmx", "slug": "gmx", "mechanism": "staking_reward", "name": "GMX Staking Rewards"},
+    {"id": "dydx", "slug": "dydx", "mechanism": "staking_reward", "name": "DYDX Staker Fee Distribution"},
+    {"id": "maple", "slug": "maple", "mechanism": "staking_reward", "name": "SYRUP Staking Fee Share"},
+    {"id": "pancakeswap", "slug": "pancakeswap", "mechanism": "buyback_burn", "name": "CAKE Buyback & Burn"},
+    {"id": "radiant", "slug": "radiant-capital", "mechanism": "direct_distribution", "name": "dLP Fee Distribution"},
+    {"id": "etherfi", "slug": "ether.fi", "mechanism": "buyback_accumulate", "name": "ETHFI Buyback"},
+    {"id": "ethena", "slug": "ethena", "mechanism": "staking_reward", "name": "sENA Revenue Share"},
+]
+PROTOCOLS_BY_ID = {p["id"]: p for p in PROTOCOLS}
+
+
+def chart_url(slug, data_type="dailyHoldersRevenue"):
+    return f"https://api.llama.fi/summary/fees/{slug}?dataType={data_type}"
+
+
+def js_round(x):
+    """Math.round 口径（.5 向上），与 JS 生成的旧数据一致"""
+    return int(math.floor(x + 0.5))
+
+
+def quarter_of(month):
+    return f"{month[:4]}-Q{(int(month[5:7]) + 2) // 3}"
+
+
+def _chart_value(values):
+    """totalDataChart 的值可能是数字，也可能是 {chain: {product: value}} 嵌套"""
+    if isinstance(values, (int, float)):
+        return values
+    if isinstance(values, dict):
+        return sum(_chart_value(v) for v in values.values())
+    return 0
+
+
+def daily_series(payload):
+    """DefiLlama summary 响应 → 按日期排序的 [(YYYY-MM-DD, value)]"""
+    rows = []
+    for ts, values in payload.get("totalDataChart") or []:
+        day = datetime.fromtimestamp(ts, tz=timezone.utc).strftime("%Y-%m-%d")
+        rows.append((day, _chart_value(values)))
+    rows.sort()
+    return rows
+
+
+def fetch_daily(slug, http=None, data_type="dailyHoldersRevenue"):
+    """拉取单个 slug 的日线，返回 (payload, [(date, value)])"""
+    http = http or make_client()
+    payload = http.get_json(chart_url(slug, data_type), timeout=30)
+    return payload, daily_series(payload)
+
+
+def make_client(replay=False):
+    return cached_client(replay=replay, rate_limiter=HostRateLimiter(API_RATE_LIMITS))
+
+
+def _methodology(payload):
+    methodology = (payload.get("methodology") or {}).get("HoldersRevenue")
+    if not methodology:
+        children = payload.get("childProtocols") or [{}]
+        methodology = ((children[0] or {}).get("methodology") or {}).get("HoldersRevenue")
+    return methodology or "See DefiLlama methodology"
+
+
+def _new_record(proto, month, amount, days, url, methodology):
+    return {
+        "id": f"{proto['id']}-{proto['mechanism'].replace('_', '-')}-{month}",
+        "date": f"{month}-01",
+        "type": "aggregate",
+        "mechanism": proto["name"],
+        "amount_usd": js_round(amount),
+        "period": month,
+        "days_with_data": days,
+        "source": {
+            "type": "api",
+            "provider": "DefiLlama",
+            "endpoint": url,
+            "data_type": "dailyHoldersRevenue",
+            "methodology": methodology,
+            "amount_raw": amount,
+        },
+        "notes": f"Monthly aggregate from {days} days of data",
+    }
+
+
+def _resume_date(existing):
+    """从哪一天开始重算（含当天）；None 表示全量"""
+    last = existing.get("last_synced_date")
+    if last:
+        since = datetime.strptime(last, "%Y-%m-%d") - timedelta(days=REVISION_DAYS - 1)
+        return since.strftime("%Y-%m-%d")
+    records = existing.get("records") or []
+    if records:
+        return max(r["period"] for r in records) + "-01"
+    return None
+
+
+def _raw_amount(record):
+    return (record.get("source") or {}).get("amount_raw", record["amount_usd"])
+
+
+def _needs_backfill(existing):
+    return any("amount_raw" not in (r.get("source") or {}) for r in existing.get("records") or [])
+
+
+def merge_days(proto, existing, payload, series, url):
+    """把新日期合并进 existing（原地修改），返回 (受影响月份, 新增天数)"""
+    backfill = _needs_backfill(existing)
+    since = None if backfill else _resume_date(existing)
+    dates = [d for d, _ in series]
+    # 受影响月份要整月重算，从 since 所在月的第一天切片
+    start = bisect.bisect_left(dates, since[:7] + "-01") if since else 0
+    tail = series[start:]
+    last_known = existing.get("last_synced_date") or ""
+    new_days = sum(1 for d, _ in tail if d > last_known)
+    if not tail or (new_days == 0 and existing.get("last_synced_date") and not backfill):
+        return [], 0
+
+    monthly = {}
+    for day, value in tail:
+        if value > 0:
+            agg = monthly.setdefault(day[:7], [0.0, 0])
+            agg[0] += value
+            agg[1] += 1
+    affected = sorted({d[:7] for d, _ in tail})
+
+    records = existing.setdefault("records", [])
+    by_period = {r.get("period"): r for r in records}
+    summary = existing.setdefault("summary", {})
+    methodology = _methodology(payload)
+
+    for month in affected:
+        old = by_period.get(month)
+        amount, days = monthly.get(month, (0.0, 0))
+        if days == 0:
+            if old:
+                records.remove(old)
+            continue
+        if old:
+            old["amount_usd"] = js_round(amount)
+            old["days_with_data"] = days
+            old["notes"] = f"Monthly aggregate from {days} days of data"
+            old.setdefault("source", {})["amount_raw"] = amount
+        else:
+            rec = _new_record(proto, month, amount, days, url, methodology)
+            records.append(rec)
+            by_period[month] = rec
+
+    # 总额 / 季度由未取整月额重新求和，只取整一次（与 JS 全量构建口径一致）
+    records.sort(key=lambda r: r.get("period", ""))
+    total = 0.0
+    quarters = {}
+    for rec in records:
+        q = quarter_of(rec["period"])
+        quarters[q] = quarters.get(q, 0.0) + _raw_amount(rec)
+        total += _raw_amount(rec)
+    summary["total_tev_usd"] = js_round(total)
+    summary["total_30d_usd"] = payload.get("total30d") or 0
+    summary.setdefault("by_mechanism", {})[proto["mechanism"]] = summary["total_tev_usd"]
+    summary["by_period"] = {q: js_round(v) for q, v in sorted(quarters.items())}
+    existing["last_synced_date"] = series[-1][0]
+    return affected, new_days
+
+
+def sync_protocol(proto, http, dry_run=False):
+    """同步单个协议，返回统计 dict"""
+    path = os.path.join(PROTOCOLS_DIR, proto["id"], "tev-records.json")
+    url = chart_url(proto["slug"])
+    payload, series = fetch_daily(proto["slug"], http)
+    if not series:
+        return {"id": proto["id"], "status": "no data", "new_days": 0, "months": []}
+
+    existing = read_json(path) or {
+        "protocol": proto["id"],
+        "updated_at": None,
+        "data_source": "DefiLlama API (dailyHoldersRevenue)",
+        "data_source_url": url,
+        "records": [],
+        "summary": {"total_tev_usd": 0, "total_30d_usd": 0, "by_mechanism": {}, "by_period": {}},
+    }
+    months, new_days = merge_days(proto, existing, payload, series, url)
+    if not months:
+        return {"id": proto["id"], "status": "up to date", "new_days": 0, "months": []}
+
+    existing["updated_at"] = datetime.now(timezone.utc).isoformat(timespec="milliseconds").replace("+00:00", "Z")
+    existing["data_source_url"] = url
+    if not dry_run:
+        write_json(path, existing)
+    return {"id": proto["id"], "status": "updated", "new_days": new_days, "months": months,
+            "total_tev_usd": existing["summary"]["total_tev_usd"]}
+
+
+def sync_all(ids=None, replay=False, dry_run=False, workers=8):
+    """并发同步多个协议；ids 为 None 时同步 PROTOCOLS 全部"""
+    protos = [PROTOCOLS_BY_ID[i] for i in ids] if ids else PROTOCOLS
+    http = make_client(replay)
+
+    def run(proto):
+        try:
+            return sync_protocol(proto, http, dry_run)
+        except Exception as e:
+            return {"id": proto["id"], "status": f"error: {e}", "new_days": 0, "months": []}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(run, protos))
@@ -0,0 +1,217 @@
+"""
+HTTP 响应磁盘缓存 — 挂在 lib.httpclient.HttpClient 上使用
+
+布局 (默认 <repo>/.cache/http，可用 TEV_HTTP_CACHE_DIR 覆盖):
+    entries/<sha256(url)>.json   元数据: url / status / 校验头 / body 哈希 / 时间戳
+    objects/<ab>/<sha256(body)>  响应体，按内容寻址，相同内容只存一份
+
+- 每个端点按 TTL_RULES 取 TTL，新鲜期内直接命中
+- 过期后带 If-None-Match / If-Modified-Since 重新验证，304 只刷新时间戳
+- 总大小超过 max_bytes 时按最近访问时间 (LRU) 淘汰
+- replay 模式只读缓存、不发请求，未命中直接报错（离线跑流水线 / 基准测试）
+
+用法:
+    from lib.httpcache import cached_client
+    http = cached_client(replay="--replay" in sys.argv)
+    chart = http.get_json("https://api.llama.fi/summary/fees/sky?dataType=dailyHoldersRevenue")
+"""
+
+import hashlib
+import http.client
+import json
+import os
+import re
+import threading
+import time
+
+from lib.httpclient import HttpClient, HttpResponse
+from lib.jsonio import atomic_write_bytes
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_CACHE_DIR = os.environ.get("TEV_HTTP_CACHE_DIR", os.path.join(BASE_DIR, ".cache", "http"))
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+# URL 正则 → TTL 秒数，先匹配先生效
+TTL_RULES = [
+    (r"api\.llama\.fi/summary/fees/", 6 * 3600),   # 单协议日线历史，一天只多一个点
+    (r"api\.llama\.fi/overview/fees", 3600),
+    (r"api\.llama\.fi/tvl/", 600),
+    (r"api\.coingecko\.com/", 300),
+    (r"api\.coinmarketcap\.com/", 3600),
+]
+DEFAULT_TTL = 0  # 未配置的端点每次都重新验证 / 重新拉取，缓存只供 replay
+
+# 随缓存保存的响应头
+KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified", "Cache-Control")
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class CacheEntry:
+    def __init__(self, key, meta, cache):
+        self.key = key
+        self.meta = meta
+        self._cache = cache
+
+    @property
+    def fresh(self):
+        return time.time() - self.meta["stored_at"] < self.meta["ttl"]
+
+    def validators(self):
+        """重新验证用的条件请求头"""
+        headers = self.meta.get("headers", {})
+        out = {}
+        if headers.get("ETag"):
+            out["If-None-Match"] = headers["ETag"]
+        if headers.get("Last-Modified"):
+            out["If-Modified-Since"] = headers["Last-Modified"]
+        return out
+
+    def response(self):
+        msg = http.client.HTTPMessage()
+        for name, value in self.meta.get("headers", {}).items():
+            msg[name] = value
+        msg["X-Cache"] = "HIT"
+        body = self._cache.read_object(self.meta["body_sha256"])
+        return HttpResponse(self.meta["url"], self.meta["status"], msg, body)
+
+
+class ResponseCache:
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES,
+                 ttl_rules=None, default_ttl=DEFAULT_TTL, replay=False):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttl_rules = [(re.compile(p), ttl) for p, ttl in (ttl_rules or TTL_RULES)]
+        self.default_ttl = default_ttl
+        self.replay = replay
+        self._lock = threading.Lock()
+        self._size = None  # 懒计算，超过上限时才做全量扫描淘汰
+
+    # ── 路径 ──
+
+    def _entry_path(self, key):
+        return os.path.join(self.root, "entries", f"{key}.json")
+
+    def _object_path(self, sha):
+        return os.path.join(self.root, "objects", sha[:2], sha)
+
+    @staticmethod
+    def key_for(url):
+        return _sha256(f"GET {url}".encode("utf-8"))
+
+    def ttl_for(self, url):
+        for pattern, ttl in self.ttl_rules:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    # ── 读写 ──
+
+    def read_object(self, sha):
+        with open(self._object_path(sha), "rb") as f:
+            return f.read()
+
+    def get(self, url):
+        key = self.key_for(url)
+        try:
+            with open(self._entry_path(key), "r", encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not os.path.exists(self._object_path(meta["body_sha256"])):
+            return None
+        meta["accessed_at"] = time.time()
+        self._write_meta(key, meta)
+        return CacheEntry(key, meta, self)
+
+    def _write_meta(self, key, meta):
+        atomic_write_bytes(self._entry_path(key), json.dumps(meta, ensure_ascii=False).encode("utf-8"))
+
+    def put(self, url, resp):
+        sha = _sha256(resp.body)
+        obj = self._object_path(sha)
+        added = 0
+        if not os.path.exists(obj):
+            atomic_write_bytes(obj, resp.body)
+            added = len(resp.body)
+        now = time.time()
+        meta = {
+            "url": url,
+            "status": resp.status,
+            "headers": {h: resp.headers.get(h) for h in KEPT_HEADERS if resp.headers.get(h)},
+            "body_sha256": sha,
+            "size": len(resp.body),
+            "ttl": self.ttl_for(url),
+            "stored_at": now,
+            "accessed_at": now,
+        }
+        self._write_meta(self.key_for(url), meta)
+        with self._lock:
+            if self._size is None:
+                self._size = self._scan_size()
+            else:
+                self._size += added
+            over = self._size > self.max_bytes
+        if over:
+            self.evict()
+
+    def revalidated(self, entry, resp):
+        """304: 沿用缓存体，刷新时间戳和服务端给出的新校验头"""
+        for h in KEPT_HEADERS:
+            if resp.headers.get(h):
+                entry.meta.setdefault("headers", {})[h] = resp.headers.get(h)
+        entry.meta["stored_at"] = entry.meta["accessed_at"] = time.time()
+        entry.meta["ttl"] = self.ttl_for(entry.meta["url"])
+        self._write_meta(entry.key, entry.meta)
+        return entry.response()
+
+    # ── 淘汰 ──
+
+    def _scan_size(self):
+        total = 0
+        for dirpath, _, files in os.walk(os.path.join(self.root, "objects")):
+            for name in files:
+                total += os.path.getsize(os.path.join(dirpath, name))
+        return total
+
+    def evict(self, max_bytes=None):
+        """按 accessed_at 从旧到新删除条目，直到对象总大小 ≤ max_bytes；返回删除条目数"""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries_dir = os.path.join(self.root, "entries")
+        metas = []
+        for name in os.listdir(entries_dir) if os.path.isdir(entries_dir) else []:
+            try:
+                with open(os.path.join(entries_dir, name), "r", encoding="utf-8") as f:
+                    metas.append((name[:-5], json.load(f)))
+            except (OSError, ValueError):
+                continue
+        metas.sort(key=lambda km: km[1].get("accessed_at", 0), reverse=True)
+
+        # 从最近访问的开始保留，超过上限后的全部淘汰；共享对象只计一次
+        kept_objects, total, evicted = set(), 0, 0
+        for key, meta in metas:
+            sha = meta.get("body_sha256")
+            extra = 0 if sha in kept_objects else meta.get("size", 0)
+            if total + extra <= limit:
+                kept_objects.add(sha)
+                total += extra
+                continue
+            os.unlink(self._entry_path(key))
+            evicted += 1
+
+        for dirpath, _, files in os.walk(os.path.join(self.root, "objects")):
+            for name in files:
+                if name not in kept_objects and not name.startswith(".tmp-"):
+                    os.unlink(os.path.join(dirpath, name))
+        with self._lock:
+            self._size = total
+        return evicted
+
+
+def cached_client(replay=False, cache_dir=None, **kwargs):
+    """带磁盘缓存的 HttpClient；TEV_HTTP_REPLAY=1 时强制 replay"""
+    replay = replay or os.environ.get("TEV_HTTP_REPLAY") == "1"
+    cache = ResponseCache(root=cache_dir or DEFAULT_CACHE_DIR, replay=replay)
+    return HttpClient(cache=cache, **kwargs)
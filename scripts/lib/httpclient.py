@@ -0,0 +1,312 @@
+"""
+共享 HTTP 客户端 — 替代各脚本里的 subprocess.run(["curl", ...])
+
+- keep-alive 连接池: 同一 scheme://host:port 复用 TCP + TLS 连接
+- gzip / deflate 自动解压
+- 网络错误 / 429 / 5xx 自动重试，指数退避，遵守 Retry-After
+- 每主机并发上限，可选挂 lib.ratelimit.HostRateLimiter 限速
+- 同步 HttpClient 与异步 AsyncHttpClient 两套接口
+- 可选挂 lib.httpcache.ResponseCache 做 GET 磁盘缓存 / 离线 replay
+
+用法:
+    from lib.httpclient import get_client
+    fees = get_client().get_json("https://api.llama.fi/overview/fees")
+"""
+
+import asyncio
+import gzip
+import http.client
+import json as jsonlib
+import ssl
+import threading
+import time
+import zlib
+from urllib.parse import urlencode, urljoin, urlsplit
+
+DEFAULT_HEADERS = {
+    "User-Agent": "TEV-Dashboard/1.0",
+    "Accept": "*/*",
+    "Accept-Encoding": "gzip, deflate",
+}
+RETRY_STATUS = {429, 500, 502, 503, 504}
+REDIRECT_STATUS = {301, 302, 303, 307, 308}
+MAX_REDIRECTS = 5
+# 服务端关闭空闲连接时复用会抛出这些异常，换新连接重发一次即可
+STALE_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionResetError, BrokenPipeError)
+
+
+class HttpError(Exception):
+    """请求失败: status 为 None 表示网络层错误"""
+
+    def __init__(self, url, status=None, body=b"", reason=""):
+        self.url = url
+        self.status = status
+        self.body = body
+        detail = f"HTTP {status}" if status else (reason or "network error")
+        super().__init__(f"{detail}: {url}")
+
+
+class HttpResponse:
+    __slots__ = ("url", "status", "headers", "body")
+
+    def __init__(self, url, status, headers, body):
+        self.url = url
+        self.status = status
+        self.headers = headers  # http.client.HTTPMessage，get() 大小写不敏感
+        self.body = body
+
+    @property
+    def ok(self):
+        return 200 <= self.status < 300
+
+    def text(self, encoding=None):
+        if encoding is None:
+            encoding = self.headers.get_content_charset() or "utf-8"
+        return self.body.decode(encoding, errors="replace")
+
+    def json(self):
+        return jsonlib.loads(self.body)
+
+
+def _decode_body(raw, encoding):
+    encoding = (encoding or "").lower()
+    if encoding == "gzip":
+        return gzip.decompress(raw)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(raw)
+        except zlib.error:
+            return zlib.decompress(raw, -zlib.MAX_WBITS)
+    return raw
+
+
+class _HostPool:
+    """单个 origin 的连接池: 信号量限制并发，空闲连接后进先出复用"""
+
+    def __init__(self, scheme, host, port, max_conns, ssl_context):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.ssl_context = ssl_context
+        self.slots = threading.BoundedSemaphore(max_conns)
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def checkout(self, timeout):
+        with self._lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is not None:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+        if self.scheme == "https":
+            conn = http.client.HTTPSConnection(self.host, self.port, timeout=timeout, context=self.ssl_context)
+        else:
+            conn = http.client.HTTPConnection(self.host, self.port, timeout=timeout)
+        return conn, False
+
+    def checkin(self, conn):
+        with self._lock:
+            self._idle.append(conn)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+
+class HttpClient:
+    """线程安全的同步客户端；一个进程内共享一个实例即可复用连接"""
+
+    def __init__(self, timeout=30, retries=3, backoff=1.0, max_per_host=6,
+                 headers=None, rate_limiter=None, verify=True, cache=None):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.max_per_host = max_per_host
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        if verify:
+            self._ssl = ssl.create_default_context()
+        else:
+            self._ssl = ssl._create_unverified_context()
+        self._pools = {}
+        self._lock = threading.Lock()
+
+    # ── 连接层 ──
+
+    def _pool(self, parts):
+        scheme = parts.scheme or "http"
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname, port)
+        with self._lock:
+            pool = self._pools.get(key)
+            if pool is None:
+                pool = self._pools[key] = _HostPool(scheme, parts.hostname, port, self.max_per_host, self._ssl)
+            return pool
+
+    def _send_once(self, method, url, body, headers, timeout):
+        parts = urlsplit(url)
+        pool = self._pool(parts)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        with pool.slots:
+            while True:
+                conn, reused = pool.checkout(timeout)
+                try:
+                    conn.request(method, path, body=body, headers=headers)
+                    resp = conn.getresponse()
+                    raw = resp.read()
+                except STALE_ERRORS:
+                    conn.close()
+                    if reused:
+                        continue
+                    raise
+                except BaseException:
+                    conn.close()
+                    raise
+                if resp.will_close:
+                    conn.close()
+                else:
+                    pool.checkin(conn)
+                body_bytes = _decode_body(raw, resp.headers.get("Content-Encoding"))
+                return HttpResponse(url, resp.status, resp.headers, body_bytes)
+
+    def _send(self, method, url, body, headers, timeout):
+        """发送请求并跟随重定向（等价 curl -L）"""
+        for _ in range(MAX_REDIRECTS + 1):
+            resp = self._send_once(method, url, body, headers, timeout)
+            location = resp.headers.get("Location")
+            if resp.status not in REDIRECT_STATUS or not location:
+                return resp
+            url = urljoin(url, location)
+            if resp.status == 303 or (resp.status in (301, 302) and method == "POST"):
+                method, body = "GET", None
+                headers = {k: v for k, v in headers.items() if k.lower() != "content-type"}
+        raise HttpError(url, reason="too many redirects")
+
+    def _backoff_delay(self, attempt, retry_after=None):
+        if retry_after:
+            try:
+                return min(float(retry_after), 60.0)
+            except ValueError:
+                pass
+        return self.backoff * (2 ** attempt)
+
+    # ── 公共接口 ──
+
+    def request(self, method, url, params=None, data=None, json=None, headers=None,
+                timeout=None, retries=None, raise_for_status=True, use_cache=True):
+        """发送请求，返回 HttpResponse；失败抛出 HttpError"""
+        if params:
+            url += ("&" if "?" in url else "?") + urlencode(params)
+        hdrs = {**self.headers, **(headers or {})}
+
+        cache = self.cache if use_cache and method == "GET" else None
+        cached = cache.get(url) if cache is not None else None
+        if cache is not None:
+            if cache.replay:
+                if cached is None:
+                    raise HttpError(url, reason="replay cache miss")
+                return cached.response()
+            if cached is not None:
+                if cached.fresh:
+                    return cached.response()
+                hdrs.update(cached.validators())
+        body = data
+        if json is not None:
+            body = jsonlib.dumps(json, ensure_ascii=False).encode("utf-8")
+            hdrs.setdefault("Content-Type", "application/json")
+        elif isinstance(data, dict):
+            body = urlencode(data).encode("utf-8")
+            hdrs.setdefault("Content-Type", "application/x-www-form-urlencoded")
+        elif isinstance(data, str):
+            body = data.encode("utf-8")
+        timeout = self.timeout if timeout is None else timeout
+        retries = self.retries if retries is None else retries
+
+        for attempt in range(retries + 1):
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(url)
+            try:
+                resp = self._send(method, url, body, hdrs, timeout)
+            except (OSError, http.client.HTTPException) as e:
+                if attempt < retries:
+                    time.sleep(self._backoff_delay(attempt))
+                    continue
+                raise HttpError(url, reason=str(e) or type(e).__name__) from e
+            if resp.status in RETRY_STATUS and attempt < retries:
+                time.sleep(self._backoff_delay(attempt, resp.headers.get("Retry-After")))
+                continue
+            if cache is not None:
+                if resp.status == 304 and cached is not None:
+                    return cache.revalidated(cached, resp)
+                if resp.ok:
+                    cache.put(url, resp)
+            if raise_for_status and resp.status >= 400:
+                raise HttpError(url, resp.status, resp.body)
+            return resp
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def get_json(self, url, **kwargs):
+        return self.get(url, **kwargs).json()
+
+    def close(self):
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class AsyncHttpClient:
+    """异步接口: 请求在线程池中执行，与同步客户端共用连接池和每主机并发上限"""
+
+    def __init__(self, client=None, **kwargs):
+        self.client = client or HttpClient(**kwargs)
+
+    async def request(self, method, url, **kwargs):
+        return await asyncio.to_thread(self.client.request, method, url, **kwargs)
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    async def get_json(self, url, **kwargs):
+        return (await self.get(url, **kwargs)).json()
+
+    async def close(self):
+        self.client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def get_client():
+    """进程内共享的默认客户端"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = HttpClient()
+        return _shared
@@ -0,0 +1,115 @@
+"""
+指标历史的按日期查询 — ahr999.json / mvrv.json / btc-dominance.json / bmri.json 等
+
+history 行只载入一次，转成按日期排序的数组；查询都是二分（O(log n)），
+缺失日期不会让结果错位（按日期而不是按行号回看）:
+
+    s = load_series(doc["history"], "mvrv")["mvrv"]
+    s.value_at("2026-08-01")            # 当天或之前最近一天的值
+    s.change(7, value=1.21)             # 相对 7 天前的涨跌 %
+    s.percentile_rank(1.21)             # 历史上低于该值的比例 %
+    s.cycle_aligned("2026-08-04", "2024-04-20", "2020-05-11")   # 上一周期同阶段月均值
+"""
+
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from lib.columnar import dates as column_dates, is_columnar
+from lib.fred import from_day, to_day
+
+AVG_MONTH_DAYS = 30.44
+
+
+class IndicatorSeries:
+    """单列: 升序日期 + 值；另存一份排序后的值用于百分位"""
+
+    def __init__(self, name, dates, values):
+        self.name = name
+        self.dates = list(dates)
+        self.days = to_day(self.dates) if self.dates else np.zeros(0, dtype=np.int64)
+        self.values = np.asarray(values, dtype=float)
+        self._sorted = np.sort(self.values)
+        self._csum = np.concatenate([[0.0], np.cumsum(self.values)])
+
+    def __len__(self):
+        return len(self.dates)
+
+    @property
+    def last_date(self):
+        return self.dates[-1] if self.dates else None
+
+    def _at(self, date):
+        """date 当天或之前最近一行的下标，没有为 -1"""
+        return int(np.searchsorted(self.days, to_day(date), side="right")) - 1
+
+    def value_at(self, date, max_gap=None):
+        """当天或之前最近一天的值；超过 max_gap 天没有数据返回 None"""
+        i = self._at(date)
+        if i < 0 or (max_gap is not None and to_day(date) - int(self.days[i]) > max_gap):
+            return None
+        return float(self.values[i])
+
+    def change(self, days, date=None, value=None):
+        """value（默认取 date 当天的值）相对 days 天前的涨跌 %；date 默认最后一天"""
+        date = date or self.last_date
+        if date is None:
+            return None
+        now = self.value_at(date) if value is None else value
+        past = self.value_at(from_day(to_day(date) - days))
+        if past is None:
+            # 历史不够长时退回最早一行
+            past = float(self.values[0]) if len(self) else None
+        if now is None or not past:
+            return None
+        return (now - past) / past * 100
+
+    def window(self, start, end):
+        """[start, end] 内的值（含两端）"""
+        lo = int(np.searchsorted(self.days, to_day(start), side="left"))
+        hi = int(np.searchsorted(self.days, to_day(end), side="right"))
+        return self.values[lo:hi].tolist()
+
+    def recent(self, days, date=None):
+        """截至 date（默认最后一天）的最近 days 个自然日内的值"""
+        date = date or self.last_date
+        if date is None:
+            return []
+        return self.window(from_day(to_day(date) - days + 1), date)
+
+    def mean_between(self, start, end):
+        lo = int(np.searchsorted(self.days, to_day(start), side="left"))
+        hi = int(np.searchsorted(self.days, to_day(end), side="right"))
+        return (self._csum[hi] - self._csum[lo]) / (hi - lo) if hi > lo else None
+
+    def percentile_rank(self, value):
+        """历史上严格小于 value 的比例（%）；空序列为 50"""
+        if not len(self):
+            return 50
+        return int(np.searchsorted(self._sorted, value, side="left")) / len(self) * 100
+
+    def cycle_aligned(self, date, halving_a, halving_b):
+        """把 date 距 halving_a 的整月数平移到 halving_b 之后 → (目标月份 YYYY-MM, 该月均值或 None)"""
+        d, a, b = (datetime.strptime(x[:10], "%Y-%m-%d") for x in (date, halving_a, halving_b))
+        months = (d.year - a.year) * 12 + (d.month - a.month)
+        target = b + timedelta(days=months * AVG_MONTH_DAYS)
+        month_start = target.replace(day=1)
+        month_end = (month_start + timedelta(days=32)).replace(day=1) - timedelta(days=1)
+        return target.strftime("%Y-%m"), self.mean_between(month_start.strftime("%Y-%m-%d"),
+                                                           month_end.strftime("%Y-%m-%d"))
+
+
+def load_series(rows, *fields):
+    """history（schema 1 行数组或 schema 2 列式）→ {字段: IndicatorSeries}；缺该字段的行在对应序列里跳过，同日多行取最后一行"""
+    if is_columnar(rows):
+        # 列式直接按列取，不解码成行
+        days = column_dates(rows)
+        pairs = {field: zip(days, rows["columns"].get(field, ())) for field in fields}
+    else:
+        pairs = {field: [(r["date"], r.get(field)) for r in rows] for field in fields}
+    out = {}
+    for field in fields:
+        by_date = {d: v for d, v in pairs[field] if v is not None}
+        dates = sorted(by_date)
+        out[field] = IndicatorSeries(field, dates, [by_date[d] for d in dates])
+    return out
@@ -0,0 +1,44 @@
+"""
+JSON 读写工具 — 原子写入（临时文件 + rename），写到一半崩溃不会留下半截文件
+"""
+
+import json
+import os
+import tempfile
+
+
+def atomic_write_bytes(path, data):
+    dir_path = os.path.dirname(os.path.abspath(path))
+    os.makedirs(dir_path, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=dir_path, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        # mkstemp 建出的是 0600，沿用原文件权限，新文件用 0644
+        try:
+            mode = os.stat(path).st_mode & 0o777
+        except FileNotFoundError:
+            mode = 0o644
+        os.chmod(tmp, mode)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def dump_json(data, indent=2):
+    """与各脚本现有输出一致: indent=2 + 保留中文"""
+    return json.dumps(data, indent=indent, ensure_ascii=False)
+
+
+def write_json(path, data, indent=2):
+    atomic_write_bytes(path, dump_json(data, indent).encode("utf-8"))
+
+
+def read_json(path, default=None):
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return default
@@ -0,0 +1,46 @@
+"""
+LLM 调用结果缓存 — 按输入指纹存到 .cache/llm/{stage}/{指纹}.json，输入不变就不再调模型
+
+    fp = fingerprint(prompt, model=MODEL, version=PROMPT_VERSION)
+    result = load("comment", fp)
+    if result is None:
+        result = call_llm(prompt)
+        store("comment", fp, result)
+
+指纹 = sha256(规范化 JSON(输入快照 + 模型 + prompt 版本))；改 prompt 模板时升版本号，旧缓存自然失效。
+"""
+
+import hashlib
+import json
+import os
+import time
+
+from lib.jsonio import read_json, write_json
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+CACHE_DIR = os.environ.get("LLM_CACHE_DIR", os.path.join(BASE_DIR, ".cache", "llm"))
+
+
+def fingerprint(*parts, **fields):
+    data = json.dumps([parts, fields], ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()[:24]
+
+
+def _path(stage, fp, cache_dir):
+    return os.path.join(cache_dir, stage, f"{fp}.json")
+
+
+def load(stage, fp, max_age=None, cache_dir=CACHE_DIR):
+    """命中 → 当时存的值；没有 / 过期（max_age 秒）/ 文件损坏 → None"""
+    try:
+        entry = read_json(_path(stage, fp, cache_dir))
+    except ValueError:
+        return None
+    if entry is None or (max_age is not None and time.time() - entry.get("stored_at", 0) > max_age):
+        return None
+    return entry.get("value")
+
+
+def store(stage, fp, value, cache_dir=CACHE_DIR):
+    write_json(_path(stage, fp, cache_dir), {"fingerprint": fp, "stored_at": int(time.time()), "value": value})
+    return value
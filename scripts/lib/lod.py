@@ -0,0 +1,182 @@
+"""
+指标历史的多分辨率（LOD）分层 — indicators/data/lod/
+
+    lod/{name}/recent.json    最近 12 个月的日度行（from = 起始月初）+ 源文件的顶层字段（current / thresholds 等）
+    lod/{name}/weekly.json    recent 之前的周聚合（周一为 date，最后一周截到 recent 之前）
+    lod/{name}/monthly.json   全区间月聚合
+    lod/manifest.json         各层文件的日期范围、行数、字节数、内容哈希；full 层指向原始文件，
+                              path 为 history 在原始文件里的位置
+
+聚合行沿用原字段名，值为区间最后一个值（收盘），另带 n；只有 OHLC_FIELDS 里的指标字段
+再带 {field}_open / _high / _low（价格、拟合价等辅助列只留收盘，控制首屏体积），
+前端可以直接把聚合行当日度行画。recent 从月初（from）开始，monthly 里早于 from 的行正好覆盖之前的
+全部日期，首屏（overview）= 这部分 monthly + recent；weekly 给需要中等精度的场景，
+用户选 "All" 时再拉原始文件。
+"""
+
+import hashlib
+import json
+import os
+from datetime import date, timedelta
+
+from lib.columnar import history_rows
+from lib.jsonio import atomic_write_bytes, dump_json, read_json
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DATA_DIR = os.path.join(BASE_DIR, "indicators", "data")
+LOD_DIR = os.path.join(DATA_DIR, "lod")
+MANIFEST_FILE = os.path.join(LOD_DIR, "manifest.json")
+RECENT_DAYS = 365
+
+# 名称 → (源文件, history 在文档中的路径)
+DATASETS = {
+    "ahr999": ("ahr999.json", ["history"]),
+    "mvrv": ("mvrv.json", ["history"]),
+    "btc-dominance": ("btc-dominance.json", ["history"]),
+    "bmri-1m": ("bmri.json", ["1m", "history"]),
+    "bmri-6m": ("bmri.json", ["6m", "history"]),
+    "marketcap": ("marketcap.json", []),
+    "btc-price": ("shared/btc-price.json", ["history"]),
+}
+
+# 聚合时带 _open / _high / _low 的字段（各页的主指标）；其余字段只留区间收盘
+OHLC_FIELDS = {
+    "ahr999": ["ahr999", "ahr999_3d"],
+    "mvrv": ["mvrv"],
+    "btc-dominance": ["value"],
+    "bmri-1m": ["bmri"],
+    "bmri-6m": ["bmri"],
+    "marketcap": ["total_mcap"],
+    "btc-price": ["price"],
+}
+
+
+def sha256(data):
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def numeric_fields(rows):
+    fields = []
+    for row in rows:
+        for key, value in row.items():
+            if key != "date" and key not in fields and isinstance(value, (int, float)) and not isinstance(value, bool):
+                fields.append(key)
+    return fields
+
+
+def week_key(day):
+    d = date.fromisoformat(day)
+    return (d - timedelta(days=d.weekday())).isoformat()
+
+
+def month_key(day):
+    return day[:7] + "-01"
+
+
+def aggregate(rows, fields, key, ohlc=()):
+    """按 key(date) 分桶 → 聚合行（ohlc 里的字段带 _open / _high / _low）；缺值的字段在该桶里跳过"""
+    buckets = {}
+    for row in rows:
+        buckets.setdefault(key(row["date"]), []).append(row)
+    out = []
+    for start in sorted(buckets):
+        group = buckets[start]
+        agg = {"date": start, "end": group[-1]["date"], "n": len(group)}
+        for field in fields:
+            values = [r[field] for r in group if isinstance(r.get(field), (int, float))]
+            if not values:
+                continue
+            agg[field] = values[-1]
+            if field not in ohlc:
+                continue
+            agg[f"{field}_open"] = values[0]
+            agg[f"{field}_high"] = max(values)
+            agg[f"{field}_low"] = min(values)
+        out.append(agg)
+    return out
+
+
+def extract(doc, path):
+    """→ (history 行, 同层及上层的其余字段)；含 history 的兄弟分支（bmri 的另一档）不带
+    history 为 schema 2（lib.columnar）时解码成行"""
+    if not path:
+        return history_rows(doc), {}
+    meta = {k: v for k, v in doc.items() if k != path[0] and not (isinstance(v, dict) and "history" in v)}
+    node = doc
+    for key in path[:-1]:
+        node = node[key]
+        meta.update((k, v) for k, v in node.items() if k != path[-1])
+    return history_rows(node[path[-1]]), meta
+
+
+def build_tiers(name, rows, meta, recent_days=RECENT_DAYS):
+    """→ {tier: 文档}"""
+    rows = sorted((r for r in rows if r.get("date")), key=lambda r: r["date"])
+    if not rows:
+        return {}
+    fields = numeric_fields(rows)
+    ohlc = [f for f in OHLC_FIELDS.get(name, []) if f in fields]
+    cutoff = (date.fromisoformat(rows[-1]["date"]) - timedelta(days=recent_days - 1)).isoformat()
+    # 切点对齐到月初: monthly 里早于切点的行只含 recent 之前的日期，和 recent 首尾衔接
+    cutoff = month_key(cutoff)
+    recent = [r for r in rows if r["date"] >= cutoff]
+    older = [r for r in rows if r["date"] < cutoff]
+    tiers = {
+        "recent": {"name": name, "tier": "recent", "resolution": "1d", **meta, "from": cutoff, "history": recent},
+        "weekly": {"name": name, "tier": "weekly", "resolution": "1w", "fields": fields, "ohlc": ohlc,
+                   "history": aggregate(older, fields, week_key, ohlc)},
+        "monthly": {"name": name, "tier": "monthly", "resolution": "1M", "fields": fields, "ohlc": ohlc,
+                    "history": aggregate(rows, fields, month_key, ohlc)},
+    }
+    return tiers
+
+
+def _tier_entry(path, data, history):
+    return {
+        "file": os.path.relpath(path, DATA_DIR),
+        "start": history[0]["date"] if history else None,
+        "end": (history[-1].get("end") or history[-1]["date"]) if history else None,
+        "rows": len(history),
+        "bytes": len(data),
+        "sha256": sha256(data),
+    }
+
+
+def write_if_changed(path, data):
+    if os.path.exists(path):
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    atomic_write_bytes(path, data)
+    return True
+
+
+def build_all(datasets=DATASETS, data_dir=DATA_DIR, lod_dir=LOD_DIR):
+    """生成全部 LOD 文件和 manifest → (manifest, 重写的文件列表)"""
+    manifest = {"datasets": {}}
+    written = []
+    docs = {}
+    for name, (source, path) in datasets.items():
+        src = os.path.join(data_dir, source)
+        if not os.path.exists(src):
+            continue
+        if source not in docs:
+            with open(src, "rb") as f:
+                raw = f.read()
+            docs[source] = (raw, read_json(src))
+        raw, doc = docs[source]
+        rows, meta = extract(doc, path)
+        entry = {"source": source, "path": path, "tiers": {}}
+        for tier, tier_doc in build_tiers(name, rows, meta).items():
+            data = json.dumps(tier_doc, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+            out = os.path.join(lod_dir, name, f"{tier}.json")
+            if write_if_changed(out, data):
+                written.append(os.path.relpath(out, data_dir))
+            entry["tiers"][tier] = _tier_entry(out, data, tier_doc["history"])
+        entry["tiers"]["full"] = _tier_entry(src, raw, sorted(rows, key=lambda r: r["date"]))
+        manifest["datasets"][name] = entry
+
+    data = dump_json(manifest).encode("utf-8")
+    if write_if_changed(os.path.join(lod_dir, "manifest.json"), data):
+        written.append(os.path.relpath(os.path.join(lod_dir, "manifest.json"), data_dir))
+    return manifest, written
@@ -0,0 +1,314 @@
+"""
+数据更新流水线 — 按 manifest 声明的输入 / 输出文件构建 DAG 并行执行
+
+manifest (scripts/pipeline.json):
+    {"steps": {
+        "recalc-bmri": {
+            "cmd": ["python3", "scripts/recalc-bmri-fast.py"],
+            "inputs": ["indicators/data/shared/fred-macro.json"],
+            "outputs": ["indicators/data/bmri.json"]
+        }, ...}}
+
+- 依赖自动推导: B 的某个 input 匹配 A 的某个 output → A 先于 B；
+  多个步骤写同一文件时按 manifest 顺序串行；也可用 "after" 显式声明
+- 输入内容哈希（sha256）与上次成功运行一致且输出都在 → 跳过
+  "volatile": true 的步骤（从网络拉数据）每次都跑，但输出没变时下游照样跳过
+- 互不依赖的步骤在线程池里并行；某步失败只阻塞它的下游
+- 结束打印关键路径: 总耗时 ≈ 最长依赖链，而不是所有步骤之和
+
+状态保存在 <repo>/.cache/pipeline/state.json（路径 → (size, mtime, sha) 也缓存在里面，
+未改动的大文件不重复读）。
+"""
+
+import fnmatch
+import glob
+import hashlib
+import os
+import subprocess
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from lib.jsonio import read_json, write_json
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+DEFAULT_MANIFEST = os.path.join(BASE_DIR, "scripts", "pipeline.json")
+DEFAULT_STATE = os.path.join(BASE_DIR, ".cache", "pipeline", "state.json")
+LOG_DIR = os.path.join(BASE_DIR, ".cache", "pipeline", "logs")
+
+
+class PipelineError(Exception):
+    pass
+
+
+class Step:
+    def __init__(self, name, cmd, inputs=(), outputs=(), after=(), volatile=False, timeout=None):
+        self.name = name
+        self.cmd = cmd
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.after = list(after)
+        self.volatile = volatile
+        self.timeout = timeout
+        self.deps = set()
+
+
+class StepResult:
+    __slots__ = ("name", "status", "start", "end", "detail")
+
+    def __init__(self, name, status, start=0.0, end=0.0, detail=""):
+        self.name = name
+        self.status = status  # ran / skipped / failed / blocked
+        self.start = start
+        self.end = end
+        self.detail = detail
+
+    @property
+    def seconds(self):
+        return self.end - self.start
+
+
+def load_manifest(path=DEFAULT_MANIFEST):
+    manifest = read_json(path)
+    if manifest is None:
+        raise PipelineError(f"manifest 不存在: {path}")
+    steps = []
+    for name, spec in manifest.get("steps", {}).items():
+        if "cmd" not in spec:
+            raise PipelineError(f"{name}: 缺少 cmd")
+        steps.append(Step(
+            name, spec["cmd"],
+            inputs=spec.get("inputs", ()),
+            outputs=spec.get("outputs", ()),
+            after=spec.get("after", ()),
+            volatile=spec.get("volatile", False),
+            timeout=spec.get("timeout"),
+        ))
+    return steps
+
+
+def _overlaps(a, b):
+    """两个路径模式是否可能指向同一文件"""
+    return a == b or fnmatch.fnmatch(a, b) or fnmatch.fnmatch(b, a)
+
+
+def build_graph(steps):
+    """填充每个 step.deps，返回拓扑序；有环时抛 PipelineError"""
+    by_name = {s.name: s for s in steps}
+    for i, step in enumerate(steps):
+        for dep in step.after:
+            if dep not in by_name:
+                raise PipelineError(f"{step.name}: after 引用了未知步骤 {dep}")
+            step.deps.add(dep)
+        for j, other in enumerate(steps):
+            if j == i:
+                continue
+            reads = any(_overlaps(a, b) for a in step.inputs for b in other.outputs)
+            # 写同一文件、或互相读对方输出: 无法推断先后，按 manifest 顺序串行
+            ambiguous = (any(_overlaps(a, b) for a in step.outputs for b in other.outputs)
+                         or any(_overlaps(a, b) for a in other.inputs for b in step.outputs))
+            if (reads and not ambiguous) or (ambiguous and j < i):
+                step.deps.add(other.name)
+
+    order, state = [], {}
+
+    def visit(name, path):
+        if state.get(name) == "done":
+            return
+        if state.get(name) == "visiting":
+            raise PipelineError("依赖成环: " + " → ".join(path + [name]))
+        state[name] = "visiting"
+        for dep in sorted(by_name[name].deps):
+            visit(dep, path + [name])
+        state[name] = "done"
+        order.append(by_name[name])
+
+    for step in steps:
+        visit(step.name, [])
+    return order
+
+
+def select(steps, targets):
+    """只保留 targets 及其全部上游"""
+    by_name = {s.name: s for s in steps}
+    keep, stack = set(), list(targets)
+    while stack:
+        name = stack.pop()
+        if name not in by_name:
+            raise PipelineError(f"未知步骤: {name}")
+        if name not in keep:
+            keep.add(name)
+            stack.extend(by_name[name].deps)
+    return [s for s in steps if s.name in keep]
+
+
+class FileHasher:
+    """sha256 内容哈希；(size, mtime_ns) 没变时直接复用上次结果"""
+
+    def __init__(self, memo=None):
+        self.memo = memo or {}
+        self._lock = threading.Lock()
+
+    def hash_file(self, path):
+        st = os.stat(path)
+        key = [st.st_size, st.st_mtime_ns]
+        with self._lock:
+            cached = self.memo.get(path)
+        if cached and cached[:2] == key:
+            return cached[2]
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                h.update(chunk)
+        digest = h.hexdigest()
+        with self._lock:
+            self.memo[path] = key + [digest]
+        return digest
+
+    def expand(self, pattern):
+        path = os.path.expanduser(pattern)
+        if not os.path.isabs(path):
+            path = os.path.join(BASE_DIR, path)
+        return sorted(glob.glob(path)) if glob.has_magic(path) else [path]
+
+    def fingerprint(self, patterns):
+        """{文件路径: sha 或 None(不存在)}"""
+        out = {}
+        for pattern in patterns:
+            for path in self.expand(pattern):
+                out[path] = self.hash_file(path) if os.path.isfile(path) else None
+        return out
+
+    def outputs_exist(self, patterns):
+        return all(any(os.path.exists(p) for p in self.expand(pattern)) for pattern in patterns)
+
+
+class Pipeline:
+    def __init__(self, steps, state_path=DEFAULT_STATE, jobs=4, force=False, dry_run=False, log=print):
+        self.order = build_graph(steps)
+        self.steps = {s.name: s for s in self.order}
+        self.state_path = state_path
+        self.jobs = jobs
+        self.force = force
+        self.dry_run = dry_run
+        self.log = log
+        self.state = read_json(state_path, default={}) or {}
+        self.hasher = FileHasher(self.state.get("file_hashes"))
+        self.results = {}
+        self._t0 = None
+
+    # ── 单步 ──
+
+    def _should_skip(self, step):
+        if self.force:
+            return None
+        if step.volatile:
+            return None
+        prev = self.state.get("steps", {}).get(step.name)
+        if not prev or prev.get("status") != "ok":
+            return None
+        if not self.hasher.outputs_exist(step.outputs):
+            return None
+        if self.hasher.fingerprint(step.inputs) != prev.get("inputs"):
+            return None
+        return "inputs unchanged"
+
+    def _run_step(self, step):
+        start = time.perf_counter() - self._t0
+        reason = self._should_skip(step)
+        if reason or self.dry_run:
+            return StepResult(step.name, "skipped" if reason else "ran", start, start, reason or "dry-run")
+
+        os.makedirs(LOG_DIR, exist_ok=True)
+        log_path = os.path.join(LOG_DIR, f"{step.name}.log")
+        with open(log_path, "wb") as logf:
+            try:
+                proc = subprocess.run(step.cmd, cwd=BASE_DIR, stdout=logf, stderr=subprocess.STDOUT,
+                                      timeout=step.timeout)
+                code = proc.returncode
+            except subprocess.TimeoutExpired:
+                code = "timeout"
+            except OSError as e:
+                code = str(e)
+        end = time.perf_counter() - self._t0
+        if code != 0:
+            return StepResult(step.name, "failed", start, end, f"exit {code}, 日志 {os.path.relpath(log_path, BASE_DIR)}")
+
+        # 记录运行后的输入哈希: 原地更新的文件下次不会被误判为已变化
+        self.state.setdefault("steps", {})[step.name] = {
+            "status": "ok",
+            "inputs": self.hasher.fingerprint(step.inputs),
+            "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "seconds": round(end - start, 3),
+        }
+        return StepResult(step.name, "ran", start, end)
+
+    # ── 调度 ──
+
+    def run(self):
+        self._t0 = time.perf_counter()
+        pending = {name: set(step.deps) & set(self.steps) for name, step in self.steps.items()}
+        running = {}
+        with ThreadPoolExecutor(max_workers=self.jobs) as pool:
+            while pending or running:
+                for name in [n for n, deps in pending.items() if not deps]:
+                    del pending[name]
+                    running[pool.submit(self._run_step, self.steps[name])] = name
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    name = running.pop(fut)
+                    result = fut.result()
+                    self._finish(result)
+                    if result.status == "failed":
+                        self._block_downstream(name, pending)
+                    for deps in pending.values():
+                        deps.discard(name)
+        self.state["file_hashes"] = self.hasher.memo
+        if not self.dry_run:
+            write_json(self.state_path, self.state)
+        return self.results
+
+    def _finish(self, result):
+        self.results[result.name] = result
+        icon = {"ran": "✅", "skipped": "⏭️ ", "failed": "❌", "blocked": "⛔"}[result.status]
+        detail = f"  ({result.detail})" if result.detail else ""
+        self.log(f"  {icon} {result.name:24s} {result.seconds:7.2f}s{detail}")
+
+    def _block_downstream(self, failed, pending):
+        queue = [failed]
+        while queue:
+            upstream = queue.pop()
+            for name in [n for n in pending if upstream in self.steps[n].deps]:
+                del pending[name]
+                self._finish(StepResult(name, "blocked", detail=f"上游 {failed} 失败"))
+                queue.append(name)
+
+    # ── 报告 ──
+
+    def critical_path(self):
+        """按实际耗时求最长依赖链，返回 (步骤名列表, 秒)"""
+        best = {}
+        for step in self.order:
+            if step.name not in self.results:
+                continue
+            upstream = [best[d] for d in step.deps if d in best]
+            prev_chain, prev_cost = max(upstream, key=lambda c: c[1]) if upstream else ([], 0.0)
+            best[step.name] = (prev_chain + [step.name], prev_cost + self.results[step.name].seconds)
+        return max(best.values(), key=lambda c: c[1]) if best else ([], 0.0)
+
+    def report(self):
+        results = self.results.values()
+        wall = max((r.end for r in results), default=0.0)
+        serial = sum(r.seconds for r in results)
+        counts = {}
+        for r in results:
+            counts[r.status] = counts.get(r.status, 0) + 1
+        chain, cost = self.critical_path()
+        print("\n⏱️  流水线耗时")
+        print(f"  总耗时 {wall:.2f}s | 串行合计 {serial:.2f}s | "
+              + " ".join(f"{k} {v}" for k, v in sorted(counts.items())))
+        print(f"  关键路径 {cost:.2f}s: " + " → ".join(
+            f"{n} ({self.results[n].seconds:.2f}s)" for n in chain))
+        return all(r.status in ("ran", "skipped") for r in results)
@@ -0,0 +1,85 @@
+"""
+幂律拟合 log10(price) = a·log10(x) + b，带分块自助法（moving block bootstrap）置信区间
+
+- fit: 普通最小二乘（设计矩阵 [log10 x, 1]）
+- bootstrap: 每批重采样的下标矩阵一次生成，按闭式解对整批同时求 (a, b)；
+  批次分给进程池，各批用 SeedSequence 派生的独立种子，结果与进程数无关
+- band: 给定 x 上 a·log10(x)+b 在全部重采样中的分位数（按固定节点计算后插值，
+  全量重算与单日追加得到相同的值）
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+BATCH = 250         # 每批重采样数
+KNOT = 8            # 分位带节点间距（x 的单位，天）
+
+
+def design(x):
+    lx = np.log10(np.asarray(x, dtype=float))
+    return np.column_stack([lx, np.ones_like(lx)])
+
+
+def fit(x, y):
+    """→ (a, b, r2)；y 为价格（非对数）"""
+    X = design(x)
+    ly = np.log10(np.asarray(y, dtype=float))
+    (a, b), *_ = np.linalg.lstsq(X, ly, rcond=None)
+    resid = ly - X @ np.array([a, b])
+    r2 = 1 - (resid @ resid) / ((ly - ly.mean()) @ (ly - ly.mean()))
+    return float(a), float(b), float(r2)
+
+
+def _ols_batch(lx, ly, idx):
+    """idx: [m, n] 重采样下标 → [m, 2] 的 (a, b)"""
+    X, Y = lx[idx], ly[idx]
+    n = idx.shape[1]
+    sx, sy = X.sum(axis=1), Y.sum(axis=1)
+    sxx, sxy = (X * X).sum(axis=1), (X * Y).sum(axis=1)
+    a = (n * sxy - sx * sy) / (n * sxx - sx * sx)
+    b = (sy - a * sx) / n
+    return np.column_stack([a, b])
+
+
+def _batch(args):
+    lx, ly, block, count, seed = args
+    rng = np.random.default_rng(seed)
+    n = len(lx)
+    blocks = -(-n // block)
+    starts = rng.integers(0, n - block + 1, size=(count, blocks))
+    idx = (starts[:, :, None] + np.arange(block)).reshape(count, -1)[:, :n]
+    return _ols_batch(lx, ly, idx)
+
+
+def bootstrap(x, y, n_boot=2000, block=90, seed=0, workers=None):
+    """→ float64[n_boot, 2] 的 (a, b) 重采样"""
+    lx = np.log10(np.asarray(x, dtype=float))
+    ly = np.log10(np.asarray(y, dtype=float))
+    block = max(1, min(block, len(lx)))
+    counts = [min(BATCH, n_boot - i) for i in range(0, n_boot, BATCH)]
+    seeds = np.random.SeedSequence(seed).spawn(len(counts))
+    tasks = [(lx, ly, block, c, s) for c, s in zip(counts, seeds)]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) == 1:
+        parts = [_batch(t) for t in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parts = list(pool.map(_batch, tasks))
+    return np.vstack(parts)
+
+
+def band(x, samples, quantiles=(5, 50, 95)):
+    """→ {q: float64 数组}，x 处拟合价在重采样中的第 q 百分位"""
+    x = np.asarray(x, dtype=float)
+    samples = np.asarray(samples, dtype=float)
+    lo = np.floor(x / KNOT) * KNOT
+    knots = np.unique(np.concatenate([lo, lo + KNOT]))
+    knots = knots[knots > 0]
+    vals = samples[:, :1] * np.log10(knots)[None, :] + samples[:, 1:]
+    qs = np.percentile(vals, quantiles, axis=0)
+    out = {}
+    for q, row in zip(quantiles, qs):
+        out[q] = np.where(x > 0, 10 ** np.interp(x, knots, row), 0.0)
+    return out
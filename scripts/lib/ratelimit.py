@@ -0,0 +1,71 @@
+"""
+按主机的令牌桶限速器
+
+替代脚本里手写的 time.sleep()：每个 API 主机一个令牌桶，
+请求前 acquire()，只在真正超出速率上限时才等待。线程安全。
+"""
+
+import threading
+import time
+from urllib.parse import urlsplit
+
+# 各 API 主机的速率上限: host → (请求/秒, 突发容量)，多个脚本共用同一份口径
+API_RATE_LIMITS = {
+    "api.llama.fi": (5, 10),
+    "api.coingecko.com": (0.4, 2),  # 免费档 10-30 req/min，取保守值
+}
+
+
+class TokenBucket:
+    """令牌桶: rate 个/秒 匀速补充，最多积攒 capacity 个"""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def reserve(self, tokens=1):
+        """预占令牌，返回需要等待的秒数（不阻塞）"""
+        with self._lock:
+            self._refill(time.monotonic())
+            self._tokens -= tokens
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self, tokens=1):
+        """阻塞直到拿到令牌，返回实际等待秒数"""
+        wait = self.reserve(tokens)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class HostRateLimiter:
+    """主机名 → TokenBucket；未配置的主机使用 default（None 表示不限速）"""
+
+    def __init__(self, limits=None, default=None):
+        self._limits = dict(limits or {})
+        self._default = default
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, host):
+        with self._lock:
+            if host not in self._buckets:
+                spec = self._limits.get(host, self._default)
+                self._buckets[host] = TokenBucket(*spec) if spec else None
+            return self._buckets[host]
+
+    def acquire(self, url_or_host):
+        """按 URL 的主机名取令牌，返回等待秒数"""
+        host = urlsplit(url_or_host).hostname if "://" in url_or_host else url_or_host
+        bucket = self.bucket(host or "")
+        return bucket.acquire() if bucket else 0.0
@@ -0,0 +1,280 @@
+"""
+常驻无头浏览器截图服务 — 一个热浏览器 + 页面池，本地 Unix socket 接任务
+
+    服务端: python3 scripts/render-service.py            # 常驻，默认 socket .cache/render.sock
+    客户端: await screenshot(html_path, png_path)        # 服务在就走服务，不在就本进程起一次浏览器
+            await render_many(jobs, pages=4)             # 批量（回补历史海报）
+
+协议是一行一个 JSON:
+    → {"html_path": "...", "output": "out.png", "viewport": {"width": 1080, "height": 1920},
+       "format": "png", "full_page": false, "timeout_ms": 15000}
+      （或用 "html": "<html>..." + 可选 "base_dir"，相对路径的图片 / 字体按 base_dir 解析）
+    ← {"ok": true, "output": "...", "ms": 420} / {"ok": false, "error": "..."}
+
+就绪判定不再固定 sleep: 等 document.fonts.ready、所有 <img> 加载完成（或失败），
+再等两帧让布局落定；load 事件或就绪判定超过 timeout_ms 都直接截当前画面，结果里带 "timeout": true。
+"""
+
+import asyncio
+import json
+import os
+import socket
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+SOCKET_PATH = os.environ.get("RENDER_SOCKET", os.path.join(BASE_DIR, ".cache", "render.sock"))
+DEFAULT_VIEWPORT = {"width": 1080, "height": 1920}
+DEFAULT_TIMEOUT_MS = 15000
+
+READY_JS = """
+async () => {
+  await document.fonts.ready;
+  const pending = Array.from(document.images)
+    .filter(img => !img.complete)
+    .map(img => new Promise(done => {
+      img.addEventListener('load', done, { once: true });
+      img.addEventListener('error', done, { once: true });
+    }));
+  await Promise.all(pending);
+  await new Promise(done => requestAnimationFrame(() => requestAnimationFrame(done)));
+  return true;
+}
+"""
+
+
+class RenderError(Exception):
+    pass
+
+
+class Renderer:
+    """一个 Chromium + pages 个复用页面；render 可并发调用，页面用完放回池里
+
+    池里放的是 (browser, page)：浏览器重启后，旧浏览器的页面归还时直接丢掉，不再放回池里"""
+
+    def __init__(self, pages=2):
+        self.size = pages
+        self._pw = None
+        self._browser = None
+        self._pool = None
+        self._lock = asyncio.Lock()
+
+    async def start(self):
+        from playwright.async_api import async_playwright
+        self._pw = await async_playwright().start()
+        self._pool = asyncio.Queue()
+        await self._launch()
+        return self
+
+    async def _launch(self):
+        # 池子对象不换（等着取页面的任务还挂在它上面），只清掉旧浏览器的空闲页面再放新的
+        self._browser = await self._pw.chromium.launch(headless=True)
+        while not self._pool.empty():
+            self._pool.get_nowait()
+        for _ in range(self.size):
+            self._pool.put_nowait((self._browser, await self._browser.new_page(viewport=DEFAULT_VIEWPORT)))
+
+    async def _ensure_browser(self):
+        # 浏览器崩了 / 被关掉时整体重启，池子里的页面一起换
+        async with self._lock:
+            if self._browser is None or not self._browser.is_connected():
+                print("⚠️ 浏览器已断开，重启")
+                await self._launch()
+
+    def _current(self, browser):
+        return browser is self._browser and browser.is_connected()
+
+    async def _acquire(self):
+        """取一个属于当前浏览器的页面；取到重启前的旧页面就丢掉再取"""
+        while True:
+            await self._ensure_browser()
+            browser, page = await self._pool.get()
+            if self._current(browser):
+                return browser, page
+
+    def _release(self, browser, page):
+        if self._current(browser):
+            self._pool.put_nowait((browser, page))
+        elif browser is self._browser:
+            # 浏览器刚断开、还没重启: 页面丢掉，放个空位叫醒排队的任务去重启（重启时会清掉空位）
+            self._pool.put_nowait((None, None))
+
+    async def close(self):
+        if self._browser is not None:
+            await self._browser.close()
+        if self._pw is not None:
+            await self._pw.stop()
+        self._browser = self._pw = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def render(self, job):
+        """job 见模块说明 → {"ok", "output", "ms"[, "timeout"]}；参数错误抛 RenderError"""
+        from playwright.async_api import TimeoutError as PlaywrightTimeout
+
+        output = job.get("output")
+        if not output:
+            raise RenderError("缺少 output")
+        fmt = job.get("format") or os.path.splitext(output)[1].lstrip(".").replace("jpg", "jpeg") or "png"
+        if fmt not in ("png", "jpeg"):
+            raise RenderError(f"不支持的格式: {fmt}")
+        viewport = {**DEFAULT_VIEWPORT, **(job.get("viewport") or {})}
+        timeout_ms = job.get("timeout_ms", DEFAULT_TIMEOUT_MS)
+
+        tmp = None
+        if job.get("html") is not None:
+            # 写到 base_dir 下的临时文件再 file:// 打开，保证相对路径资源能加载
+            base_dir = job.get("base_dir") or os.getcwd()
+            fd, tmp = tempfile.mkstemp(dir=base_dir, prefix=".render-", suffix=".html")
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(job["html"])
+            html_path = tmp
+        elif job.get("html_path"):
+            html_path = os.path.abspath(job["html_path"])
+        else:
+            raise RenderError("需要 html 或 html_path")
+
+        t0 = time.perf_counter()
+        browser, page = await self._acquire()
+        timed_out = False
+        try:
+            await page.set_viewport_size(viewport)
+            try:
+                await page.goto(f"file://{html_path}", wait_until="load", timeout=timeout_ms)
+            except PlaywrightTimeout:
+                # load 事件没等到（某个资源卡住）: 不再等就绪，截当前画面
+                timed_out = True
+            if not timed_out:
+                try:
+                    await asyncio.wait_for(page.evaluate(READY_JS), timeout_ms / 1000)
+                except asyncio.TimeoutError:
+                    timed_out = True
+            os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+            options = {"path": output, "type": fmt, "full_page": bool(job.get("full_page"))}
+            if fmt == "jpeg":
+                options["quality"] = job.get("quality", 90)
+            await page.screenshot(**options)
+        finally:
+            self._release(browser, page)
+            if tmp:
+                os.unlink(tmp)
+        result = {"ok": True, "output": output, "ms": round((time.perf_counter() - t0) * 1000)}
+        if timed_out:
+            result["timeout"] = True
+        return result
+
+
+async def serve(socket_path=SOCKET_PATH, pages=2):
+    """常驻服务: 每个连接可发多行任务，每行回一行结果"""
+    renderer = await Renderer(pages).start()
+
+    async def handle(reader, writer):
+        try:
+            while line := await reader.readline():
+                try:
+                    result = await renderer.render(json.loads(line))
+                except Exception as e:
+                    result = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+                print(("✅" if result["ok"] else "❌") + f" {json.dumps(result, ensure_ascii=False)}", flush=True)
+                writer.write((json.dumps(result, ensure_ascii=False) + "\n").encode("utf-8"))
+                await writer.drain()
+        finally:
+            writer.close()
+
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    if os.path.exists(socket_path):
+        os.unlink(socket_path)
+    server = await asyncio.start_unix_server(handle, path=socket_path)
+    print(f"🖨️ render service: {socket_path} ({pages} 个页面)", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await renderer.close()
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+
+
+def service_up(socket_path=SOCKET_PATH):
+    """socket 能连上才算在线（服务异常退出会留下 socket 文件）"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(1)
+            sock.connect(socket_path)
+        return True
+    except OSError:
+        return False
+
+
+def request(job, socket_path=SOCKET_PATH, timeout=60):
+    """同步客户端 → 结果 dict；服务不在时抛 OSError（ConnectionRefusedError / FileNotFoundError）"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        sock.sendall((json.dumps(job, ensure_ascii=False) + "\n").encode("utf-8"))
+        buf = b""
+        while not buf.endswith(b"\n"):
+            chunk = sock.recv(65536)
+            if not chunk:
+                raise RenderError("render service 提前断开")
+            buf += chunk
+    return json.loads(buf)
+
+
+async def request_async(job, socket_path=SOCKET_PATH, timeout=60):
+    reader, writer = await asyncio.open_unix_connection(socket_path)
+    try:
+        writer.write((json.dumps(job, ensure_ascii=False) + "\n").encode("utf-8"))
+        await writer.drain()
+        line = await asyncio.wait_for(reader.readline(), timeout)
+    finally:
+        writer.close()
+    if not line:
+        raise RenderError("render service 提前断开")
+    return json.loads(line)
+
+
+async def render_many(jobs, pages=4, socket_path=SOCKET_PATH, on_done=None):
+    """批量截图: 服务在线就并发提交给服务，否则本进程起一个 pages 页的浏览器跑完
+    → 与 jobs 同序的结果列表（失败项为 {"ok": False, "error"}）；on_done(i, result) 每完成一项回调一次"""
+    sem = asyncio.Semaphore(pages)
+
+    async def run(i, job, submit):
+        async with sem:
+            try:
+                result = await submit(job)
+            except Exception as e:
+                result = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+        if on_done:
+            on_done(i, result)
+        return result
+
+    if service_up(socket_path):
+        return await asyncio.gather(*(run(i, job, lambda j: request_async(j, socket_path))
+                                      for i, job in enumerate(jobs)))
+    async with Renderer(pages=pages) as renderer:
+        return await asyncio.gather(*(run(i, job, renderer.render) for i, job in enumerate(jobs)))
+
+
+async def screenshot(html_path, output, viewport=None, fmt=None, socket_path=SOCKET_PATH, **options):
+    """截图: 优先走常驻服务；服务没开（socket 不存在 / 连不上）时本进程起一次浏览器（同样的就绪判定）
+    → 结果 dict；服务超时抛 RenderError，不会再本地重跑一遍"""
+    job = {"html_path": str(html_path), "output": str(output), "viewport": viewport or DEFAULT_VIEWPORT,
+           **({"format": fmt} if fmt else {}), **options}
+    try:
+        result = await request_async(job, socket_path)
+        result["via"] = "service"
+    except (ConnectionRefusedError, FileNotFoundError):
+        async with Renderer(pages=1) as renderer:
+            result = await renderer.render(job)
+        result["via"] = "local"
+    except asyncio.TimeoutError as e:
+        # 服务已经在跑这个任务，超时不本地重跑一遍，直接报错
+        raise RenderError(f"render service 超时: {html_path}") from e
+    if not result.get("ok"):
+        raise RenderError(result.get("error", "render failed"))
+    return result
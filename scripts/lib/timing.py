@@ -0,0 +1,34 @@
+"""
+阶段计时 — 记录每个阶段的 wall-clock 耗时并打印汇总
+"""
+
+import time
+from contextlib import contextmanager
+
+
+class StageTimer:
+    def __init__(self):
+        self.stages = []  # [(name, seconds)]
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def stage(self, name):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages.append((name, time.perf_counter() - t0))
+
+    @property
+    def total(self):
+        return time.perf_counter() - self._start
+
+    def as_dict(self):
+        """{stage: 毫秒}，便于写入输出 JSON"""
+        return {name: round(sec * 1000, 1) for name, sec in self.stages}
+
+    def report(self, title="⏱️ 阶段耗时"):
+        print(f"\n{title}")
+        for name, sec in self.stages:
+            print(f"  {name:28s} {sec:7.2f}s")
+        print(f"  {'总计':28s} {self.total:7.2f}s")
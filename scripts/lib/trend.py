@@ -0,0 +1,71 @@
+"""
+指标月度聚合 — indicators/data/trend-monthly.json，给每日海报 AI 点评的"历史趋势"上下文用
+
+    {"datasets": {"ahr999": {"source": "ahr999.json", "path": ["history"], "field": "ahr999",
+                             "through": "2026-08-05",
+                             "months": {"2022-08": {"n": 31, "sum": 12.34, "min": 0.31, "max": 0.45}, ...},
+                             "recent": [["2026-07-30", 0.41], ...]}}}
+
+每次都从源文件重算全部月份（四个数据集合计几十毫秒），内容没变就不重写文件:
+recalc-bmri --incremental 修订旧行、recalc-ahr999 全量重建之类改动了早先月份，也会同步进来。
+数据集的源文件 / history 位置沿用 lib.lod.DATASETS，schema 2 由 extract 解码。
+"""
+
+import os
+
+from lib.jsonio import dump_json, read_json
+from lib.lod import DATA_DIR, DATASETS, extract, write_if_changed
+
+TREND_FILE = os.path.join(DATA_DIR, "trend-monthly.json")
+# 数据集 → 聚合的字段
+TREND_FIELDS = {"ahr999": "ahr999", "mvrv": "mvrv", "btc-dominance": "value", "bmri-6m": "risk"}
+RECENT_ROWS = 7
+
+
+def update_dataset(name, rows):
+    """rows: history 行（文件顺序） → 数据集条目"""
+    source, path = DATASETS[name]
+    field = TREND_FIELDS[name]
+    values = {}
+    for row in rows:
+        value = row.get(field)
+        if value is not None:
+            values.setdefault(row["date"][:7], []).append(value)
+    months = {m: {"n": len(v), "sum": sum(v), "min": min(v), "max": max(v)} for m, v in values.items()}
+
+    dates = [r["date"] for r in rows]
+    return {
+        "source": source,
+        "path": path,
+        "field": field,
+        "through": max(dates) if dates else None,
+        "months": dict(sorted(months.items())),
+        "recent": [[r["date"], r.get(field)] for r in rows[-RECENT_ROWS:]],
+    }
+
+
+def update_all(names=None, path=TREND_FILE, data_dir=DATA_DIR):
+    """重算 trend-monthly.json（names 之外的数据集保留） → (文档, 是否重写)"""
+    doc = read_json(path) or {"datasets": {}}
+    docs = {}
+    for name in names or TREND_FIELDS:
+        source, hist_path = DATASETS[name]
+        src = os.path.join(data_dir, source)
+        if not os.path.exists(src):
+            continue
+        if source not in docs:
+            docs[source] = read_json(src)
+        rows, _ = extract(docs[source], hist_path)
+        doc["datasets"][name] = update_dataset(name, rows)
+    doc["datasets"] = dict(sorted(doc["datasets"].items()))
+    return doc, write_if_changed(path, dump_json(doc).encode("utf-8"))
+
+
+def load_trend(path=TREND_FILE):
+    return read_json(path)
+
+
+def monthly_lines(entry, since):
+    """since（YYYY-MM）及之后每月一行: 'YYYY-MM: avg=…, min=…, max=…'"""
+    return [f"{m}: avg={s['sum'] / s['n']:.2f}, min={s['min']:.2f}, max={s['max']:.2f}"
+            for m, s in entry["months"].items() if m >= since]
@@ -0,0 +1,145 @@
+"""
+指标历史按年分片 — indicators/data/shards/
+
+    shards/years/{name}/{year}.{sha}.json   已结束年份的行；文件名带内容哈希，内容不变就不重写，
+                                            可按 immutable 长缓存（见 _headers）
+    shards/current/{name}.json              源文件的顶层字段（current / thresholds 等）+ 当年的行
+    shards/manifest.json                    {datasets: {name: {source, path, current, years: {year: {...}}}}}
+
+各指标的产出脚本通过 write_indicator 写文件: 照旧写完整的 indicators/data/{source}（schema 1），
+同时写列式的 v2/{source}（schema 2，见 lib.columnar），再同步该文件对应的分片。一次日更只重写 current/{name}.json 和 manifest（几十 KB），
+历史年份的分片和 URL 都不变；回补改动了某个旧年份时，只有那一年换新哈希。
+数据集名称与 history 位置沿用 lib.lod.DATASETS。
+"""
+
+import hashlib
+import json
+import os
+
+from lib.columnar import encode_doc
+from lib.jsonio import atomic_write_bytes, dump_json, read_json
+from lib.lod import DATA_DIR, DATASETS, extract, write_if_changed
+
+SHARD_DIR = os.path.join(DATA_DIR, "shards")
+V2_DIR = os.path.join(DATA_DIR, "v2")
+MANIFEST_FILE = os.path.join(SHARD_DIR, "manifest.json")
+SHARDED = ("ahr999", "mvrv", "btc-dominance", "bmri-1m", "bmri-6m", "marketcap")
+
+
+def _encode(doc):
+    return json.dumps(doc, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _sha(data):
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def _entry(path, data, rows, root):
+    return {
+        "file": os.path.relpath(path, root),
+        "start": rows[0]["date"] if rows else None,
+        "end": rows[-1]["date"] if rows else None,
+        "rows": len(rows),
+        "bytes": len(data),
+        "sha256": _sha(data),
+    }
+
+
+def split_years(rows):
+    """→ {year: 行}（按日期升序）"""
+    years = {}
+    for row in sorted((r for r in rows if r.get("date")), key=lambda r: r["date"]):
+        years.setdefault(row["date"][:4], []).append(row)
+    return years
+
+
+def shard_dataset(name, doc, root=SHARD_DIR):
+    """把一个数据集写成年分片 → (manifest 条目, 重写的文件列表)"""
+    source, path = DATASETS[name]
+    rows, meta = extract(doc, path)
+    years = split_years(rows)
+    current_year = max(years) if years else None
+    year_dir = os.path.join(root, "years", name)
+    written, entry = [], {"source": source, "path": path, "years": {}}
+
+    for year, year_rows in sorted(years.items()):
+        if year == current_year:
+            continue
+        data = _encode({"name": name, "year": year, "history": year_rows})
+        out = os.path.join(year_dir, f"{year}.{_sha(data)}.json")
+        # 文件名已含内容哈希: 存在即相同
+        if not os.path.exists(out):
+            atomic_write_bytes(out, data)
+            written.append(os.path.relpath(out, root))
+        entry["years"][year] = _entry(out, data, year_rows, root)
+
+    current_rows = years.get(current_year, [])
+    data = _encode({"name": name, "year": current_year, **meta, "history": current_rows})
+    out = os.path.join(root, "current", f"{name}.json")
+    if write_if_changed(out, data):
+        written.append(os.path.relpath(out, root))
+    entry["current"] = _entry(out, data, current_rows, root)
+
+    # 清掉被新哈希替换的旧分片
+    keep = {os.path.basename(e["file"]) for e in entry["years"].values()}
+    if os.path.isdir(year_dir):
+        for fname in os.listdir(year_dir):
+            if fname.endswith(".json") and fname not in keep:
+                os.remove(os.path.join(year_dir, fname))
+    return entry, written
+
+
+def update_manifest(entries, root=SHARD_DIR):
+    path = os.path.join(root, "manifest.json")
+    manifest = read_json(path) or {"datasets": {}}
+    manifest["datasets"].update(entries)
+    manifest["datasets"] = dict(sorted(manifest["datasets"].items()))
+    return write_if_changed(path, dump_json(manifest).encode("utf-8"))
+
+
+def shard_source(source, doc, root=SHARD_DIR):
+    """同步 source 文件对应的全部数据集（bmri.json → bmri-1m + bmri-6m）→ 重写的文件列表"""
+    entries, written = {}, []
+    for name in SHARDED:
+        if DATASETS[name][0] == source:
+            entries[name], files = shard_dataset(name, doc, root)
+            written += files
+    if entries and update_manifest(entries, root):
+        written.append("manifest.json")
+    return written
+
+
+def source_paths(source):
+    """source 文件里各个 history 的位置（bmri.json → [["1m", "history"], ["6m", "history"]]）"""
+    return [path for src, path in DATASETS.values() if src == source]
+
+
+def write_v2(source, doc, v2_dir=V2_DIR):
+    """schema 2（lib.columnar）版本写到 indicators/data/v2/{source} → 是否重写"""
+    data = _encode(encode_doc(doc, source_paths(source)))
+    return write_if_changed(os.path.join(v2_dir, source), data)
+
+
+def write_indicator(source, doc, root=SHARD_DIR, **dump):
+    """写 indicators/data/{source}（schema 1 兼容格式）+ v2/{source}（schema 2）+ 对应年分片
+    → 重写的分片文件列表
+
+    dump: 传给 json.dumps 的格式参数，默认与 jsonio.dump_json 相同（indent=2，保留中文）
+    """
+    dump = {"indent": 2, "ensure_ascii": False, **dump}
+    atomic_write_bytes(os.path.join(DATA_DIR, source), json.dumps(doc, **dump).encode("utf-8"))
+    write_v2(source, doc)
+    return shard_source(source, doc, root)
+
+
+def load_sharded(name, root=SHARD_DIR):
+    """从分片拼回 {顶层字段..., history}（current 文件里的 name / year 不带）"""
+    entry = (read_json(os.path.join(root, "manifest.json")) or {}).get("datasets", {}).get(name)
+    if entry is None:
+        return None
+    current = read_json(os.path.join(root, entry["current"]["file"]))
+    history = []
+    for year in sorted(entry["years"]):
+        history += read_json(os.path.join(root, entry["years"][year]["file"]))["history"]
+    meta = {k: v for k, v in current.items() if k not in ("name", "year", "history")}
+    return {**meta, "history": history + current["history"]}
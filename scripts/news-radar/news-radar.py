@@ -18,6 +18,9 @@ from pathlib import Path
 from typing import Any, Dict, List, Optional
 
 SCRIPT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(SCRIPT_DIR.parent))
+from lib.httpclient import HttpClient
+
 SOURCES_FILE = SCRIPT_DIR / "sources.json"
 CACHE_FILE = SCRIPT_DIR / "summaries_cache.json"
 OUTPUT_FILE = Path("/Users/aibot/.openclaw/workspace-engineer/tev-dashboard/data/news.json")
@@ -27,12 +30,19 @@ LOOKBACK_HOURS = 24
 MAX_SELECTED = 25
 SOURCE_TIMEOUT = 15
 CURL_MAX_TIME = 20
+COLLECT_WORKERS = 8
+COLLECT_DEADLINE = 45  # 整体截止（秒）: 到点还没回来的源直接放弃，用已完成的结果
 SUMMARY_TIMEOUT = 35
 SUMMARY_WORKERS = 1
 SUMMARY_BATCH_SIZE = 10
 
 SOURCE_PRIORITY = {}
 
+HTTP = HttpClient(retries=1, headers={
+    'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 14_0) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123 Safari/537.36',
+    'Accept': 'application/rss+xml, application/xml, text/xml, application/json, text/html;q=0.9, */*;q=0.8',
+})
+
 
 def now_utc() -> dt.datetime:
     return dt.datetime.now(dt.timezone.utc)
@@ -60,16 +70,7 @@ def load_sources() -> Dict[str, Any]:
 
 
 def fetch_url(url: str, timeout: int = SOURCE_TIMEOUT) -> bytes:
-    result = subprocess.run([
-        'curl', '-L', '-sS', '--compressed',
-        '--max-time', str(timeout), '--connect-timeout', '8',
-        '-H', 'User-Agent: Mozilla/5.0 (Macintosh; Intel Mac OS X 14_0) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/123 Safari/537.36',
-        '-H', 'Accept: application/rss+xml, application/xml, text/xml, application/json, text/html;q=0.9, */*;q=0.8',
-        url,
-    ], capture_output=True, timeout=timeout + 5)
-    if result.returncode != 0:
-        raise RuntimeError(result.stderr.decode('utf-8', errors='ignore').strip() or f'curl exit {result.returncode}')
-    return result.stdout
+    return HTTP.get(url, timeout=timeout).body
 
 
 def strip_html(text: str) -> str:
@@ -357,20 +358,20 @@ def llm_call(model: str, prompt: str, max_tokens: int, timeout: int) -> str:
 
     last_err = 'unknown'
     for attempt in range(5):
-        result = subprocess.run([
-            'curl', '-s', 'https://open.bigmodel.cn/api/paas/v4/chat/completions',
-            '-H', f'Authorization: Bearer {api_key}',
-            '-H', 'Content-Type: application/json',
-            '-d', payload,
-            '--max-time', str(timeout),
-        ], capture_output=True, text=True, timeout=timeout + 5)
-        if result.returncode != 0:
-            last_err = result.stderr.strip() or f'curl exit {result.returncode}'
+        try:
+            resp = HTTP.post(
+                'https://open.bigmodel.cn/api/paas/v4/chat/completions',
+                data=payload,
+                headers={'Authorization': f'Bearer {api_key}', 'Content-Type': 'application/json'},
+                timeout=timeout, retries=0, raise_for_status=False,
+            )
+        except Exception as e:
+            last_err = str(e)
             if attempt < 4:
                 time.sleep(2 + attempt * 2)
                 continue
             raise RuntimeError(last_err)
-        data = json.loads(result.stdout)
+        data = resp.json()
         if data.get('error'):
             last_err = json.dumps(data['error'], ensure_ascii=False)
             if '1302' in last_err or '速率限制' in last_err:
@@ -639,17 +640,42 @@ def write_output(data: Dict[str, Any]) -> None:
     OUTPUT_FILE.write_text(json.dumps(data, ensure_ascii=False, indent=2))
 
 
-def collect_all() -> List[Dict[str, Any]]:
+def timed_fetch(fetch, source: Dict[str, Any]):
+    t0 = time.perf_counter()
+    rows = fetch(source)
+    return rows, time.perf_counter() - t0
+
+
+def collect_all(deadline: float = COLLECT_DEADLINE) -> List[Dict[str, Any]]:
+    """所有源并发抓取；总耗时≈最慢的源，最多 deadline 秒，超时的源跳过"""
     sources = load_sources()
+    jobs = [('RSS', fetch_rss, s) for s in sources.get('rss', [])]
+    jobs += [('API', fetch_api, s) for s in sources.get('apis', [])]
+    start = time.perf_counter()
+    results: Dict[int, List[Dict[str, Any]]] = {}
+
+    pool = concurrent.futures.ThreadPoolExecutor(max_workers=COLLECT_WORKERS)
+    futures = {pool.submit(timed_fetch, fetch, source): i for i, (_, fetch, source) in enumerate(jobs)}
+    try:
+        for future in concurrent.futures.as_completed(futures, timeout=deadline):
+            i = futures[future]
+            kind, _, source = jobs[i]
+            rows, elapsed = future.result()
+            results[i] = rows
+            print(f"[INFO] {kind} {source['name']}: {len(rows)} ({elapsed:.1f}s)")
+    except concurrent.futures.TimeoutError:
+        for i in sorted(set(futures.values()) - set(results)):
+            kind, _, source = jobs[i]
+            print(f"[WARN] {kind} {source['name']}: no response within {deadline}s deadline, skipped")
+    finally:
+        # 不等还在跑的源: 它们各自受 SOURCE_TIMEOUT 约束，结果直接丢弃
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    print(f"[INFO] Sources done: {len(results)}/{len(jobs)} in {time.perf_counter() - start:.1f}s")
+    # 按 sources.json 的顺序合并，去重时先出现的条目优先，结果与串行版本一致
     all_items: List[Dict[str, Any]] = []
-    for source in sources.get('rss', []):
-        rows = fetch_rss(source)
-        print(f"[INFO] RSS {source['name']}: {len(rows)}")
-        all_items.extend(rows)
-    for source in sources.get('apis', []):
-        rows = fetch_api(source)
-        print(f"[INFO] API {source['name']}: {len(rows)}")
-        all_items.extend(rows)
+    for i in sorted(results):
+        all_items.extend(results[i])
     return all_items
 
 
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+recalc-ahr999.py - 用 lib.ahr999 引擎重算 indicators/data/ahr999.json
+
+用法:
+    python3 scripts/recalc-ahr999.py                  # 全量: 从 btc-price.json 重算全部派生列
+    python3 scripts/recalc-ahr999.py --append         # 增量: 只追加 btc-price.json 里比最后一行新的日期
+    python3 scripts/recalc-ahr999.py --price 64279    # current 用实时价（替换当天收盘）重算
+                                                      # 不给 --price 时沿用 current 里当天已有的实时价
+    python3 scripts/recalc-ahr999.py --dry-run
+"""
+
+import argparse
+import time
+
+from lib.ahr999 import (AHR_FILE, append_day, column_names, current_block, live_price, load_band, load_prices,
+                        rebuild, save)
+from lib.jsonio import read_json
+
+
+def _number(text):
+    return int(text) if text.isdigit() else float(text)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AHR999 重算")
+    parser.add_argument("--append", action="store_true", help="只追加新日期")
+    parser.add_argument("--price", type=_number, help="current 使用的实时价格")
+    parser.add_argument("--dry-run", action="store_true")
+    args = parser.parse_args()
+
+    doc = read_json(AHR_FILE) or {"history": []}
+    prices = load_prices()
+    band = load_band()
+    t0 = time.perf_counter()
+    complete = all(set(column_names(band)) <= row.keys() for row in doc["history"])
+    if args.append and not complete:
+        print("⚠️ 现有历史缺少派生列（新增了公式？），改为全量重算")
+    if args.append and complete and doc["history"]:
+        history = list(doc["history"])
+        new = sorted(d for d in prices if d > history[-1]["date"])
+        for day in new:
+            append_day(history, day, prices[day], band)
+        print(f"➕ 追加 {len(new)} 天{': ' + ', '.join(new) if new else ''}")
+    else:
+        history = rebuild(prices, doc["history"], band)
+    if not history:
+        print("✗ 没有价格数据")
+        return 1
+    price = args.price if args.price is not None else live_price(doc, history)
+    current = current_block(history, price, band)
+    elapsed = (time.perf_counter() - t0) * 1000
+
+    changed = history != doc["history"] or current != doc.get("current")
+    print(f"📐 {len(history)} 行 ({history[0]['date']} ~ {history[-1]['date']}, {elapsed:.0f}ms)")
+    print(f"   current: {current['date']} ahr999={current['value']} ({current['status']})")
+    if args.dry_run or not changed:
+        print("[DRY RUN] 未写入" if args.dry_run else "✅ 无变化")
+        return 0
+    save(history, current)
+    print("✅ ahr999.json 已更新")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+refit-powerlaw.py - 重拟合 AHR999 幂律参数，分块自助法给出参数和拟合价置信带
+
+- 在 btc-price.json 上对 log10(price) ~ log10(币龄天数) 做最小二乘
+- moving block bootstrap（默认 2000 次、块长 90 天）多进程并行
+- 结果写 indicators/data/shared/ahr999-fit.json（参数、置信区间、全部重采样），
+  再用 lib.ahr999 重建 ahr999.json，带上 fitted_p5 / fitted_p50 / fitted_p95 三列
+  （current 保留当天已有的实时价，只重算派生列）
+
+fitted_price / fitted_price_v2 的参数不会被自动替换；新参数确认后手动改 lib.ahr999.FITS。
+
+用法:
+    python3 scripts/refit-powerlaw.py [--boot 2000] [--block 90] [--seed 0] [-j N] [--start 2011-01-01] [--dry-run]
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime
+
+import numpy as np
+
+from lib import powerlaw
+from lib.ahr999 import AHR_FILE, FIT_FILE, FITS, coin_days, current_block, live_price, load_prices, rebuild, save
+from lib.jsonio import read_json, write_json
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AHR999 幂律重拟合 + 自助法置信带")
+    parser.add_argument("--boot", type=int, default=2000, help="重采样次数")
+    parser.add_argument("--block", type=int, default=90, help="块长（天）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--start", help="只用该日期之后的价格拟合")
+    parser.add_argument("--dry-run", action="store_true", help="只打印，不写文件")
+    args = parser.parse_args()
+
+    prices = load_prices()
+    dates = sorted(d for d in prices if not args.start or d >= args.start)
+    x = coin_days(dates).astype(float)
+    y = np.array([prices[d] for d in dates], dtype=float)
+    keep = (x > 0) & (y > 0)
+    dates = [d for d, k in zip(dates, keep) if k]
+    x, y = x[keep], y[keep]
+
+    t0 = time.perf_counter()
+    a, b, r2 = powerlaw.fit(x, y)
+    samples = powerlaw.bootstrap(x, y, args.boot, args.block, args.seed, args.jobs)
+    elapsed = time.perf_counter() - t0
+    ci = {name: np.percentile(samples[:, i], [5, 50, 95]).round(4).tolist() for i, name in enumerate("ab")}
+
+    print(f"📐 {len(dates)} 天 ({dates[0]} ~ {dates[-1]}), {args.boot} 次重采样 × 块长 {args.block}, "
+          f"{args.jobs} 进程 ({elapsed:.2f}s)")
+    print(f"   a = {a:.4f}  [p5 {ci['a'][0]}, p95 {ci['a'][2]}]")
+    print(f"   b = {b:.4f}  [p5 {ci['b'][0]}, p95 {ci['b'][2]}]")
+    print(f"   R² = {r2:.4f}")
+    for name, (fa, fb) in FITS.items():
+        print(f"   对照 {name}: a={fa}, b={fb}")
+    today = datetime.now().strftime("%Y-%m-%d")
+    qs = powerlaw.band(coin_days([today]).astype(float), samples)
+    print(f"   {today} 拟合价带: p5 ${qs[5][0]:,.0f} / p50 ${qs[50][0]:,.0f} / p95 ${qs[95][0]:,.0f}")
+
+    if args.dry_run:
+        print("[DRY RUN] 未写入")
+        return 0
+
+    write_json(FIT_FILE, {
+        "fitted_at": today,
+        "range": [dates[0], dates[-1]],
+        "points": len(dates),
+        "a": round(a, 6),
+        "b": round(b, 6),
+        "r2": round(r2, 6),
+        "bootstrap": {"n": args.boot, "block": args.block, "seed": args.seed, "ci": ci},
+        "samples": np.round(samples, 8).tolist(),
+    }, indent=None)
+
+    band = np.round(samples, 8)
+    doc = read_json(AHR_FILE) or {"history": []}
+    history = rebuild(prices, doc["history"], band)
+    # current 沿用当天已有的实时价，没有才用收盘
+    save(history, current_block(history, live_price(doc, history), band=band))
+    print(f"✅ {os.path.relpath(FIT_FILE)} + ahr999.json（{len(history)} 行，含 fitted_p5/p50/p95）")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
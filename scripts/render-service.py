@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+render-service.py - 常驻截图服务（lib.render）: 一个热 Chromium + 页面池，Unix socket 接任务
+
+daily-poster/gen-daily.py 等调用方通过 lib.render.screenshot / request 提交任务；
+服务没开时它们会退回本进程起一次浏览器，所以这个服务只是提速，不是必需。
+
+用法:
+    python3 scripts/render-service.py [--socket .cache/render.sock] [--pages 2]
+    python3 scripts/render-service.py --ping                     # 检查服务是否在线
+    python3 scripts/render-service.py --render a.html out.png    # 提交一次任务（调试用）
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+from lib.render import DEFAULT_VIEWPORT, SOCKET_PATH, request, serve, service_up
+
+
+def main():
+    parser = argparse.ArgumentParser(description="常驻无头浏览器截图服务")
+    parser.add_argument("--socket", default=SOCKET_PATH)
+    parser.add_argument("--pages", type=int, default=2, help="页面池大小（并发任务数）")
+    parser.add_argument("--ping", action="store_true", help="检查服务是否在线")
+    parser.add_argument("--render", nargs=2, metavar=("HTML", "OUTPUT"), help="提交一次截图任务")
+    parser.add_argument("--viewport", default=f"{DEFAULT_VIEWPORT['width']}x{DEFAULT_VIEWPORT['height']}")
+    args = parser.parse_args()
+
+    if args.ping or args.render:
+        if not service_up(args.socket):
+            print(f"✗ 服务未启动（{args.socket} 连不上）")
+            return 1
+        if args.ping:
+            print(f"✅ 服务在线: {args.socket}")
+            return 0
+        width, height = (int(v) for v in args.viewport.lower().split("x"))
+        t0 = time.perf_counter()
+        result = request({"html_path": os.path.abspath(args.render[0]), "output": os.path.abspath(args.render[1]),
+                          "viewport": {"width": width, "height": height}}, args.socket)
+        if not result.get("ok"):
+            print(f"✗ {result.get('error')}")
+            return 1
+        print(f"✅ {result['output']}（渲染 {result['ms']}ms，往返 {(time.perf_counter() - t0) * 1000:.0f}ms"
+              f"{'，就绪等待超时' if result.get('timeout') else ''}）")
+        return 0
+
+    try:
+        asyncio.run(serve(args.socket, args.pages))
+    except KeyboardInterrupt:
+        print("\n👋 已停止")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
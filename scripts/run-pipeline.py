@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""
+run-pipeline.py - 按 scripts/pipeline.json 的依赖图并行执行数据更新
+
+用法:
+    python3 scripts/run-pipeline.py                    # 全部步骤，输入未变的自动跳过
+    python3 scripts/run-pipeline.py gen-daily          # 只跑 gen-daily 及其上游
+    python3 scripts/run-pipeline.py --force            # 忽略哈希，全部重跑
+    python3 scripts/run-pipeline.py --dry-run          # 只打印执行计划
+    python3 scripts/run-pipeline.py -j 8               # 并行度（默认 4）
+    python3 scripts/run-pipeline.py --list             # 列出步骤和依赖
+"""
+
+import argparse
+import sys
+
+from lib.pipeline import DEFAULT_MANIFEST, Pipeline, PipelineError, build_graph, load_manifest, select
+
+
+def main():
+    parser = argparse.ArgumentParser(description="数据更新流水线")
+    parser.add_argument("targets", nargs="*", help="只运行这些步骤（含上游）")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST)
+    parser.add_argument("-j", "--jobs", type=int, default=4)
+    parser.add_argument("--force", action="store_true", help="忽略输入哈希，全部重跑")
+    parser.add_argument("--dry-run", action="store_true", help="不执行，只打印计划")
+    parser.add_argument("--list", action="store_true", help="列出步骤和依赖")
+    args = parser.parse_args()
+
+    try:
+        steps = load_manifest(args.manifest)
+        order = build_graph(steps)
+        if args.targets:
+            order = select(order, args.targets)
+    except PipelineError as e:
+        print(f"✗ {e}")
+        return 2
+
+    if args.list:
+        for step in order:
+            deps = ", ".join(sorted(step.deps)) or "-"
+            print(f"  {step.name:24s} ← {deps}{'  [volatile]' if step.volatile else ''}")
+        return 0
+
+    print(f"🚀 流水线: {len(order)} 个步骤, 并行度 {args.jobs}{' (dry-run)' if args.dry_run else ''}")
+    pipeline = Pipeline(order, jobs=args.jobs, force=args.force, dry_run=args.dry_run)
+    pipeline.run()
+    return 0 if pipeline.report() else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -10,24 +10,27 @@ Hyperliquid AF 买入历史 seed 脚本（一次性）。
 格式: { seed_at, source, daily: [{date, usd, hype, source}] }
 
 保留在 repo 供审计 / 重跑。每日增量由 update-hype-tev.py 维护。
+--replay: 只读本地 HTTP 缓存，不访问网络。
 """
 
+import bisect
 import json
 import os
 import sys
 from datetime import datetime, timezone
-from urllib.request import urlopen, Request
+
+from lib.holders_revenue import fetch_daily
+from lib.httpcache import cached_client
 
 BASE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 HYPE_BUYBACKS = os.path.join(BASE, 'data/hype-buybacks.json')
 OUT = os.path.join(BASE, 'data/protocols/hype/af-history.json')
-DEFILLAMA_URL = "https://api.llama.fi/summary/fees/hyperliquid?dataType=dailyHoldersRevenue"
 
 
 def fetch_defillama():
-    req = Request(DEFILLAMA_URL, headers={"User-Agent": "Mozilla/5.0"})
-    with urlopen(req, timeout=30) as r:
-        return json.loads(r.read().decode())
+    """hyperliquid 日线 [(date, usd)]"""
+    http = cached_client(replay="--replay" in sys.argv, headers={"User-Agent": "Mozilla/5.0"})
+    return fetch_daily('hyperliquid', http)[1]
 
 
 def main():
@@ -50,15 +53,13 @@ def main():
     # 2. 从 DefiLlama 拉历史，补齐缺口（last+1 到今天）
     last_date = records[-1]['date']
     print(f"\n从 DefiLlama 拉数据补齐 {last_date} 之后...")
-    dl = fetch_defillama()
-    chart = dl.get('totalDataChart', [])
+    chart = fetch_defillama()
     print(f"  DefiLlama 总共 {len(chart)} 条")
 
+    # chart 按日期有序，二分定位 last_date 之后的第一天
+    start = bisect.bisect_right([d for d, _ in chart], last_date)
     added = 0
-    for ts, val in chart:
-        d_date = datetime.utcfromtimestamp(ts).strftime('%Y-%m-%d')
-        if d_date <= last_date:
-            continue
+    for d_date, val in chart[start:]:
         records.append({
             'date': d_date,
             'usd': round(val or 0),
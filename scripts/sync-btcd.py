@@ -9,6 +9,8 @@ import csv
 import os
 from pathlib import Path
 
+from lib.yearshard import write_indicator
+
 # 路径
 REPO_ROOT = Path(__file__).parent.parent
 CSV_PATH = Path.home() / '.openclaw/workspace-researcher/data/cmc_marketcap_history.csv'
@@ -59,9 +61,8 @@ def sync_btcd():
     }
     data['updated_at'] = latest['date']
     
-    # 保存
-    with open(JSON_PATH, 'w') as f:
-        json.dump(data, f, separators=(',', ':'))
+    # 保存（同步年分片）
+    write_indicator('btc-dominance.json', data, indent=None, separators=(',', ':'))
     
     print(f"添加了 {len(new_records)} 条新数据")
     print(f"最新: {latest['date']}, BTC.D: {latest['value']:.2f}%")
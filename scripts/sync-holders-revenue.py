@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+sync-holders-revenue.py - 增量同步各协议 tev-records.json（DefiLlama dailyHoldersRevenue）
+
+替代 fetch-tev-history.js 的全量重建：只合并上次同步之后的新日期，只重算受影响的月份。
+
+用法:
+    python3 scripts/sync-holders-revenue.py                 # 全部协议
+    python3 scripts/sync-holders-revenue.py sky pendle      # 指定协议
+    python3 scripts/sync-holders-revenue.py --dry-run       # 预览不写入
+    python3 scripts/sync-holders-revenue.py --replay        # 只读本地 HTTP 缓存
+"""
+
+import sys
+
+from lib.holders_revenue import PROTOCOLS_BY_ID, sync_all
+from lib.timing import StageTimer
+
+
+def main():
+    args = sys.argv[1:]
+    dry_run = "--dry-run" in args
+    replay = "--replay" in args
+    ids = [a for a in args if not a.startswith("--")]
+    unknown = [i for i in ids if i not in PROTOCOLS_BY_ID]
+    if unknown:
+        print(f"✗ 未知协议: {', '.join(unknown)}（可选: {', '.join(PROTOCOLS_BY_ID)}）")
+        return 1
+
+    print(f"🔄 HoldersRevenue 增量同步{' (dry-run)' if dry_run else ''}...")
+    timer = StageTimer()
+    with timer.stage("sync"):
+        results = sync_all(ids or None, replay=replay, dry_run=dry_run)
+
+    failed = 0
+    for r in results:
+        if r["status"] == "updated":
+            print(f"  ✅ {r['id']:12s} +{r['new_days']} 天, 重算 {', '.join(r['months'])} "
+                  f"→ 累计 ${r['total_tev_usd'] / 1e6:.2f}M")
+        elif r["status"].startswith("error"):
+            failed += 1
+            print(f"  ✗ {r['id']:12s} {r['status']}")
+        else:
+            print(f"  ⏭️  {r['id']:12s} {r['status']}")
+    timer.report("⏱️  耗时")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,11 +4,12 @@ Fluid Buyback Tracker - 完整版
 追踪 Treasury/Team Multisig 的 FLUID 转账，分析是否为 Buyback
 """
 
-import subprocess
 import json
 from datetime import datetime, timezone, timedelta
 from collections import defaultdict
 
+from lib.httpclient import get_client
+
 # -----------------------------
 # Config: addresses (official)
 # -----------------------------
@@ -58,12 +59,7 @@ START_TS = int(datetime.fromisoformat(START_DATE).replace(tzinfo=timezone.utc).t
 def etherscan_get(params):
     """Etherscan API GET request"""
     params["apikey"] = "BUWR46PIP7JVZK98IP7YRQARRSABIP3V92"
-    params_str = "&".join([f"{k}={v}" for k, v in params.items()])
-    result = subprocess.run(
-        ["curl", "-s", "--max-time", "30", f"https://api.etherscan.io/api?{params_str}"],
-        capture_output=True, text=True
-    )
-    return json.loads(result.stdout)
+    return get_client().get_json("https://api.etherscan.io/api", params=params, timeout=30)
 
 def fetch_fluid_tokentx(wallet):
     """